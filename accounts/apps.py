@@ -5,3 +5,5 @@ class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
 
+    def ready(self):
+        from . import authentication  # noqa: F401  connects the user cache signals
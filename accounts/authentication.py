@@ -0,0 +1,143 @@
+"""
+JWT authentication with a per-process cache of resolved users.
+
+``JWTAuthentication`` loads the token's user from the database on every
+request. ``CachedJWTAuthentication`` keeps resolved users in a small LRU
+cache for ``AUTH_USER_CACHE_TTL`` seconds (at most ``AUTH_USER_CACHE_SIZE``
+users) and hands every request its own copy, so per-instance permission caches
+are never shared.
+
+Saving or deleting a user drops the entry in this process and replaces the
+user's version token in the shared cache. Every hit compares the token it was
+cached under with the current one, so other processes drop the entry on their
+next request too; a hit costs one shared cache read instead of a query.
+``QuerySet.update()`` sends no signals and is only covered by the TTL.
+"""
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def _version_key(user_id):
+    return f"auth_user_version:{user_id}"
+
+
+def shared_version(user_id):
+    """The user's current version token; None until the user first changes."""
+    return cache.get(_version_key(user_id))
+
+
+def bump_shared_version(user_id, ttl):
+    # A fresh token never equals an older one, even after the key expired and
+    # was set again; entries outliving it by more than ``ttl`` cannot exist
+    cache.set(_version_key(user_id), uuid.uuid4().hex, timeout=max(ttl, 1))
+
+
+class UserCache:
+    """Size-bounded LRU of users by id whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0  # moves on every invalidation
+
+    def get(self, user_id, version=None):
+        """The cached user, unless it expired or was cached under another ``version``."""
+        key = str(user_id)
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is None:
+                return None
+            user, expires, cached_version = entry
+            if expires <= time.monotonic() or cached_version != version:
+                del self._users[key]
+                return None
+            self._users.move_to_end(key)
+        return copy.copy(user)
+
+    def put(self, user_id, user, generation, version=None):
+        """Cache ``user`` unless an invalidation happened since ``generation`` was read."""
+        if self.max_size < 1 or self.ttl <= 0:
+            return
+        key = str(user_id)
+        with self._lock:
+            if generation != self.generation:
+                return  # the user may have been loaded before that change committed
+            self._users[key] = (copy.copy(user), time.monotonic() + self.ttl, version)
+            self._users.move_to_end(key)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id=None):
+        """Drop one user, or every user when ``user_id`` is None."""
+        with self._lock:
+            self.generation += 1
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(str(user_id), None)
+
+
+user_cache = UserCache(
+    ttl=getattr(settings, "AUTH_USER_CACHE_TTL", 30),
+    max_size=getattr(settings, "AUTH_USER_CACHE_SIZE", 10000),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that resolves token users through ``user_cache``."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        # Read before loading, so a change committed meanwhile makes the entry stale
+        version = shared_version(user_id)
+        user = user_cache.get(user_id, version)
+        if user is None:
+            generation = user_cache.generation
+            user = super().get_user(validated_token)
+            user_cache.put(user_id, user, generation, version)
+            return user
+
+        # Same checks as JWTAuthentication.get_user; the revocation claim is per token
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _user_changed(sender, instance, **kwargs):
+    _invalidate_user(instance.pk)
+    # Again once committed: a process may have reloaded the old row in between
+    transaction.on_commit(lambda pk=instance.pk: _invalidate_user(pk))
+
+
+def _invalidate_user(user_id):
+    user_cache.invalidate(user_id)
+    bump_shared_version(user_id, user_cache.ttl)
@@ -1,9 +1,32 @@
 # accounts/serializers.py
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from polls.models import Option, Poll, Vote
 
 User = get_user_model()
 
+
+class VotedPollSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Poll
+        fields = ("id", "question", "allow_multiple", "expires_at")
+
+
+class VotedOptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Option
+        fields = ("id", "option_text")
+
+
+class VoteHistorySerializer(serializers.ModelSerializer):
+    poll = VotedPollSerializer(read_only=True)
+    option = VotedOptionSerializer(read_only=True)
+
+    class Meta:
+        model = Vote
+        fields = ("id", "voted_at", "poll", "option")
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
 
@@ -17,4 +40,3 @@ class RegisterSerializer(serializers.ModelSerializer):
             username=validated_data.get("username"),
             password=validated_data["password"]
         )
-
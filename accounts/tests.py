@@ -1,3 +1,119 @@
+import datetime
+from unittest import mock
+
+import pytest
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.authentication import CachedJWTAuthentication, UserCache, bump_shared_version, user_cache
+from accounts.models import User
+from polls.models import Poll, Option, Vote
+
+pytestmark = pytest.mark.django_db
+
+
+class TestMyVotes(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="me@test.com", username="me", password="pass1234")
+        other = User.objects.create_user(email="other@test.com", username="other", password="pass1234")
+        now = timezone.now()
+        self.votes = []
+        for n in range(5):
+            poll = Poll.objects.create(question=f"Q{n}?", created_by=other)
+            option = Option.objects.create(poll=poll, option_text=f"A{n}")
+            self.votes.append(Vote.objects.create(
+                user=self.user, poll=poll, option=option,
+                voted_at=now - datetime.timedelta(minutes=n), single_choice=True,
+            ))
+            Vote.objects.create(user=other, poll=poll, option=option, single_choice=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lists_own_votes_newest_first_across_pages(self):
+        url = reverse("my-votes")
+        with self.assertNumQueries(1):
+            first = self.client.get(url, {"page_size": 3}).json()
+        assert [v["id"] for v in first["results"]] == [str(v.id) for v in self.votes[:3]]
+        vote = first["results"][0]
+        assert vote["poll"] == {
+            "id": str(self.votes[0].poll_id), "question": "Q0?", "allow_multiple": False, "expires_at": None,
+        }
+        assert vote["option"] == {"id": str(self.votes[0].option_id), "option_text": "A0"}
+
+        second = self.client.get(first["next"]).json()
+        assert [v["id"] for v in second["results"]] == [str(v.id) for v in self.votes[3:]]
+        assert second["next"] is None
+
+    def test_requires_authentication(self):
+        assert APIClient().get(reverse("my-votes")).status_code == 401
+
+
+class TestCachedJWTAuthentication(TestCase):
+    def setUp(self):
+        user_cache.invalidate()
+        self.user = User.objects.create_user(email="me@test.com", username="me", password="pass1234")
+        token = AccessToken.for_user(self.user)
+        self.request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def authenticate(self):
+        return CachedJWTAuthentication().authenticate(self.request)[0]
+
+    def test_second_request_skips_the_user_query(self):
+        with self.assertNumQueries(1):
+            first = self.authenticate()
+        with self.assertNumQueries(0):
+            second = self.authenticate()
+        assert second == self.user
+        assert second is not first
+
+    def test_saving_the_user_invalidates_the_entry(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleting_the_user_invalidates_the_entry(self):
+        self.authenticate()
+        self.user.delete()
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_change_in_another_process_invalidates_the_entry(self):
+        self.authenticate()
+        # What another process does when it saves the user: no signal here
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        bump_shared_version(self.user.pk, user_cache.ttl)
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_revoked_admin_loses_bulk_votes(self):
+        self.user.is_staff = True
+        self.user.save()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        url = reverse("bulk-vote")
+        assert client.post(url, {"votes": []}, format="json").status_code != 403
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+        bump_shared_version(self.user.pk, user_cache.ttl)
+        assert client.post(url, {"votes": []}, format="json").status_code == 403
+
+    def test_entries_expire_and_are_bounded(self):
+        cache = UserCache(ttl=10, max_size=2)
+        for n in range(3):
+            cache.put(n, User(email=f"{n}@test.com"), cache.generation)
+        assert cache.get(0) is None
+        assert cache.get(2).email == "2@test.com"
+        with mock.patch("accounts.authentication.time.monotonic", return_value=10 ** 9):
+            assert cache.get(2) is None
 
-# Create your tests here.
+    def test_load_racing_an_invalidation_is_not_cached(self):
+        cache = UserCache(ttl=10, max_size=2)
+        generation = cache.generation
+        cache.invalidate("1")
+        cache.put("1", User(email="stale@test.com"), generation)
+        assert cache.get("1") is None
@@ -1,7 +1,8 @@
 # accounts/urls.py
 from django.urls import path
-from .views import RegisterView
+from .views import MyVotesView, RegisterView
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
+    path("me/votes/", MyVotesView.as_view(), name="my-votes"),
 ]
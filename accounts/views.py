@@ -1,6 +1,27 @@
 from rest_framework import generics, permissions
-from .serializers import RegisterSerializer
+from polls.models import Vote
+from polls.pagination import VoteHistoryCursorPagination
+from .serializers import RegisterSerializer, VoteHistorySerializer
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]  # <-- Add this line
+
+
+class MyVotesView(generics.ListAPIView):
+    """The requesting user's votes, newest first, with poll and option inlined."""
+    serializer_class = VoteHistorySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = VoteHistoryCursorPagination
+
+    def get_queryset(self):
+        # One joined query per page; the cursor walks idx_votes_user_voted
+        return (
+            Vote.objects.filter(user=self.request.user)
+            .select_related('poll', 'option')
+            .only(
+                'id', 'voted_at',
+                'poll__id', 'poll__question', 'poll__allow_multiple', 'poll__expires_at',
+                'option__id', 'option__option_text',
+            )
+        )
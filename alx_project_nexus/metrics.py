@@ -0,0 +1,297 @@
+"""
+In-process metrics with a Prometheus text exposition view.
+
+Metrics live in the memory of each worker process; Prometheus is expected to
+scrape every worker (or sum them at query time). Code that wants to report a
+cache lookup for the current request calls ``record_cache_lookup``; it is a
+no-op unless ``RequestMetricsMiddleware`` is sampling the request.
+"""
+import contextvars
+import hmac
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return series[-1] if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for label_values, series in items:
+            for bound, bucket_count in zip(self.buckets, series):
+                labels = _format_labels(self.labels, label_values, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {bucket_count}"
+            yield f"{self.name}_bucket{_format_labels(self.labels, label_values, [('le', '+Inf')])} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labels, buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "nexus_request_duration_seconds", "Time spent in the Django app per request.", ("view", "method"))
+VIEW_DURATION = REGISTRY.histogram(
+    "nexus_view_duration_seconds", "Time spent inside the view per request.", ("view", "method"))
+DB_DURATION = REGISTRY.histogram(
+    "nexus_db_duration_seconds", "Time spent running SQL per request.", ("view", "method"))
+DB_QUERIES = REGISTRY.histogram(
+    "nexus_db_queries", "SQL queries per request.", ("view", "method"), buckets=QUERY_COUNT_BUCKETS)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "nexus_cache_lookups_total", "Cache lookups by result.", ("view", "result"))
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "cache_hits", "cache_misses", "view_started", "view_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.view_started = None
+        self.view_time = None
+
+
+current_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+def record_cache_lookup(hit):
+    stats = current_stats.get()
+    if stats is None:
+        return
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries += 1
+
+
+def _install_query_recorder(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(_install_query_recorder, dispatch_uid="nexus_request_metrics")
+
+
+def _start_view_timer():
+    stats = current_stats.get()
+    if stats is not None:
+        stats.view_started = time.perf_counter()
+
+
+def _server_timing(stats, total):
+    parts = [f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"']
+    if stats.cache_hits or stats.cache_misses:
+        parts.append(f'cache;desc="{stats.cache_hits} hits, {stats.cache_misses} misses"')
+    if stats.view_time is not None:
+        parts.append(f"view;dur={stats.view_time * 1000:.1f}")
+    parts.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record SQL, cache and view timings per URL name for a sample of requests.
+
+    ``REQUEST_METRICS_SAMPLE_RATE`` (0 to 1) picks the share of requests that
+    are measured; unsampled requests cost one ``random()`` call. When
+    ``REQUEST_METRICS_SERVER_TIMING`` is on, sampled responses to staff users
+    (or to anyone under ``DEBUG``) carry a ``Server-Timing`` header; timings
+    would otherwise tell any client how the server spends its time.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 0.01)
+        self.server_timing = getattr(settings, "REQUEST_METRICS_SERVER_TIMING", True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django wraps a sync process_view in a thread hop on async stacks.
+            self.process_view = self._aprocess_view
+
+    def _sampled(self):
+        return self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        _install_query_recorder(connection)
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self._finish(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self._finish(request, response, stats, time.perf_counter() - started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _start_view_timer()
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        _start_view_timer()
+
+    def _finish(self, request, response, stats, total):
+        if stats.view_started is not None:
+            stats.view_time = time.perf_counter() - stats.view_started
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else None) or "<unresolved>"
+        method = request.method
+        REQUEST_DURATION.observe(total, view, method)
+        DB_DURATION.observe(stats.db_time, view, method)
+        DB_QUERIES.observe(stats.queries, view, method)
+        if stats.view_time is not None:
+            VIEW_DURATION.observe(stats.view_time, view, method)
+        if stats.cache_hits:
+            CACHE_LOOKUPS.inc(view, "hit", amount=stats.cache_hits)
+        if stats.cache_misses:
+            CACHE_LOOKUPS.inc(view, "miss", amount=stats.cache_misses)
+        # DRF sets request.user once it authenticates the request
+        staff = getattr(getattr(request, "user", None), "is_staff", False)
+        if self.server_timing and (staff or settings.DEBUG):
+            response["Server-Timing"] = _server_timing(stats, total)
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition, guarded by ``METRICS_TOKEN``.
+
+    Without a token it is only served under ``DEBUG``; otherwise it answers 404.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token and not settings.DEBUG:
+        raise Http404
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, token):
+            return HttpResponse("Unauthorized\n", status=401, content_type="text/plain")
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,123 @@
+"""
+Opt-in profiler for API views.
+
+``ViewProfilerMiddleware`` runs the view under ``cProfile`` for a sampled
+share of requests (``PROFILING_SAMPLE_RATE``) and for requests that send the
+``X-Profile`` header with the value of ``PROFILING_TOKEN``. Each profile is
+written to ``PROFILING_DIR`` as ``<view>__<timestamp>__<id>.prof``; the oldest
+files are removed once the directory grows past ``PROFILING_MAX_BYTES``.
+``manage.py profile_report`` aggregates the saved files.
+
+The middleware calls the view itself from ``process_view``, so it must be the
+last entry in ``MIDDLEWARE``.
+"""
+import cProfile
+import hmac
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+FILE_SUFFIX = ".prof"
+
+# cProfile can only have one active profiler at a time on newer Pythons.
+_profiler_lock = threading.Lock()
+
+
+def profile_dir():
+    return Path(getattr(settings, "PROFILING_DIR", Path(settings.BASE_DIR) / "profiles"))
+
+
+def _safe_view_name(view_name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", ".", view_name or "unresolved")
+
+
+def view_name_of(path):
+    """Return the view name tag of a saved profile file."""
+    return Path(path).name.split("__", 1)[0]
+
+
+def prune(directory, max_bytes):
+    """Delete the oldest profiles until the directory fits in ``max_bytes``."""
+    files = sorted(directory.glob(f"*{FILE_SUFFIX}"), key=lambda path: path.stat().st_mtime)
+    total = sum(path.stat().st_size for path in files)
+    for path in files:
+        if total <= max_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
+
+
+def save_profile(profiler, view_name):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    path = directory / f"{_safe_view_name(view_name)}__{stamp}__{uuid.uuid4().hex[:8]}{FILE_SUFFIX}"
+    profiler.dump_stats(str(path))
+    prune(directory, getattr(settings, "PROFILING_MAX_BYTES", 50 * 1024 * 1024))
+    return path
+
+
+def _run_profiled(request, view_func, view_args, view_kwargs):
+    if not _profiler_lock.acquire(blocking=False):
+        return view_func(request, *view_args, **view_kwargs)  # another profile is running
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = view_func(request, *view_args, **view_kwargs)
+            if callable(getattr(response, "render", None)):
+                response = response.render()  # DRF renders lazily; include it
+        finally:
+            profiler.disable()
+        try:
+            path = save_profile(profiler, request.resolver_match.view_name)
+            response[PROFILE_HEADER + "-Id"] = path.name
+        except OSError:
+            logger.exception("Failed to save view profile")
+        return response
+    finally:
+        _profiler_lock.release()
+
+
+class ViewProfilerMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        self.token = getattr(settings, "PROFILING_TOKEN", None)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def _wanted(self, request, view_func):
+        if iscoroutinefunction(view_func):
+            return False  # cProfile only follows the current thread
+        supplied = request.headers.get(PROFILE_HEADER)
+        if supplied and self.token and hmac.compare_digest(supplied, self.token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self._wanted(request, view_func):
+            return None
+        return _run_profiled(request, view_func, view_args, view_kwargs)
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if not self._wanted(request, view_func):
+            return None
+        return await sync_to_async(_run_profiled)(request, view_func, view_args, view_kwargs)
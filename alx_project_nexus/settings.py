@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
+    "alx_project_nexus.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -58,6 +59,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "alx_project_nexus.profiling.ViewProfilerMiddleware",  # must stay last
 ]
 
 ROOT_URLCONF = "alx_project_nexus.urls"
@@ -138,7 +140,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -159,14 +161,103 @@ CORS_ALLOW_ALL_ORIGINS = True   # restrict in production
     }
 }"""
 
-# Use in-memory cache 
+# Two-tier cache: a per-process L1 for hot poll payloads in front of the shared
+# cache (see alx_project_nexus/tiered_cache.py). With CACHE_REDIS_URL the shared
+# cache is Redis and invalidations go out over Redis pub/sub; without it both are
+# in-process stand-ins, which is enough for development and tests.
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
 CACHES = {
     "default": {
+        "BACKEND": "alx_project_nexus.tiered_cache.TwoTierCache",
+        "LOCATION": "nexus-l1",
+        "OPTIONS": {
+            "L2": "shared",
+            "L1_MAX_ENTRIES": int(os.getenv('CACHE_L1_MAX_ENTRIES', '10000')),
+            "L1_TIMEOUT": float(os.getenv('CACHE_L1_TIMEOUT', '5')),  # bounds staleness if a message is lost
+            "L1_KEY_PREFIXES": [
+                "poll_version:", "poll_detail_version:", "poll_results:", "categories", "polls_trending:",
+            ],
+            # Keyed by the poll's cache version, so a written payload never changes
+            "L1_IMMUTABLE_PREFIXES": ["poll_results:"],
+            "BROADCAST": (
+                "alx_project_nexus.tiered_cache.RedisBroadcast" if CACHE_REDIS_URL
+                else "alx_project_nexus.tiered_cache.LocalBroadcast"
+            ),
+            "BROADCAST_OPTIONS": {"URL": CACHE_REDIS_URL} if CACHE_REDIS_URL else {},
+        },
+    },
+    "shared": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": CACHE_REDIS_URL,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    } if CACHE_REDIS_URL else {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": "unique-snowflake",
-    }
+    },
 }
 
+# Vote counters: "direct" updates Option.votes_count inside the vote
+# transaction, "buffered" records deltas in memory and flushes them in batches.
+VOTE_COUNTER_MODE = os.getenv('VOTE_COUNTER_MODE', 'direct')
+VOTE_COUNTER_SHARDS = int(os.getenv('VOTE_COUNTER_SHARDS', '16'))
+VOTE_COUNTER_FLUSH_INTERVAL = float(os.getenv('VOTE_COUNTER_FLUSH_INTERVAL', '1.0'))  # seconds
+VOTE_COUNTER_FLUSH_THRESHOLD = int(os.getenv('VOTE_COUNTER_FLUSH_THRESHOLD', '500'))  # pending increments
+VOTE_COUNTER_AUTOFLUSH = True
+
+# Audit log: "async" queues AuditLog rows after commit and bulk-inserts them
+# from a background thread, "sync" writes them inside the request transaction.
+AUDIT_LOG_MODE = os.getenv('AUDIT_LOG_MODE', 'sync' if os.getenv('TESTING') else 'async')
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', '200'))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', '1.0'))  # seconds
+AUDIT_LOG_MAX_QUEUE = int(os.getenv('AUDIT_LOG_MAX_QUEUE', '10000'))
+
+# Live results stream (SSE, served over ASGI)
+LIVE_RESULTS_HEARTBEAT = 15  # seconds between keep-alive comments on idle streams
+LIVE_RESULTS_CHECK_INTERVAL = 2.0  # seconds between checks for changes made by other processes
+LIVE_RESULTS_QUEUE_SIZE = 16  # events buffered per subscriber before it is resynced
+
+# Trending polls: a vote's weight in the trending score halves every
+# TRENDING_HALF_LIFE seconds.
+TRENDING_HALF_LIFE = int(os.getenv('TRENDING_HALF_LIFE', str(6 * 60 * 60)))
+
+# Build poll list/detail responses from values() rows instead of ModelSerializer
+# instances (same output; see polls/fastpath.py).
+POLL_READ_FAST_PATH = os.getenv('POLL_READ_FAST_PATH', 'True') == 'True'
+
+# Request metrics: share of requests measured (0 turns it off), Server-Timing
+# headers on measured responses to staff (anyone under DEBUG), and the bearer
+# token for /metrics, which is only served without one under DEBUG.
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv('REQUEST_METRICS_SAMPLE_RATE', '0.01'))
+REQUEST_METRICS_SERVER_TIMING = os.getenv('REQUEST_METRICS_SERVER_TIMING', 'True') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# View profiler: profile a share of requests, or any request sending
+# "X-Profile: <PROFILING_TOKEN>". Saved profiles are capped by total size.
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN')
+PROFILING_DIR = os.getenv('PROFILING_DIR', str(BASE_DIR / 'profiles'))
+PROFILING_MAX_BYTES = int(os.getenv('PROFILING_MAX_BYTES', str(50 * 1024 * 1024)))
+
+# Vote admission control: token buckets per user and per poll (votes per
+# second, burst size) and a cap on concurrent vote transactions per poll.
+# VOTE_ADMISSION_CACHE names a cache alias to share the limits between processes
+# (use "shared", the L2, rather than the two-tier "default").
+VOTE_ADMISSION_ENABLED = os.getenv('VOTE_ADMISSION_ENABLED', 'True') == 'True'
+VOTE_USER_RATE = float(os.getenv('VOTE_USER_RATE', '2'))
+VOTE_USER_BURST = int(os.getenv('VOTE_USER_BURST', '10'))
+VOTE_POLL_RATE = float(os.getenv('VOTE_POLL_RATE', '500'))
+VOTE_POLL_BURST = int(os.getenv('VOTE_POLL_BURST', '1000'))
+VOTE_POLL_MAX_IN_FLIGHT = int(os.getenv('VOTE_POLL_MAX_IN_FLIGHT', '16'))
+VOTE_ADMISSION_CACHE = os.getenv('VOTE_ADMISSION_CACHE') or None
+
+# JWT authentication keeps resolved users per process for AUTH_USER_CACHE_TTL
+# seconds (0 disables it), at most AUTH_USER_CACHE_SIZE of them; changes reach
+# other processes through a per-user version in the default cache.
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '30'))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', '10000'))
+
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
@@ -0,0 +1,303 @@
+"""
+Two-tier cache backend: a per-process L1 in front of a shared L2.
+
+``TwoTierCache`` reads through a small in-memory LRU (L1) that every thread of
+the process shares, and falls back to another configured cache alias (L2,
+e.g. Redis) shared by all workers. Writes go to L2. The key is then dropped
+from this process's L1 and published on a broadcast channel, so every other
+worker drops it too. L1 entries also expire after ``L1_TIMEOUT`` seconds,
+which bounds how long a lost invalidation message can leave a value stale.
+
+Poll payload keys embed the poll's cache version (see polls/caching.py), so
+most reads are two L1 hits: the version, then the payload under it. A key
+under ``L1_IMMUTABLE_PREFIXES`` never changes its value once written, so
+filling it is not broadcast; it is only kept in the writer's L1.
+
+Configuration::
+
+    CACHES = {
+        "default": {
+            "BACKEND": "alx_project_nexus.tiered_cache.TwoTierCache",
+            "LOCATION": "nexus-l1",
+            "OPTIONS": {
+                "L2": "shared",
+                "L1_MAX_ENTRIES": 10000,
+                "L1_TIMEOUT": 5,
+                "L1_KEY_PREFIXES": ["poll_version:", "poll_results:"],  # default: every key
+                "L1_IMMUTABLE_PREFIXES": ["poll_results:"],
+                "BROADCAST": "alx_project_nexus.tiered_cache.RedisBroadcast",
+                "BROADCAST_OPTIONS": {"URL": "redis://127.0.0.1:6379/0", "CHANNEL": "nexus:cache"},
+            },
+        },
+        "shared": {...},
+    }
+
+``LocalBroadcast`` is the in-process stand-in for the channel: with it and a
+``LocMemCache`` L2, several ``LOCATION`` names in one process behave like
+separate workers, which is how the tests exercise invalidation.
+"""
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CLEAR = "*"
+
+
+class LocalStore:
+    """
+    The L1 of one ``LOCATION``: pickled values by key, LRU-bounded, with expiry.
+
+    A reader takes a ``token`` before reading L2 and hands it to ``put``. Every
+    invalidation leaves a tombstone with its sequence number on the key, and
+    ``put`` refuses a value read before the key's latest tombstone, so a slow
+    reader cannot bring back what an invalidation just dropped. Invalidations
+    of other keys do not affect it.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._tombstones = OrderedDict()  # key -> sequence of its last invalidation
+        self._floor = 0  # puts with older tokens are refused, e.g. after clear()
+
+    def token(self):
+        return self._sequence
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            pickled, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return pickle.loads(pickled)  # a copy per caller, as with LocMemCache
+
+    def put(self, key, value, token):
+        """Keep ``value`` unless ``key`` was invalidated since ``token`` was taken."""
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if token < self._floor or token < self._tombstones.get(key, 0):
+                return  # L2 may have been read before that write
+            self._entries[key] = (pickled, time.monotonic() + self.timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys):
+        with self._lock:
+            self._sequence += 1
+            for key in keys:
+                self._entries.pop(key, None)
+                self._tombstones.pop(key, None)
+                self._tombstones[key] = self._sequence
+            while len(self._tombstones) > self.max_entries:
+                # Forgetting a tombstone must not let an older read through
+                _, sequence = self._tombstones.popitem(last=False)
+                self._floor = max(self._floor, sequence)
+
+    def clear(self):
+        with self._lock:
+            self._sequence += 1
+            self._floor = self._sequence
+            self._entries.clear()
+            self._tombstones.clear()
+
+    def receive(self, keys):
+        """Apply an invalidation message from the broadcast channel."""
+        if CLEAR in keys:
+            self.clear()
+        else:
+            self.discard(keys)
+
+
+class LocalBroadcast:
+    """Invalidation channel between the L1 stores of this process only."""
+
+    _channels = {}
+    _lock = threading.Lock()
+
+    def __init__(self, CHANNEL="nexus:cache"):
+        self.channel = CHANNEL
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._channels.setdefault(self.channel, []).append(callback)
+
+    def publish(self, keys):
+        with self._lock:
+            callbacks = list(self._channels.get(self.channel, ()))
+        for callback in callbacks:
+            callback(keys)
+
+
+class RedisBroadcast:
+    """Invalidation channel over Redis pub/sub, listened to by one daemon thread per process."""
+
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, URL, CHANNEL="nexus:cache"):
+        import redis  # optional: only needed when this channel is configured
+
+        self.client = redis.Redis.from_url(URL)
+        self.channel = CHANNEL
+
+    def subscribe(self, callback):
+        thread = threading.Thread(target=self._listen, args=(callback,), name="cache-invalidation", daemon=True)
+        thread.start()
+
+    def _listen(self, callback):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Messages sent while disconnected are lost, so start from a clean L1
+                callback([CLEAR])
+                for message in pubsub.listen():
+                    callback(json.loads(message["data"]))
+            except Exception:
+                logger.exception("Cache invalidation listener failed; reconnecting")
+                time.sleep(self.RECONNECT_DELAY)
+
+    def publish(self, keys):
+        try:
+            self.client.publish(self.channel, json.dumps(keys))
+        except Exception:
+            logger.exception("Failed to publish cache invalidation")
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _get_store(name, options):
+    """
+    The process-wide L1 of ``name`` and its channel; set up on first use.
+
+    Stores are keyed by pid as well: a forked worker neither inherits the
+    listener thread of its parent nor its L1, so it sets up its own.
+    """
+    key = (os.getpid(), name)
+    with _stores_lock:
+        if key not in _stores:
+            store = LocalStore(options.get("L1_MAX_ENTRIES", 10000), options.get("L1_TIMEOUT", 5))
+            broadcast_class = import_string(options.get("BROADCAST", "alx_project_nexus.tiered_cache.LocalBroadcast"))
+            broadcast = broadcast_class(**options.get("BROADCAST_OPTIONS", {}))
+            broadcast.subscribe(store.receive)
+            _stores[key] = (store, broadcast)
+        return _stores[key]
+
+
+class TwoTierCache(BaseCache):
+    """Django cache backend reading through ``LocalStore`` in front of the ``L2`` alias."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.l2_alias = options["L2"]
+        self.prefixes = tuple(options.get("L1_KEY_PREFIXES") or ())
+        self.immutable_prefixes = tuple(options.get("L1_IMMUTABLE_PREFIXES") or ())
+        self._name = location or "default"
+        self._options = options
+        self._pid = None
+        self._tier = None
+
+    def _local_tier(self):
+        # Resolved on use, not in __init__, so an instance made before a fork
+        # (e.g. by a preloading server) picks up the child's own store
+        if self._pid != os.getpid():
+            self._tier = _get_store(self._name, self._options)
+            self._pid = os.getpid()
+        return self._tier
+
+    @property
+    def store(self):
+        return self._local_tier()[0]
+
+    @property
+    def broadcast(self):
+        return self._local_tier()[1]
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias]
+
+    def _local_key(self, key, version):
+        # Versions are resolved here so L1 and the messages agree with what L2 stores
+        if self.prefixes and not key.startswith(self.prefixes):
+            return None
+        return self.make_key(key, version=version)
+
+    def _invalidate(self, *local_keys):
+        local_keys = [key for key in local_keys if key is not None]
+        if local_keys:
+            self.store.discard(local_keys)
+            self.broadcast.publish(local_keys)
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            value = self.store.get(local_key)
+            if value is not None:
+                return value
+            token = self.store.token()
+        value = self.l2.get(key, default, version=version)
+        if local_key is not None and value is not None and value is not default:
+            self.store.put(local_key, value, token)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        token = self.store.token()
+        self.l2.set(key, value, timeout=timeout, version=version)
+        local_key = self._local_key(key, version)
+        if local_key is not None and self.immutable_prefixes and key.startswith(self.immutable_prefixes):
+            # Any copy elsewhere already holds this value; nothing to invalidate
+            self.store.put(local_key, value, token)
+        else:
+            self._invalidate(local_key)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # Misses are never kept in L1, so a successful add has nothing to invalidate
+        return self.l2.add(key, value, timeout=timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.l2.delete(key, version=version)
+        self._invalidate(self._local_key(key, version))
+        return deleted
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version=version)
+        self._invalidate(self._local_key(key, version))
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def has_key(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None and self.store.get(local_key) is not None:
+            return True
+        return self.l2.has_key(key, version=version)
+
+    def clear(self):
+        self.l2.clear()
+        self.store.clear()
+        self.broadcast.publish([CLEAR])
@@ -0,0 +1,202 @@
+"""
+Admission control for ``vote_view``.
+
+A burst of votes on one poll piles up on the locks of its vote and option
+rows, holding workers and connections until reads starve too. ``admit``
+decides up front whether a vote may go ahead:
+
+* a token bucket per user (``VOTE_USER_RATE`` votes per second, bursts of
+  ``VOTE_USER_BURST``),
+* a token bucket per poll (``VOTE_POLL_RATE`` / ``VOTE_POLL_BURST``),
+* at most ``VOTE_POLL_MAX_IN_FLIGHT`` vote transactions per poll at a time.
+
+A rejected vote is answered with 429 and ``Retry-After`` right away, and is
+counted in ``nexus_votes_shed_total`` by reason. A vote rejected by a later
+check gives back the tokens it already took, so a busy poll does not use up
+its voters' budget, nor a full in-flight cap the poll's.
+
+State lives in process by default. Setting ``VOTE_ADMISSION_CACHE`` to a cache
+alias shares it between processes through that cache; there the buckets are
+approximated by fixed windows of ``burst / rate`` seconds, because the cache
+API offers atomic ``incr`` but no compare-and-set.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from alx_project_nexus import metrics
+
+USER = "user"
+POLL = "poll"
+IN_FLIGHT = "in_flight"
+
+MAX_LOCAL_KEYS = 100_000  # idle buckets beyond this are forgotten, oldest first
+IN_FLIGHT_TTL = 60  # seconds; bounds a shared in-flight count leaked by a crashed worker
+
+VOTES_ADMITTED = metrics.REGISTRY.counter(
+    "nexus_votes_admitted_total", "Vote requests let through by admission control.")
+VOTES_SHED = metrics.REGISTRY.counter(
+    "nexus_votes_shed_total", "Vote requests rejected by admission control.", ("reason",))
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class LocalBackend:
+    """Token buckets and in-flight counts of this process."""
+
+    def __init__(self, max_keys=MAX_LOCAL_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    clock = staticmethod(time.monotonic)
+
+    def take(self, key, rate, burst, now=None):
+        """Take one token; return 0 if admitted, else the seconds until a token is available."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def refund(self, key, rate, burst, now=None):
+        """Give back a token taken by ``take`` at ``now``."""
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(burst, tokens + 1), updated)
+
+    def enter(self, key, limit):
+        with self._lock:
+            count = self._in_flight.get(key, 0)
+            if count >= limit:
+                return False
+            self._in_flight[key] = count + 1
+            return True
+
+    def leave(self, key):
+        with self._lock:
+            count = self._in_flight.pop(key, 0) - 1
+            if count > 0:
+                self._in_flight[key] = count
+
+
+class CacheBackend:
+    """Shared limits in a Django cache, e.g. Redis, so every process sees the same counts."""
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def _incr(self, key, timeout):
+        self.cache.add(key, 0, timeout=timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add and incr; start a fresh count
+            self.cache.add(key, 1, timeout=timeout)
+            return 1
+
+    def take(self, key, rate, burst, now=None):
+        now = self.clock() if now is None else now
+        window = burst / rate
+        index = int(now // window)
+        count = self._incr(f"admission:{key}:{index}", timeout=math.ceil(window) + 1)
+        if count <= burst:
+            return 0
+        return (index + 1) * window - now
+
+    def refund(self, key, rate, burst, now=None):
+        # The window the token came from, which may have ended since
+        now = self.clock() if now is None else now
+        index = int(now // (burst / rate))
+        try:
+            self.cache.decr(f"admission:{key}:{index}")
+        except ValueError:
+            pass  # the window has passed; its count no longer matters
+
+    def enter(self, key, limit):
+        if self._incr(f"admission:{key}", timeout=IN_FLIGHT_TTL) <= limit:
+            return True
+        self.leave(key)
+        return False
+
+    def leave(self, key):
+        try:
+            self.cache.decr(f"admission:{key}")
+        except ValueError:
+            pass  # expired; nothing left to release
+
+
+_local_backend = LocalBackend()
+
+
+def get_backend():
+    alias = _setting("VOTE_ADMISSION_CACHE", None)
+    return CacheBackend(alias) if alias else _local_backend
+
+
+class Decision:
+    """Outcome of ``admit``. An admitted vote must ``release`` its slot when done."""
+
+    def __init__(self, backend=None, slot=None, reason=None, retry_after=0):
+        self.backend = backend
+        self.slot = slot
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def admitted(self):
+        return self.reason is None
+
+    def release(self):
+        if self.slot is not None:
+            self.backend.leave(self.slot)
+            self.slot = None
+
+
+def _rejected(reason, wait):
+    VOTES_SHED.inc(reason)
+    return Decision(reason=reason, retry_after=max(1, math.ceil(wait)))
+
+
+def admit(user_id, poll_id):
+    """Decide whether ``user_id`` may vote on ``poll_id`` now; see the module docstring."""
+    if not _setting("VOTE_ADMISSION_ENABLED", True):
+        return Decision()
+    backend = get_backend()
+    now = backend.clock()  # one time for take and refund, so both hit the same window
+
+    user_bucket = (f"user:{user_id}", _setting("VOTE_USER_RATE", 2.0), _setting("VOTE_USER_BURST", 10))
+    wait = backend.take(*user_bucket, now=now)
+    if wait:
+        return _rejected(USER, wait)
+    poll_bucket = (f"poll:{poll_id}", _setting("VOTE_POLL_RATE", 500.0), _setting("VOTE_POLL_BURST", 1000))
+    wait = backend.take(*poll_bucket, now=now)
+    if wait:
+        backend.refund(*user_bucket, now=now)
+        return _rejected(POLL, wait)
+
+    slot = f"in_flight:{poll_id}"
+    if not backend.enter(slot, _setting("VOTE_POLL_MAX_IN_FLIGHT", 16)):
+        backend.refund(*user_bucket, now=now)
+        backend.refund(*poll_bucket, now=now)
+        return _rejected(IN_FLIGHT, 1)
+    VOTES_ADMITTED.inc()
+    return Decision(backend=backend, slot=slot)
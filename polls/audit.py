@@ -0,0 +1,176 @@
+"""
+Batched AuditLog writer.
+
+In the ``"async"`` audit mode ``log_action`` only builds the ``AuditLog`` row
+and queues it once the surrounding transaction commits. A background thread
+writes queued rows with ``bulk_create`` whenever ``AUDIT_LOG_BATCH_SIZE``
+entries are waiting or ``AUDIT_LOG_FLUSH_INTERVAL`` seconds have passed, and
+drains the queue on shutdown. If a batch fails, e.g. because one entry's user
+was deleted meanwhile, its rows are retried one by one, so only the rows that
+cannot be written are lost (and logged). The ``"sync"`` mode writes rows inline, inside
+the caller's transaction, which is what the tests use.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+SYNC = "sync"
+ASYNC = "async"
+
+
+def audit_mode():
+    return getattr(settings, "AUDIT_LOG_MODE", SYNC)
+
+
+class AuditLogWriter:
+    """Queue of pending ``AuditLog`` rows and the thread that writes them."""
+
+    _STOP = object()
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_queue=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, entries):
+        for position, entry in enumerate(entries):
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                # Never drop audit rows: write the overflow in the caller's thread.
+                self.write(entries[position:])
+                return
+
+    def _next_batch(self):
+        """
+        Wait for the next batch: up to ``batch_size`` entries collected within
+        ``flush_interval`` of the first one. Returns ``(entries, stop_requested)``.
+        """
+        try:
+            entry = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return [], False
+        if entry is self._STOP:
+            return [], True
+
+        batch = [entry]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if entry is self._STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            batch, stopped = self._next_batch()
+            if batch:
+                self.write(batch)
+                close_old_connections()
+        self.flush()
+        close_old_connections()
+
+    def write(self, entries):
+        if not entries:
+            return
+        from .models import AuditLog
+
+        try:
+            # Writes run outside any transaction (writer thread, on_commit), so
+            # this is the whole transaction: the batch lands entirely or not at all
+            with transaction.atomic(savepoint=False):
+                AuditLog.objects.bulk_create(entries, batch_size=self.batch_size)
+        except Exception:
+            logger.warning("Failed to write %d audit log entries at once; retrying one by one", len(entries))
+            for entry in entries:
+                self._write_one(entry)
+
+    def _write_one(self, entry):
+        try:
+            entry.save(force_insert=True)
+        except Exception:
+            logger.exception(
+                "Dropped audit log entry: user=%s action=%r target=%s:%s",
+                entry.user_id, entry.action, entry.target_type, entry.target_id,
+            )
+
+    def flush(self):
+        """Write everything that is currently queued from the calling thread."""
+        batch = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not self._STOP:
+                batch.append(entry)
+        for start in range(0, len(batch), self.batch_size):
+            self.write(batch[start:start + self.batch_size])
+
+    def stop(self, timeout=5):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join(timeout)
+        self.flush()
+
+
+_writer = None
+_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _lock:
+            if _writer is None:
+                _writer = AuditLogWriter(
+                    batch_size=getattr(settings, "AUDIT_LOG_BATCH_SIZE", 200),
+                    flush_interval=getattr(settings, "AUDIT_LOG_FLUSH_INTERVAL", 1.0),
+                    max_queue=getattr(settings, "AUDIT_LOG_MAX_QUEUE", 10000),
+                )
+                atexit.register(_writer.stop)
+    return _writer
+
+
+def record(entries):
+    """Persist unsaved ``AuditLog`` instances according to ``AUDIT_LOG_MODE``."""
+    from .models import AuditLog
+
+    entries = list(entries)
+    if not entries:
+        return
+    if audit_mode() != ASYNC:
+        if len(entries) == 1:
+            entries[0].save(force_insert=True)
+        else:
+            AuditLog.objects.bulk_create(entries)
+        return
+
+    writer = get_writer()
+    writer.start()
+    transaction.on_commit(lambda: writer.submit(entries))
@@ -0,0 +1,317 @@
+"""
+Concurrent load benchmark for the vote and results paths.
+
+``run_benchmark`` seeds users, polls, options and votes under a unique run
+prefix, then drives ``cast_vote`` and ``PollResultsView`` from a pool of
+threads (each with its own database connection) and returns a JSON-ready
+report: throughput, p50/p95/p99 latency and SQL queries per operation, lock
+waits sampled from ``pg_stat_activity`` and counter drift after the run.
+Used by ``manage.py benchmark_votes``.
+
+``run_read_benchmark`` times the ``ModelSerializer`` and ``values()`` read
+paths of the poll list and detail against each other on the same data, for
+``manage.py benchmark_poll_reads``.
+"""
+import random
+import statistics
+import threading
+import time
+import uuid
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from . import audit, counters
+from .models import Option, Poll, Vote
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class OperationStats:
+    def __init__(self):
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, latency, queries, error=False):
+        with self._lock:
+            self.latencies.append(latency)
+            self.queries.append(queries)
+            self.errors += error
+
+    def report(self, elapsed):
+        latencies = sorted(self.latencies)
+        return {
+            "operations": len(latencies),
+            "errors": self.errors,
+            "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else None,
+            "latency_ms": {
+                "mean": _ms(statistics.fmean(latencies)) if latencies else None,
+                "p50": _ms(percentile(latencies, 50)),
+                "p95": _ms(percentile(latencies, 95)),
+                "p99": _ms(percentile(latencies, 99)),
+                "max": _ms(latencies[-1]) if latencies else None,
+            },
+            "queries_per_op": round(statistics.fmean(self.queries), 2) if self.queries else None,
+        }
+
+
+class LockWaitSampler(threading.Thread):
+    """Samples how many backends wait on a lock, PostgreSQL only."""
+
+    SQL = "SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock' AND datname = current_database()"
+
+    def __init__(self, interval=0.05):
+        super().__init__(name="benchmark-lock-sampler", daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            with connection.cursor() as cursor:
+                while not self._stopped.is_set():
+                    cursor.execute(self.SQL)
+                    self.samples.append(cursor.fetchone()[0])
+                    self._stopped.wait(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def report(self):
+        if not self.samples:
+            return None
+        return {
+            "samples": len(self.samples),
+            "max_waiting": max(self.samples),
+            "mean_waiting": round(statistics.fmean(self.samples), 3),
+            "share_of_samples_with_waits": round(sum(1 for s in self.samples if s) / len(self.samples), 3),
+        }
+
+
+def _deadlocks():
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+        return cursor.fetchone()[0]
+
+
+def seed(run_id, users, polls, options, votes, multi_ratio=0.0, rng=random):
+    """Create the benchmark data set; every user email carries ``run_id``."""
+    from .views import cast_votes_bulk
+
+    User = get_user_model()
+    password = make_password(None)
+    user_objs = User.objects.bulk_create([
+        User(email=f"bench-{run_id}-{n}@bench.invalid", username=f"bench-{run_id}-{n}", password=password)
+        for n in range(users)
+    ])
+    poll_objs = Poll.objects.bulk_create([
+        Poll(question=f"Benchmark poll {n}", created_by=user_objs[0], allow_multiple=rng.random() < multi_ratio)
+        for n in range(polls)
+    ])
+    option_objs = Option.objects.bulk_create([
+        Option(poll=poll, option_text=f"Option {n}") for poll in poll_objs for n in range(options)
+    ])
+    options_by_poll = {}
+    for option in option_objs:
+        options_by_poll.setdefault(option.poll_id, []).append(option.id)
+
+    for start in range(0, votes, 1000):
+        batch = []
+        for _ in range(min(1000, votes - start)):
+            poll = rng.choice(poll_objs)
+            batch.append((rng.choice(user_objs).pk, poll.id, rng.choice(options_by_poll[poll.id])))
+        cast_votes_bulk(batch)
+    return user_objs, poll_objs, options_by_poll
+
+
+def counter_drift(poll_ids):
+    if counters.is_buffered():
+        counters.flush()
+    stored = dict(Option.objects.filter(poll_id__in=poll_ids).values_list("id", "votes_count"))
+    actual = dict(
+        Vote.objects.filter(poll_id__in=poll_ids)
+        .values("option_id")
+        .annotate(n=Count("id"))
+        .values_list("option_id", "n")
+    )
+    drift = {o_id: count - actual.get(o_id, 0) for o_id, count in stored.items() if count != actual.get(o_id, 0)}
+    return {
+        "options_checked": len(stored),
+        "drifted_options": len(drift),
+        "total_abs_drift": sum(abs(d) for d in drift.values()),
+    }
+
+
+def cleanup(run_id):
+    # Polls, options, votes and audit rows cascade from the users.
+    get_user_model().objects.filter(email__startswith=f"bench-{run_id}-").delete()
+
+
+def run_benchmark(users=50, polls=10, options=4, votes=1000, threads=8, duration=10.0,
+                  read_ratio=0.5, multi_ratio=0.0, hot_polls=None, keep_data=False, seed_value=None):
+    """Seed, hammer and measure; returns the report dict."""
+    from .views import PollResultsView, cast_vote
+
+    rng = random.Random(seed_value)
+    run_id = uuid.uuid4().hex[:8]
+    started_at = timezone.now()
+
+    seed_started = time.perf_counter()
+    user_objs, poll_objs, options_by_poll = seed(run_id, users, polls, options, votes, multi_ratio, rng)
+    seed_seconds = time.perf_counter() - seed_started
+    # A small set of "trending" polls concentrates contention, like a live event
+    target_polls = poll_objs[:hot_polls] if hot_polls else poll_objs
+
+    stats = {"vote": OperationStats(), "results": OperationStats()}
+    results_view = PollResultsView.as_view()
+    factory = APIRequestFactory()
+    deadline = time.monotonic() + duration
+    sampler = LockWaitSampler() if connection.vendor == "postgresql" else None
+    deadlocks_before = _deadlocks()
+
+    def worker(worker_rng):
+        try:
+            while time.monotonic() < deadline:
+                user = worker_rng.choice(user_objs)
+                poll = worker_rng.choice(target_polls)
+                is_read = worker_rng.random() < read_ratio
+                error = False
+                with CaptureQueriesContext(connection) as ctx:
+                    began = time.perf_counter()
+                    try:
+                        if is_read:
+                            request = factory.get(f"/api/polls/{poll.id}/results/")
+                            force_authenticate(request, user=user)
+                            error = results_view(request, poll_id=poll.id).status_code != 200
+                        else:
+                            cast_vote(user, poll.id, worker_rng.choice(options_by_poll[poll.id]))
+                    except Exception:
+                        error = True
+                    latency = time.perf_counter() - began
+                stats["results" if is_read else "vote"].add(latency, len(ctx.captured_queries), error)
+        finally:
+            connections.close_all()
+
+    pool = [
+        threading.Thread(target=worker, args=(random.Random(rng.random()),), name=f"benchmark-{n}")
+        for n in range(threads)
+    ]
+    if sampler:
+        sampler.start()
+    run_started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - run_started
+    if sampler:
+        sampler.stop()
+    deadlocks_after = _deadlocks()
+
+    if audit.audit_mode() == audit.ASYNC:
+        audit.get_writer().flush()  # before cleanup deletes the users they point to
+    try:
+        drift = counter_drift([poll.id for poll in poll_objs])
+    finally:
+        if not keep_data:
+            cleanup(run_id)
+
+    return {
+        "run_id": run_id,
+        "started_at": started_at.isoformat(),
+        "environment": {
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "vote_counter_mode": counters.counter_mode(),
+            "audit_log_mode": getattr(settings, "AUDIT_LOG_MODE", "sync"),
+        },
+        "config": {
+            "users": users, "polls": polls, "options": options, "seed_votes": votes,
+            "threads": threads, "duration_s": duration, "read_ratio": read_ratio,
+            "multi_ratio": multi_ratio, "hot_polls": hot_polls, "seed": seed_value,
+        },
+        "seed_seconds": round(seed_seconds, 3),
+        "elapsed_s": round(elapsed, 3),
+        "operations": {name: op.report(elapsed) for name, op in stats.items()},
+        "lock_waits": sampler.report() if sampler else None,
+        "deadlocks": None if deadlocks_before is None else deadlocks_after - deadlocks_before,
+        "counter_drift": drift,
+    }
+
+
+def _time_calls(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - began)
+    timings.sort()
+    return {"mean_ms": _ms(statistics.fmean(timings)), "p50_ms": _ms(percentile(timings, 50))}
+
+
+def run_read_benchmark(polls=200, options=4, page_size=100, repeat=50, keep_data=False):
+    """Time list pages and detail reads through both serialization paths."""
+    from . import fastpath
+    from .serializers import PollDetailSerializer, PollSerializer
+
+    run_id = uuid.uuid4().hex[:8]
+    _, poll_objs, _ = seed(run_id, users=1, polls=polls, options=options, votes=0)
+    try:
+        poll_ids = [poll.id for poll in poll_objs]
+        listing = Poll.objects.filter(id__in=poll_ids).order_by("-created_at", "-id")
+        detail_id = poll_ids[0]
+
+        paths = {
+            "list": {
+                "serializer": lambda: PollSerializer(list(listing[:page_size]), many=True).data,
+                "values": lambda: fastpath.poll_list(fastpath.poll_rows(listing)[:page_size]),
+            },
+            "detail": {
+                "serializer": lambda: PollDetailSerializer(
+                    Poll.objects.select_related("category", "created_by").prefetch_related("options").get(id=detail_id)
+                ).data,
+                "values": lambda: fastpath.poll_detail(fastpath.detail_queryset().get(id=detail_id)),
+            },
+        }
+        report = {}
+        for name, variants in paths.items():
+            for func in variants.values():
+                func()  # warm up
+            results = {variant: _time_calls(func, repeat) for variant, func in variants.items()}
+            slow, fast = results["serializer"]["mean_ms"], results["values"]["mean_ms"]
+            results["speedup"] = round(slow / fast, 2) if fast else None
+            report[name] = results
+    finally:
+        if not keep_data:
+            cleanup(run_id)
+
+    return {
+        "run_id": run_id,
+        "config": {"polls": polls, "options": options, "page_size": page_size, "repeat": repeat},
+        "database": connection.vendor,
+        "results": report,
+    }
@@ -0,0 +1,122 @@
+"""
+Versioned cache keys for per-poll payloads and the category directory.
+
+Every poll has a version number in the cache. Cached payloads embed the version
+in their key, so bumping it makes all of them unreachable at once and they can
+be cached for a long time. A missing version is seeded from the clock, which
+keeps it moving forward even after the version key itself was evicted.
+
+The same version doubles as the ETag of the poll's detail and results, so a
+conditional GET can be answered from the cache alone. Deleting a poll, directly
+or by a cascade, drops its versions, so an old ETag cannot be answered with 304
+for a poll that is gone. Changes that only show in
+the detail payload, such as ``comments_count``, bump a separate detail version
+that is folded into the detail ETag, so they leave cached results alone.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils.http import parse_etags
+
+
+CATEGORIES_VERSION_KEY = "categories_version"
+
+
+def _version_key(poll_id):
+    return f"poll_version:{poll_id}"
+
+
+def _detail_version_key(poll_id):
+    return f"poll_detail_version:{poll_id}"
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Not cached yet (or evicted): any fresh seed is newer than before.
+        _version(key)
+        return cache.incr(key)
+
+
+def poll_version(poll_id):
+    return _version(_version_key(poll_id))
+
+
+def bump_poll_version(poll_id):
+    return _bump(_version_key(poll_id))
+
+
+def bump_poll_detail_version(poll_id):
+    """Invalidate the poll's detail payload only."""
+    return _bump(_detail_version_key(poll_id))
+
+
+def invalidate_poll_detail(poll_id):
+    """
+    Bump the detail version now and once the transaction commits, so a detail
+    read from pre-commit data in between is not served under the new ETag.
+    """
+    def bump():
+        try:
+            bump_poll_detail_version(poll_id)
+        except Exception:
+            pass  # the ETag only goes stale; never fail the write for it
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def forget_poll(poll_id):
+    # A version seeded later from the clock is newer than any ETag handed out
+    cache.delete_many([_version_key(poll_id), _detail_version_key(poll_id)])
+
+
+@receiver(post_delete, sender="polls.Poll")
+def _poll_deleted(sender, instance, **kwargs):
+    forget_poll(instance.pk)
+    transaction.on_commit(lambda poll_id=instance.pk: forget_poll(poll_id))
+
+
+def categories_version():
+    """Version of the category directory, shared by all categories."""
+    return _version(CATEGORIES_VERSION_KEY)
+
+
+def bump_categories_version():
+    return _bump(CATEGORIES_VERSION_KEY)
+
+
+def poll_etag(kind, poll_id, version=None):
+    if version is None:
+        version = poll_version(poll_id)
+    return f'"{kind}-{poll_id}-{version}"'
+
+
+def poll_detail_etag(poll_id):
+    return poll_etag("poll", poll_id, f"{poll_version(poll_id)}.{_version(_detail_version_key(poll_id))}")
+
+
+def etag_matches(request, etag):
+    """Whether the request's ``If-None-Match`` covers ``etag`` (weak comparison)."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    return any(tag.removeprefix("W/") == etag for tag in parse_etags(header))
+
+
+def results_key(poll_id, version=None):
+    if version is None:
+        version = poll_version(poll_id)
+    return f"poll_results:{poll_id}:v{version}"
@@ -0,0 +1,179 @@
+"""
+Poll counts per category.
+
+``CategoryStats`` keeps each category's total, public and open-ended (no
+``expires_at``) poll counts, so the directory never needs a ``Count`` over the
+whole poll table. Every ``Poll.save()`` and ``delete()``, including cascades
+(e.g. deleting the creator) and admin edits, records its change through the
+signal receivers below, in the same transaction as the poll write; a save
+first reads the stored row, locked when inside a transaction, to know what it
+replaces. ``bulk_create`` sends no signals, so the bulk import calls ``record``
+itself. ``QuerySet.update()`` of the category, visibility or expiry is not
+counted; ``manage.py rebuild_category_stats`` repairs the table.
+
+Polls with an expiry stop being active by themselves, so ``directory`` adds the
+polls that have not expired yet to the open-ended count. That query is a range
+scan of ``idx_polls_expires_category`` (index-only once vacuumed): its cost
+grows with the number of unexpired timed polls, not with the poll table, and it
+runs once per directory cache miss.
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import caching
+
+_UPSERT_SQL = """
+    INSERT INTO {table} (category_id, polls, public_polls, open_ended_polls)
+    VALUES {rows}
+    ON CONFLICT (category_id) DO UPDATE SET
+        polls = {table}.polls + EXCLUDED.polls,
+        public_polls = {table}.public_polls + EXCLUDED.public_polls,
+        open_ended_polls = {table}.open_ended_polls + EXCLUDED.open_ended_polls
+"""
+
+
+def counts(poll):
+    """``(category_id, (polls, public_polls, open_ended_polls))`` a poll contributes."""
+    return poll.category_id, (1, int(poll.is_public), int(poll.expires_at is None))
+
+
+def deltas(before=(), after=()):
+    """Count changes from polls' ``counts`` in ``before`` to those in ``after``."""
+    result = defaultdict(lambda: [0, 0, 0])
+    for sign, states in ((-1, before), (1, after)):
+        for category_id, values in states:
+            if category_id is None:
+                continue
+            for i, value in enumerate(values):
+                result[category_id][i] += sign * value
+    return {category_id: tuple(values) for category_id, values in result.items() if any(values)}
+
+
+def apply(changes):
+    """Add ``{category_id: (polls, public_polls, open_ended_polls)}`` to the stored counts."""
+    from .models import CategoryStats
+
+    category_ids = sorted(changes, key=str)  # a stable order keeps concurrent upserts from deadlocking
+    if not category_ids:
+        return
+    if connection.vendor not in ("postgresql", "sqlite"):
+        with transaction.atomic():
+            for category_id in category_ids:
+                stats, _ = CategoryStats.objects.select_for_update().get_or_create(category_id=category_id)
+                stats.polls += changes[category_id][0]
+                stats.public_polls += changes[category_id][1]
+                stats.open_ended_polls += changes[category_id][2]
+                stats.save()
+        return
+
+    field = CategoryStats._meta.get_field("category")
+    params = []
+    for category_id in category_ids:
+        params.extend((field.get_db_prep_save(category_id, connection), *changes[category_id]))
+    sql = _UPSERT_SQL.format(
+        table=connection.ops.quote_name(CategoryStats._meta.db_table),
+        rows=", ".join(["(%s, %s, %s, %s)"] * len(category_ids)),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def record(before=(), after=()):
+    """Apply the change from ``before`` to ``after`` (lists of ``counts``) and invalidate the directory."""
+    changes = deltas(before, after)
+    if changes:
+        apply(changes)
+        transaction.on_commit(caching.bump_categories_version)
+
+
+def rebuild():
+    """Recount every category from the ``Poll`` table."""
+    from .models import CategoryStats, Poll
+
+    rows = (
+        Poll.objects.filter(category__isnull=False)
+        .values("category_id")
+        .annotate(
+            total=Count("id"),
+            public=Count("id", filter=Q(is_public=True)),
+            open_ended=Count("id", filter=Q(expires_at__isnull=True)),
+        )
+    )
+    with transaction.atomic():
+        CategoryStats.objects.all().delete()
+        CategoryStats.objects.bulk_create(
+            CategoryStats(
+                category_id=row["category_id"],
+                polls=row["total"],
+                public_polls=row["public"],
+                open_ended_polls=row["open_ended"],
+            )
+            for row in rows
+        )
+        transaction.on_commit(caching.bump_categories_version)
+    return len(rows)
+
+
+def directory(now=None):
+    """Every category, by name, with ``polls``, ``public_polls`` and ``active_polls``."""
+    from .models import Category, Poll
+
+    now = now or timezone.now()
+    unexpired = dict(
+        Poll.objects.filter(expires_at__gt=now, category__isnull=False)
+        .values("category_id")
+        .annotate(n=Count("*"))  # not "id", which is outside the index
+        .values_list("category_id", "n")
+    )
+    entries = []
+    for category in Category.objects.select_related("stats").order_by("name"):
+        stats = getattr(category, "stats", None)
+        entries.append({
+            "id": str(category.id),
+            "name": category.name,
+            "description": category.description,
+            "polls": stats.polls if stats else 0,
+            "public_polls": stats.public_polls if stats else 0,
+            "active_polls": (stats.open_ended_polls if stats else 0) + unexpired.get(category.id, 0),
+        })
+    return entries
+
+
+def _stored_counts(poll):
+    """``counts`` of the row ``poll`` is about to overwrite, or None for a new poll."""
+    from .models import Poll
+
+    if poll._state.adding:
+        return None
+    rows = Poll.objects.filter(pk=poll.pk)
+    if connection.in_atomic_block:
+        rows = rows.select_for_update()  # a concurrent update could move it after this read
+    row = rows.values_list("category_id", "is_public", "expires_at").first()
+    if row is None:
+        return None
+    category_id, is_public, expires_at = row
+    return category_id, (1, int(is_public), int(expires_at is None))
+
+
+@receiver(pre_save, sender="polls.Poll")
+def _poll_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._category_counts_before = _stored_counts(instance)
+
+
+@receiver(post_save, sender="polls.Poll")
+def _poll_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    before = instance.__dict__.pop("_category_counts_before", None)
+    record(before=[before] if before else [], after=[counts(instance)])
+
+
+@receiver(post_delete, sender="polls.Poll")
+def _poll_deleted(sender, instance, **kwargs):
+    record(before=[counts(instance)])
@@ -0,0 +1,36 @@
+"""
+``Poll.comments_count`` bookkeeping.
+
+The count moves in the same transaction as the comment row, from the model
+signals, so every path is covered: the comment views, the admin, and cascades
+such as deleting a commenter's account. Deleting the poll itself skips the
+per-comment decrements, since the counter goes with it.
+``QuerySet.bulk_create`` sends no signals and must not be used for comments.
+"""
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import caching
+
+
+def _add(poll_id, delta):
+    from .models import Poll
+
+    Poll.objects.filter(id=poll_id).update(comments_count=F("comments_count") + delta)
+    caching.invalidate_poll_detail(poll_id)
+
+
+@receiver(post_save, sender="polls.Comment")
+def _comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _add(instance.poll_id, 1)
+
+
+@receiver(post_delete, sender="polls.Comment")
+def _comment_deleted(sender, instance, origin=None, **kwargs):
+    from .models import Poll
+
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model is not Poll:
+        _add(instance.poll_id, -1)
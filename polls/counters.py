@@ -0,0 +1,268 @@
+"""
+Write-behind vote counters.
+
+In the ``"buffered"`` counter mode ``cast_vote`` no longer updates
+``Option.votes_count`` inside the vote transaction. Each increment is recorded
+in an in-process, lock-striped counter store once the vote commits, and a
+background flusher folds the aggregated deltas into ``Option.votes_count`` in
+batches. ``Vote`` rows are still written synchronously, so the counters can
+always be rebuilt from them.
+
+Reads that need exact numbers merge the unflushed deltas with
+``pending(poll_id)``. Only this process's deltas are visible there; other
+workers see them once they are flushed, which bumps each flushed poll's cache
+version so cached payloads and ETags move on.
+"""
+import atexit
+import itertools
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+
+from . import caching
+
+logger = logging.getLogger(__name__)
+
+DIRECT = "direct"
+BUFFERED = "buffered"
+
+FLUSH_BATCH_SIZE = 500
+
+
+def counter_mode():
+    return getattr(settings, "VOTE_COUNTER_MODE", DIRECT)
+
+
+def is_buffered():
+    return counter_mode() == BUFFERED
+
+
+class ShardedCounterStore:
+    """
+    Per-option vote deltas split across lock-striped shards.
+
+    Every thread is pinned to one shard, so concurrent voters rarely contend
+    on the same lock. ``pending`` sums the shards plus any batch that is being
+    flushed, read in one snapshot of the store. That snapshot is not taken
+    atomically with ``Option.votes_count``: a reader that reads the row while
+    the flush commits can miss a flushing batch or count it twice, until the
+    flush's version bump makes it read again.
+    """
+
+    def __init__(self, shards=16, flush_threshold=500):
+        self._shards = [({}, threading.Lock()) for _ in range(max(1, shards))]
+        self._next_shard = itertools.count()
+        self._local = threading.local()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._ops = 0
+        self.flush_threshold = flush_threshold
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+    def _shard(self):
+        index = getattr(self._local, "index", None)
+        if index is None:
+            index = self._local.index = next(self._next_shard) % len(self._shards)
+        return self._shards[index]
+
+    def incr(self, poll_id, option_id, delta=1):
+        counts, lock = self._shard()
+        key = (str(poll_id), str(option_id))
+        with lock:
+            counts[key] = counts.get(key, 0) + delta
+        # Approximate on purpose: it only decides when to wake the flusher.
+        self._ops += 1
+        if self.flush_threshold and self._ops >= self.flush_threshold:
+            self.wakeup.set()
+
+    def pending(self, poll_id):
+        """Return ``{option_id: delta}`` of this process's unflushed deltas for a poll."""
+        poll_id = str(poll_id)
+        merged = {}
+        # Held across the shards so a concurrent drain is seen entirely or not at all
+        with self._inflight_lock:
+            sources = [dict(self._inflight)]
+            for counts, lock in self._shards:
+                with lock:
+                    sources.append({k: v for k, v in counts.items() if k[0] == poll_id})
+        for source in sources:
+            for (p_id, o_id), delta in source.items():
+                if p_id == poll_id:
+                    merged[o_id] = merged.get(o_id, 0) + delta
+        return {o_id: delta for o_id, delta in merged.items() if delta}
+
+    def drain(self):
+        """
+        Move every shard into the in-flight batch and return it.
+
+        The batch stays visible to ``pending`` until ``commit_drain`` or
+        ``restore`` is called.
+        """
+        with self._inflight_lock:
+            if self._inflight:
+                raise RuntimeError("A counter flush is already in progress")
+            for counts, lock in self._shards:
+                with lock:
+                    for key, delta in counts.items():
+                        self._inflight[key] = self._inflight.get(key, 0) + delta
+                    counts.clear()
+            self._ops = 0
+            return {key: delta for key, delta in self._inflight.items() if delta}
+
+    def commit_drain(self):
+        with self._inflight_lock:
+            self._inflight = {}
+
+    def restore(self):
+        """Put a failed in-flight batch back into the shards."""
+        with self._inflight_lock:
+            inflight, self._inflight = self._inflight, {}
+        counts, lock = self._shard()
+        with lock:
+            for key, delta in inflight.items():
+                counts[key] = counts.get(key, 0) + delta
+
+    def clear(self):
+        with self._inflight_lock:
+            self._inflight = {}
+            for counts, lock in self._shards:
+                with lock:
+                    counts.clear()
+            self._ops = 0
+
+
+class CounterFlusher(threading.Thread):
+    """Daemon thread that flushes the store on an interval or when woken."""
+
+    def __init__(self, store, interval):
+        super().__init__(name="vote-counter-flusher", daemon=True)
+        self.store = store
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            self.store.wakeup.wait(self.interval)
+            self.store.wakeup.clear()
+            self._flush()
+
+    def _flush(self):
+        try:
+            flush(self.store)
+        except Exception:
+            logger.exception("Failed to flush vote counters")
+        finally:
+            close_old_connections()
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        self.store.wakeup.set()
+        self.join(timeout)
+        self._flush()
+
+
+_store = None
+_flusher = None
+_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = ShardedCounterStore(
+                    shards=getattr(settings, "VOTE_COUNTER_SHARDS", 16),
+                    flush_threshold=getattr(settings, "VOTE_COUNTER_FLUSH_THRESHOLD", 500),
+                )
+    return _store
+
+
+def _ensure_flusher(store):
+    global _flusher
+    if _flusher is not None or not getattr(settings, "VOTE_COUNTER_AUTOFLUSH", True):
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = CounterFlusher(store, getattr(settings, "VOTE_COUNTER_FLUSH_INTERVAL", 1.0))
+            _flusher.start()
+            atexit.register(_flusher.stop)
+
+
+def record(poll_id, option_id, delta=1):
+    """Record a committed vote delta for later flushing."""
+    store = get_store()
+    store.incr(poll_id, option_id, delta)
+    _ensure_flusher(store)
+
+
+def pending(poll_id):
+    if not is_buffered():
+        return {}
+    return get_store().pending(poll_id)
+
+
+def merge_pending(poll_id, options):
+    """Add the poll's unflushed deltas to the ``votes_count`` of serialized ``options``, in place."""
+    deltas = pending(poll_id)
+    if deltas:
+        for option in options:
+            option["votes_count"] += deltas.get(str(option["id"]), 0)
+    return options
+
+
+def apply_deltas(deltas):
+    """
+    Add ``{option_id: delta}`` to ``Option.votes_count`` with one UPDATE per batch.
+
+    Options are updated in id order so concurrent flushes lock rows in a
+    consistent order.
+    """
+    from .models import Option
+
+    option_ids = sorted(str(o_id) for o_id, delta in deltas.items() if delta)
+    deltas = {str(o_id): delta for o_id, delta in deltas.items()}
+    with transaction.atomic():
+        for start in range(0, len(option_ids), FLUSH_BATCH_SIZE):
+            batch = option_ids[start:start + FLUSH_BATCH_SIZE]
+            increment = models.Case(
+                *[models.When(id=o_id, then=models.Value(deltas[o_id])) for o_id in batch],
+                default=models.Value(0),
+                output_field=models.IntegerField(),
+            )
+            Option.objects.filter(id__in=batch).update(votes_count=models.F("votes_count") + increment)
+    return len(option_ids)
+
+
+def _bump_version(poll_id):
+    try:
+        caching.bump_poll_version(poll_id)
+    except Exception:
+        logger.exception("Failed to bump the cache version of poll %s", poll_id)
+
+
+def flush(store=None):
+    """Write the buffered deltas to the database. Returns the number of options updated."""
+    store = store or get_store()
+    with store.flush_lock:
+        deltas = store.drain()
+        by_option = {}
+        poll_ids = set()
+        for (poll_id, option_id), delta in deltas.items():
+            by_option[option_id] = by_option.get(option_id, 0) + delta
+            if delta:
+                poll_ids.add(poll_id)
+        try:
+            with transaction.atomic():
+                updated = apply_deltas(by_option) if by_option else 0
+                # Cached payloads and ETags were built from the old counts
+                for poll_id in sorted(poll_ids):
+                    transaction.on_commit(lambda poll_id=poll_id: _bump_version(poll_id))
+        except Exception:
+            store.restore()
+            raise
+        store.commit_drain()
+    return updated
@@ -0,0 +1,91 @@
+"""
+``values()``-based read path for the poll list and detail endpoints.
+
+DRF's ``ModelSerializer`` instantiates a model per row and resolves every field
+through ``to_representation``. For reads, the endpoints instead fetch plain
+``values()`` rows and turn them into dicts with mappers compiled once from the
+serializers' field lists, so the output has exactly the shape of
+``PollSerializer`` / ``PollDetailSerializer``. ``tests/test_fast_serialization``
+checks the parity; ``manage.py benchmark_poll_reads`` compares the speed.
+"""
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .models import Option, Poll
+from .serializers import OptionSerializer, PollDetailSerializer, PollSerializer
+
+
+def enabled():
+    return getattr(settings, "POLL_READ_FAST_PATH", True)
+
+
+def _uuid(value):
+    return None if value is None else str(value)
+
+
+def _datetime(value):
+    # Same steps as serializers.DateTimeField with the ISO 8601 output format
+    if value is None:
+        return None
+    if settings.USE_TZ:
+        value = value.astimezone(timezone.get_current_timezone())
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _converter(field):
+    if isinstance(field, (models.UUIDField, models.ForeignKey)):
+        return _uuid
+    if isinstance(field, models.DateTimeField):
+        if api_settings.DATETIME_FORMAT is None:
+            return None
+        if api_settings.DATETIME_FORMAT.lower() != ISO_8601:
+            return serializers.DateTimeField().to_representation
+        return _datetime
+    return None
+
+
+class RowMapper:
+    """Maps ``values()`` rows of ``model`` to the output of a serializer's ``fields``."""
+
+    def __init__(self, model, fields):
+        self.fields = tuple(fields)
+        plan = []
+        for name in self.fields:
+            field = model._meta.get_field(name)
+            plan.append((name, field.attname, _converter(field)))  # FKs render as their pk
+        self.plan = tuple(plan)
+        self.columns = tuple(column for _, column, _ in plan)
+
+    def __call__(self, row):
+        return {name: convert(row[column]) if convert else row[column] for name, column, convert in self.plan}
+
+
+poll_mapper = RowMapper(Poll, PollSerializer.Meta.fields)
+option_mapper = RowMapper(Option, OptionSerializer.Meta.fields)
+_detail_poll_mapper = RowMapper(Poll, [f for f in PollDetailSerializer.Meta.fields if f != "options"])
+
+
+def poll_rows(queryset):
+    """The list queryset as ``values()`` rows carrying what ``poll_mapper`` needs."""
+    return queryset.values(*poll_mapper.columns)
+
+
+def poll_list(rows):
+    return [poll_mapper(row) for row in rows]
+
+
+def detail_queryset():
+    """Poll rows for ``poll_detail``; the mapped ``created_by`` column is all ``IsPollOwner`` reads."""
+    return Poll.objects.only(*_detail_poll_mapper.fields)
+
+
+def poll_detail(poll):
+    """``PollDetailSerializer(poll).data`` for an already loaded poll, options read as rows."""
+    data = _detail_poll_mapper({column: getattr(poll, column) for column in _detail_poll_mapper.columns})
+    options = Option.objects.filter(poll_id=poll.pk).values(*option_mapper.columns)
+    data["options"] = [option_mapper(row) for row in options]
+    return data
@@ -0,0 +1,40 @@
+"""
+Request-scoped identity map.
+
+Permission classes and views often need the same row while handling one
+request, e.g. ``IsPollOwnerForOption`` and ``OptionCreateView`` both need the
+poll. ``get`` loads a row the first time it is asked for and hands the same
+instance to every later caller of that request, so each row is fetched at most
+once. The map lives on the ``HttpRequest`` and is dropped with it; rows are not
+shared between requests.
+
+Locking reads (``select_for_update``) must not go through the map.
+"""
+from django.http import Http404
+
+_ATTR = "_identity_map"
+
+
+def _objects(request):
+    request = getattr(request, "_request", request)  # DRF's Request wraps the HttpRequest
+    objects = getattr(request, _ATTR, None)
+    if objects is None:
+        objects = {}
+        setattr(request, _ATTR, objects)
+    return objects
+
+
+def get(request, model, pk):
+    """The ``model`` row with primary key ``pk``, or ``None``; loaded at most once per request."""
+    key = (model, str(pk))
+    objects = _objects(request)
+    if key not in objects:
+        objects[key] = model._default_manager.filter(pk=pk).first()
+    return objects[key]
+
+
+def get_or_404(request, model, pk):
+    obj = get(request, model, pk)
+    if obj is None:
+        raise Http404(f"No {model._meta.object_name} matches the given query.")
+    return obj
@@ -0,0 +1,133 @@
+"""
+Streaming bulk import of polls from JSON-lines or CSV files.
+
+Rows are read lazily from the stream, validated with ``PollImportRowSerializer``
+and written in chunks: each chunk is one transaction with one ``bulk_create``
+for its polls and one for all of their options. Invalid rows are skipped and
+reported with their line number; they never abort the rest of the file.
+"""
+import csv
+import json
+import uuid
+
+from django.db import transaction
+
+from . import audit, category_stats
+from .models import AuditLog, Category, Option, Poll
+from .serializers import PollImportRowSerializer
+
+FORMATS = ("jsonl", "csv")
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(filename, default="jsonl"):
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return default
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(line_number, row)`` from a text stream; bad JSON yields an error string."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"Invalid JSON: {e}"
+            continue
+        yield line_number, row if isinstance(row, dict) else "Each line must be a JSON object"
+
+
+class CategoryResolver:
+    """Resolves category names or ids to ids, creating missing names once."""
+
+    def __init__(self):
+        self._ids = {}
+
+    def resolve(self, values):
+        missing = {value for value in values if value and value not in self._ids}
+        if not missing:
+            return
+        ids = set()
+        for value in missing:
+            try:
+                ids.add(uuid.UUID(value))
+            except ValueError:
+                pass
+        for category_id in Category.objects.filter(id__in=ids).values_list("id", flat=True):
+            self._ids[str(category_id)] = category_id
+        names = missing - set(self._ids)
+        for category in Category.objects.filter(name__in=names):
+            self._ids[category.name] = category.id
+        for name in names - set(self._ids):
+            self._ids[name] = Category.objects.get_or_create(name=name)[0].id
+
+    def __getitem__(self, value):
+        return self._ids[value] if value else None
+
+
+def _write_chunk(rows, created_by, categories):
+    categories.resolve({row.get("category") for row in rows})
+    polls, options, entries = [], [], []
+    for row in rows:
+        poll = Poll(
+            question=row["question"],
+            description=row.get("description"),
+            category_id=categories[row.get("category")],
+            created_by=created_by,
+            is_public=row["is_public"],
+            allow_multiple=row["allow_multiple"],
+            expires_at=row.get("expires_at"),
+        )
+        polls.append(poll)
+        options.extend(Option(poll=poll, option_text=text) for text in row["options"])
+        entries.append(AuditLog(user=created_by, action="Imported poll", target_type="Poll", target_id=poll.id))
+
+    with transaction.atomic():
+        Poll.objects.bulk_create(polls)
+        Option.objects.bulk_create(options)
+        category_stats.record(after=[category_stats.counts(poll) for poll in polls])
+        audit.record(entries)
+    return len(polls)
+
+
+def import_polls(rows, created_by, chunk_size=500, progress=None):
+    """
+    Create polls from ``(line_number, row)`` pairs, ``chunk_size`` polls per transaction.
+
+    ``progress(imported, failed)`` is called after every chunk. Returns a
+    summary dict with ``imported``, ``failed`` and the first errors by line.
+    """
+    summary = {"imported": 0, "failed": 0, "errors": []}
+    categories = CategoryResolver()
+    chunk = []
+
+    def flush():
+        if chunk:
+            summary["imported"] += _write_chunk(chunk, created_by, categories)
+            chunk.clear()
+            if progress:
+                progress(summary["imported"], summary["failed"])
+
+    for line_number, row in rows:
+        serializer = None if isinstance(row, str) else PollImportRowSerializer(data=row)
+        if serializer is None or not serializer.is_valid():
+            summary["failed"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                errors = row if serializer is None else serializer.errors
+                summary["errors"].append({"line": line_number, "errors": errors})
+            continue
+        chunk.append(serializer.validated_data)
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+    return summary
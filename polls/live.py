@@ -0,0 +1,184 @@
+"""
+In-process fan-out of live poll results for the SSE endpoint.
+
+Every poll with at least one open stream gets one channel. The channel task
+re-reads the results once per change, whether it was woken by ``notify`` (a
+vote or poll edit committed in this process) or by the periodic check that
+picks up changes made by other processes through the shared cache. It then
+pushes the same event to all subscribers, so N open streams cost one read
+instead of N.
+
+A failed read (e.g. a database hiccup) is logged and retried on the next
+tick; subscribers keep their last snapshot in the meantime.
+
+Each subscriber has a small bounded queue. A subscriber that falls behind has
+its backlog dropped and receives a fresh snapshot instead, so a slow client
+never blocks the channel or grows memory without bound.
+
+This relies on a single long-lived event loop per process, i.e. an ASGI server.
+"""
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def results_delta(old, new):
+    """
+    Return the ``delta`` event data between two results payloads, or ``None``
+    if the option set changed and a full snapshot is needed instead.
+    """
+    old_options = {o["id"]: o for o in old["options"]}
+    new_texts = {o["id"]: o["option_text"] for o in new["options"]}
+    if new_texts != {o_id: o["option_text"] for o_id, o in old_options.items()}:
+        return None
+    changed = [
+        {"id": o["id"], "votes_count": o["votes_count"]}
+        for o in new["options"]
+        if old_options[o["id"]]["votes_count"] != o["votes_count"]
+    ]
+    return {"poll_id": new["poll_id"], "options": changed, "total_votes": new["total_votes"]}
+
+
+class Subscription:
+    def __init__(self, channel, size):
+        self.channel = channel
+        self.queue = asyncio.Queue(maxsize=size)
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Backpressure: drop the backlog and resync from a full snapshot.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(event if event is None else ("snapshot", self.channel.snapshot))
+
+
+class PollChannel:
+    def __init__(self, poll_id, snapshot):
+        self.poll_id = poll_id
+        self.snapshot = snapshot
+        self.subscribers = set()
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def publish(self, event):
+        for subscriber in list(self.subscribers):
+            subscriber.push(event)
+
+    async def run(self):
+        from .views import get_poll_results
+
+        while True:
+            try:
+                await asyncio.wait_for(self.changed.wait(), _setting("LIVE_RESULTS_CHECK_INTERVAL", 2.0))
+            except asyncio.TimeoutError:
+                pass
+            self.changed.clear()
+
+            try:
+                payload = await sync_to_async(get_poll_results)(self.poll_id)
+            except Exception:
+                logger.exception("Failed to read results of poll %s; retrying", self.poll_id)
+                continue
+            if payload is None:
+                self.publish(None)  # poll deleted: end all streams
+                return
+            if payload == self.snapshot:
+                continue
+            delta = results_delta(self.snapshot, payload)
+            self.snapshot = payload
+            self.publish(("snapshot", payload) if delta is None else ("delta", delta))
+
+
+class ResultsBroker:
+    def __init__(self):
+        self._channels = {}
+        self._loop = None
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new event loop (e.g. a fresh test loop) cannot reuse old channels.
+            self._channels = {}
+            self._loop = loop
+
+    async def subscribe(self, poll_id):
+        """Open a subscription, or return ``None`` if the poll does not exist."""
+        from .views import get_poll_results
+
+        self._bind_loop()
+        key = str(poll_id)
+        channel = self._channels.get(key)
+        if channel is None or channel.task.done():
+            snapshot = await sync_to_async(get_poll_results)(poll_id)
+            if snapshot is None:
+                return None
+            channel = self._channels.get(key)
+            if channel is None or channel.task.done():
+                channel = self._channels[key] = PollChannel(key, snapshot)
+                channel.task = asyncio.ensure_future(channel.run())
+
+        subscription = Subscription(channel, _setting("LIVE_RESULTS_QUEUE_SIZE", 16))
+        channel.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        channel = subscription.channel
+        channel.subscribers.discard(subscription)
+        if not channel.subscribers and self._channels.get(channel.poll_id) is channel:
+            del self._channels[channel.poll_id]
+            channel.task.cancel()
+
+    def notify(self, poll_id):
+        """Wake the poll's channel. Safe to call from any thread."""
+        channel = self._channels.get(str(poll_id))
+        loop = self._loop
+        if channel is None or loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(channel.changed.set)
+        except RuntimeError:
+            pass  # loop shut down in the meantime
+
+
+_broker = ResultsBroker()
+
+
+def get_broker():
+    return _broker
+
+
+def notify(poll_id):
+    _broker.notify(poll_id)
+
+
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+async def event_stream(subscription):
+    heartbeat = _setting("LIVE_RESULTS_HEARTBEAT", 15)
+    try:
+        yield format_event("snapshot", subscription.channel.snapshot)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if event is None:
+                yield format_event("end", {"poll_id": subscription.channel.poll_id})
+                return
+            yield format_event(*event)
+    finally:
+        _broker.unsubscribe(subscription)
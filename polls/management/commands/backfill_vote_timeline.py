@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from polls import timeline
+from polls.models import Poll
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the vote timeline rollups from Vote rows, one poll per transaction. "
+        "Votes are counted at their voted_at, so earlier choices of changed votes are "
+        "not restored. Votes cast on a poll while it is being rebuilt may be counted "
+        "twice; run it when the polls are quiet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll", dest="poll_ids", action="append", default=[], help="Only rebuild this poll id.")
+        parser.add_argument("--chunk-size", type=int, default=100, help="Polls per chunk (default: 100).")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between chunks.")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        polls = Poll.objects.order_by("id").values_list("id", flat=True)
+        if options["poll_ids"]:
+            polls = polls.filter(id__in=options["poll_ids"])
+
+        last_id = None
+        rebuilt = rows = 0
+        while True:
+            chunk = polls.filter(id__gt=last_id) if last_id else polls
+            chunk = list(chunk[:options["chunk_size"]])
+            if not chunk:
+                break
+            for poll_id in chunk:
+                rows += timeline.rebuild(poll_id)
+                rebuilt += 1
+            last_id = chunk[-1]
+            self.stdout.write(f"Rebuilt {rebuilt} polls ({rows} rollup rows)")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {rebuilt} polls, {rows} rollup rows"))
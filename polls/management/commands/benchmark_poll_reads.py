@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.benchmark import run_read_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic polls and compare the ModelSerializer and values() read paths "
+        "of the poll list and detail endpoints (query plus serialization time). "
+        "Prints a JSON report; seeded rows are deleted unless --keep-data is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--polls", type=int, default=200)
+        parser.add_argument("--options", type=int, default=4, help="Options per poll.")
+        parser.add_argument("--page-size", type=int, default=100, help="Polls per list page.")
+        parser.add_argument("--repeat", type=int, default=50, help="Timed calls per path.")
+        parser.add_argument("--keep-data", action="store_true")
+
+    def handle(self, *args, **options):
+        for name in ("polls", "options", "page_size", "repeat"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1")
+
+        report = run_read_benchmark(
+            polls=options["polls"],
+            options=options["options"],
+            page_size=options["page_size"],
+            repeat=options["repeat"],
+            keep_data=options["keep_data"],
+        )
+        self.stdout.write(json.dumps(report, indent=2))
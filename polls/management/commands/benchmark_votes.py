@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.benchmark import run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic data set and drive cast_vote and PollResultsView from many "
+        "threads, then report throughput, latency percentiles, SQL queries per "
+        "operation, lock waits and counter drift as JSON. Runs against the configured "
+        "database; the seeded rows are deleted afterwards unless --keep-data is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--polls", type=int, default=10)
+        parser.add_argument("--options", type=int, default=4, help="Options per poll.")
+        parser.add_argument("--votes", type=int, default=1000, help="Votes seeded before the run.")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+        parser.add_argument("--read-ratio", type=float, default=0.5, help="Share of results reads (0-1).")
+        parser.add_argument("--multi-ratio", type=float, default=0.0, help="Share of multiple-choice polls (0-1).")
+        parser.add_argument("--hot-polls", type=int, help="Only target the first N polls to concentrate contention.")
+        parser.add_argument("--seed", type=int, help="Random seed for a repeatable workload.")
+        parser.add_argument("--keep-data", action="store_true")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        for name in ("users", "polls", "options", "threads"):
+            if options[name] < 1:
+                raise CommandError(f"--{name} must be at least 1")
+        for name in ("read_ratio", "multi_ratio"):
+            if not 0 <= options[name] <= 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be between 0 and 1")
+
+        report = run_benchmark(
+            users=options["users"],
+            polls=options["polls"],
+            options=options["options"],
+            votes=options["votes"],
+            threads=options["threads"],
+            duration=options["duration"],
+            read_ratio=options["read_ratio"],
+            multi_ratio=options["multi_ratio"],
+            hot_polls=options["hot_polls"],
+            keep_data=options["keep_data"],
+            seed_value=options["seed"],
+        )
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from polls import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a final results snapshot for every poll that expired more than --grace "
+        "seconds ago and has none yet. The results endpoint then serves the snapshot "
+        "without aggregating. Meant to run periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace", type=int, default=snapshots.DEFAULT_GRACE,
+            help=f"Seconds to wait after expiry (default: {snapshots.DEFAULT_GRACE}).",
+        )
+        parser.add_argument("--limit", type=int, help="Freeze at most this many polls.")
+
+    def handle(self, *args, **options):
+        if options["grace"] < 0:
+            raise CommandError("--grace cannot be negative")
+
+        polls = snapshots.expired_unfrozen(options["grace"]).only("id", "question")
+        if options["limit"]:
+            polls = polls[:options["limit"]]
+
+        frozen = 0
+        for poll in polls.iterator():
+            payload = snapshots.freeze(poll)
+            frozen += 1
+            self.stdout.write(f"Froze poll {poll.id} ({payload['total_votes']} votes)")
+        self.stdout.write(self.style.SUCCESS(f"Froze {frozen} polls"))
@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.importing import FORMATS, detect_format, import_polls, iter_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import polls and their options from a JSON-lines or CSV file. The file is "
+        "streamed row by row and written in chunked transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import (.jsonl or .csv).")
+        parser.add_argument("--created-by", required=True, help="Email of the user owning the imported polls.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Polls per transaction (default: 500).")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        try:
+            user = get_user_model().objects.get(email=options["created_by"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['created_by']}")
+
+        fmt = options["format"] or detect_format(options["path"])
+
+        def progress(imported, failed):
+            self.stdout.write(f"Imported {imported} polls ({failed} rows failed)")
+
+        with open(options["path"], encoding="utf-8", newline="") as stream:
+            summary = import_polls(iter_rows(stream, fmt), user, options["chunk_size"], progress)
+
+        for error in summary["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {summary['imported']} polls imported, {summary['failed']} rows failed."
+        ))
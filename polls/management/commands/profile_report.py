@@ -0,0 +1,42 @@
+import pstats
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from alx_project_nexus import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize the view profiles saved by ViewProfilerMiddleware: how many "
+        "profiles exist per view and the top functions across all of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="Profile directory (default: PROFILING_DIR).")
+        parser.add_argument("--view", dest="views", action="append", default=[], help="Only include this view name.")
+        parser.add_argument("--limit", type=int, default=25, help="Number of functions to show (default: 25).")
+        parser.add_argument(
+            "--sort",
+            choices=["cumulative", "tottime", "ncalls"],
+            default="cumulative",
+            help="Sort key for the function table (default: cumulative).",
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options["dir"]) if options["dir"] else profiling.profile_dir()
+        files = sorted(directory.glob(f"*{profiling.FILE_SUFFIX}")) if directory.is_dir() else []
+        if options["views"]:
+            files = [path for path in files if profiling.view_name_of(path) in options["views"]]
+        if not files:
+            raise CommandError(f"No profiles found in {directory}")
+
+        per_view = Counter(profiling.view_name_of(path) for path in files)
+        self.stdout.write(f"{len(files)} profiles in {directory}")
+        for view, count in per_view.most_common():
+            self.stdout.write(f"  {view}: {count}")
+        self.stdout.write("")
+
+        stats = pstats.Stats(*(str(path) for path in files), stream=self.stdout)
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["limit"])
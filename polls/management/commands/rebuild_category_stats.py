@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from polls import category_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the per-category poll counts from the Poll table in one transaction. "
+        "Run it after polls were removed or edited outside the API, e.g. by deleting "
+        "their creator or through the admin."
+    )
+
+    def handle(self, *args, **options):
+        categories = category_stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Recounted {categories} categories"))
@@ -0,0 +1,104 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from polls import caching
+from polls.models import Option, Poll, Vote
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare Option.votes_count with the number of Vote rows, poll by poll, "
+        "and optionally fix the drift. Safe to run against production: polls are "
+        "processed in small chunks with a pause in between, and progress can be "
+        "checkpointed to a file so an interrupted run resumes where it stopped. "
+        "With VOTE_COUNTER_MODE=buffered, run it after the counters were flushed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rewrite drifted counters.")
+        parser.add_argument("--poll", dest="poll_ids", action="append", default=[], help="Only check this poll id.")
+        parser.add_argument("--chunk-size", type=int, default=100, help="Polls per chunk (default: 100).")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between chunks.")
+        parser.add_argument("--start-after", help="Skip polls up to and including this poll id.")
+        parser.add_argument(
+            "--checkpoint",
+            help="File holding the last processed poll id; read on start and updated after every chunk.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        checkpoint = Path(options["checkpoint"]) if options["checkpoint"] else None
+        last_id = options["start_after"]
+        if last_id is None and checkpoint and checkpoint.exists():
+            last_id = checkpoint.read_text().strip() or None
+            if last_id:
+                self.stdout.write(f"Resuming after poll {last_id}")
+
+        polls = Poll.objects.order_by("id").values_list("id", flat=True)
+        if options["poll_ids"]:
+            polls = polls.filter(id__in=options["poll_ids"])
+
+        checked = drifted = fixed = 0
+        while True:
+            chunk = polls.filter(id__gt=last_id) if last_id else polls
+            chunk = list(chunk[:options["chunk_size"]])
+            if not chunk:
+                break
+
+            for poll_id in chunk:
+                drift = self.reconcile_poll(poll_id, fix=options["fix"])
+                checked += 1
+                for option_id, stored, actual in drift:
+                    drifted += 1
+                    self.stdout.write(
+                        f"poll {poll_id} option {option_id}: votes_count={stored} votes={actual} "
+                        f"(drift {stored - actual:+d})"
+                    )
+                if drift and options["fix"]:
+                    fixed += len(drift)
+
+            last_id = str(chunk[-1])
+            if checkpoint:
+                checkpoint.write_text(last_id)
+            self.stdout.write(f"Checked {checked} polls (last {last_id})")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {checked} polls checked, {drifted} drifted options, {fixed} fixed."
+        ))
+
+    def reconcile_poll(self, poll_id, fix=False):
+        """
+        Return ``[(option_id, votes_count, actual_votes)]`` for drifted options.
+
+        When fixing, the poll's option rows are locked before counting, so
+        votes landing concurrently are applied on top of the corrected value.
+        """
+        with transaction.atomic():
+            options = Option.objects.filter(poll_id=poll_id).order_by("id")
+            if fix:
+                options = options.select_for_update()
+            stored = dict(options.values_list("id", "votes_count"))
+            actual = dict(
+                Vote.objects.filter(poll_id=poll_id)
+                .values("option_id")
+                .annotate(total=Count("id"))
+                .values_list("option_id", "total")
+            )
+            drift = [
+                (option_id, votes_count, actual.get(option_id, 0))
+                for option_id, votes_count in stored.items()
+                if votes_count != actual.get(option_id, 0)
+            ]
+            if fix and drift:
+                for option_id, _, votes in drift:
+                    Option.objects.filter(id=option_id).update(votes_count=votes)
+                transaction.on_commit(lambda: caching.bump_poll_version(poll_id))
+        return drift
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0004_remove_vote_unique_user_poll_vote_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="vote",
+            name="single_choice",
+            field=models.BooleanField(default=False),
+        ),
+        # Flag existing votes on single-choice polls. Users that somehow hold
+        # several votes on such a poll are left unflagged so the constraint
+        # below can be created; 0014 merges them into their latest vote.
+        migrations.RunSQL(
+            """
+            UPDATE polls_vote SET single_choice = TRUE
+            WHERE poll_id IN (SELECT id FROM polls_poll WHERE NOT allow_multiple)
+              AND NOT EXISTS (
+                  SELECT 1 FROM polls_vote other
+                  WHERE other.user_id = polls_vote.user_id
+                    AND other.poll_id = polls_vote.poll_id
+                    AND other.id <> polls_vote.id
+              );
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="vote",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("single_choice", True)),
+                fields=("user", "poll"),
+                name="unique_user_single_choice_vote",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0005_vote_single_choice"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="poll",
+            name="idx_polls_created_by",
+        ),
+        migrations.RemoveIndex(
+            model_name="poll",
+            name="idx_polls_category_id",
+        ),
+        migrations.RemoveIndex(
+            model_name="poll",
+            name="idx_polls_is_public",
+        ),
+        migrations.AddIndex(
+            model_name="poll",
+            index=models.Index(fields=["-created_at", "-id"], name="idx_polls_created"),
+        ),
+        migrations.AddIndex(
+            model_name="poll",
+            index=models.Index(
+                fields=["created_by", "-created_at", "-id"],
+                name="idx_polls_created_by_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="poll",
+            index=models.Index(
+                fields=["category", "-created_at", "-id"],
+                name="idx_polls_category_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="poll",
+            index=models.Index(
+                fields=["is_public", "-created_at", "-id"],
+                name="idx_polls_is_public_created",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:21
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0006_poll_list_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoteRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[
+                            ("minute", "Minute"),
+                            ("hour", "Hour"),
+                            ("day", "Day"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("votes", models.IntegerField(default=0)),
+                (
+                    "option",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vote_rollups",
+                        to="polls.option",
+                    ),
+                ),
+                (
+                    "poll",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vote_rollups",
+                        to="polls.poll",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["poll", "granularity", "bucket"],
+                        name="idx_rollups_poll_bucket",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("option", "granularity", "bucket"),
+                        name="unique_rollup_option_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
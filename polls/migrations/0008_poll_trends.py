@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0007_vote_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PollTrend",
+            fields=[
+                (
+                    "poll",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="trend",
+                        serialize=False,
+                        to="polls.poll",
+                    ),
+                ),
+                ("score", models.FloatField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["-score"], name="idx_poll_trends_score")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0008_poll_trends"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="vote",
+            name="idx_votes_user_id",
+        ),
+        migrations.AddIndex(
+            model_name="vote",
+            index=models.Index(
+                fields=["user", "-voted_at", "-id"], name="idx_votes_user_voted"
+            ),
+        ),
+    ]
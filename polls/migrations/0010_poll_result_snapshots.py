@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0009_vote_history_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PollResultSnapshot",
+            fields=[
+                (
+                    "poll",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="results_snapshot",
+                        serialize=False,
+                        to="polls.poll",
+                    ),
+                ),
+                ("payload", models.JSONField()),
+                ("frozen_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# PostgreSQL only: a tsvector column kept up to date by a trigger (so bulk
+# inserts and imports are covered too) and a GIN index over it. The column is
+# not part of the Poll model; polls/search.py queries it directly and falls
+# back to ILIKE matching on other databases.
+FORWARD_SQL = [
+    "ALTER TABLE polls_poll ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION polls_poll_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.question, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER polls_poll_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF question, description ON polls_poll
+    FOR EACH ROW EXECUTE FUNCTION polls_poll_search_vector_update()
+    """,
+    """
+    UPDATE polls_poll SET search_vector =
+        setweight(to_tsvector('pg_catalog.english', coalesce(question, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(description, '')), 'B')
+    """,
+    "CREATE INDEX idx_polls_search_vector ON polls_poll USING GIN (search_vector)",
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS polls_poll_search_vector_trigger ON polls_poll",
+    "DROP FUNCTION IF EXISTS polls_poll_search_vector_update()",
+    "ALTER TABLE polls_poll DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0010_poll_result_snapshots"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0011_poll_search_vector"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="comment",
+            name="idx_comments_poll_id",
+        ),
+        migrations.AddField(
+            model_name="poll",
+            name="comments_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE polls_poll SET comments_count = (
+                SELECT COUNT(*) FROM polls_comment WHERE polls_comment.poll_id = polls_poll.id
+            );
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["poll", "-created_at", "-id"], name="idx_comments_poll_created"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0012_poll_comments_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryStats",
+            fields=[
+                (
+                    "category",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="polls.category",
+                    ),
+                ),
+                ("polls", models.IntegerField(default=0)),
+                ("public_polls", models.IntegerField(default=0)),
+                ("open_ended_polls", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO polls_categorystats (category_id, polls, public_polls, open_ended_polls)
+            SELECT category_id,
+                   COUNT(*),
+                   SUM(CASE WHEN is_public THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN expires_at IS NULL THEN 1 ELSE 0 END)
+            FROM polls_poll
+            WHERE category_id IS NOT NULL
+            GROUP BY category_id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_duplicate_votes(apps, schema_editor):
+    """
+    Keep only the latest vote of users holding several on a single-choice poll.
+
+    Migration 0005 left such votes unflagged so the unique constraint could be
+    created, but the single-choice vote paths only look at flagged votes and
+    would add yet another one. The options of affected polls are recounted;
+    ``manage.py backfill_vote_timeline`` rebuilds their timelines.
+    """
+    Option = apps.get_model("polls", "Option")
+    Vote = apps.get_model("polls", "Vote")
+
+    single = Vote.objects.filter(poll__allow_multiple=False)
+    duplicates = single.values("user_id", "poll_id").annotate(n=Count("id")).filter(n__gt=1)
+    polls = set()
+    for row in duplicates.iterator():
+        votes = single.filter(user_id=row["user_id"], poll_id=row["poll_id"]).order_by("-voted_at", "-id")
+        keep = votes.values_list("id", flat=True)[0]
+        votes.exclude(id=keep).delete()
+        polls.add(row["poll_id"])
+    for option in Option.objects.filter(poll_id__in=polls):
+        option.votes_count = Vote.objects.filter(option_id=option.id).count()
+        option.save(update_fields=["votes_count"])
+    single.filter(single_choice=False).update(single_choice=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0013_category_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_votes, migrations.RunPython.noop),
+    ]
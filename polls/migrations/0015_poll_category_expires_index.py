@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polls", "0014_merge_duplicate_single_choice_votes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="poll",
+            index=models.Index(
+                condition=models.Q(
+                    ("category__isnull", False), ("expires_at__isnull", False)
+                ),
+                fields=["expires_at", "category"],
+                name="idx_polls_expires_category",
+            ),
+        ),
+    ]
@@ -27,13 +27,23 @@ class Poll(models.Model):
     expires_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    comments_count = models.IntegerField(default=0)  # cached total, see CommentListCreateView
 
     class Meta:
         indexes = [
-            models.Index(fields=['created_by'], name='idx_polls_created_by'),
-            models.Index(fields=['category'], name='idx_polls_category_id'),
+            # Keyset pagination of the poll list, optionally filtered by one column
+            models.Index(fields=['-created_at', '-id'], name='idx_polls_created'),
+            models.Index(fields=['created_by', '-created_at', '-id'], name='idx_polls_created_by_created'),
+            models.Index(fields=['category', '-created_at', '-id'], name='idx_polls_category_created'),
+            models.Index(fields=['is_public', '-created_at', '-id'], name='idx_polls_is_public_created'),
             models.Index(fields=['expires_at'], name='idx_polls_expires_at'),
-            models.Index(fields=['is_public'], name='idx_polls_is_public'),
+            # Active polls per category (category_stats.directory): an index-only
+            # range over the unexpired timed polls
+            models.Index(
+                fields=['expires_at', 'category'],
+                name='idx_polls_expires_category',
+                condition=models.Q(category__isnull=False, expires_at__isnull=False),
+            ),
         ]
 
     def __str__(self):
@@ -59,23 +69,92 @@ class Vote(models.Model):
     poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='votes')
     option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name='votes')
     voted_at = models.DateTimeField(default=timezone.now)
+    single_choice = models.BooleanField(default=False)  # cast on a single-choice poll
 
     class Meta:
         indexes = [
             models.Index(fields=['poll'], name='idx_votes_poll_id'),
-            models.Index(fields=['user'], name='idx_votes_user_id'),
+            # Per-user vote history, newest first (see VoteHistoryCursorPagination)
+            models.Index(fields=['user', '-voted_at', '-id'], name='idx_votes_user_voted'),
             models.Index(fields=['poll', 'option'], name='idx_votes_poll_option'),
         ]
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'option'],
                 name='unique_user_poll_vote'
-            )
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'poll'],
+                condition=models.Q(single_choice=True),
+                name='unique_user_single_choice_vote'
+            ),
         ]
 
     def __str__(self):
         return f'{self.user} -> {self.option}'
 
+# Vote timeline rollup
+class VoteRollup(models.Model):
+    """Net votes per option and time bucket; see polls/timeline.py."""
+    MINUTE = 'minute'
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [(MINUTE, 'Minute'), (HOUR, 'Hour'), (DAY, 'Day')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='vote_rollups')
+    option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name='vote_rollups')
+    granularity = models.CharField(max_length=6, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()  # bucket start, UTC
+    votes = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['poll', 'granularity', 'bucket'], name='idx_rollups_poll_bucket'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['option', 'granularity', 'bucket'],
+                name='unique_rollup_option_bucket'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.option_id} {self.granularity} {self.bucket}: {self.votes}'
+
+# Trending score
+class PollTrend(models.Model):
+    """Decayed vote count of a poll in log space; see polls/trending.py."""
+    poll = models.OneToOneField(Poll, primary_key=True, on_delete=models.CASCADE, related_name='trend')
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=['-score'], name='idx_poll_trends_score')]
+
+    def __str__(self):
+        return f'{self.poll_id}: {self.score}'
+
+# Poll counts per category
+class CategoryStats(models.Model):
+    """Denormalized poll counts of a category; see polls/category_stats.py."""
+    category = models.OneToOneField(Category, primary_key=True, on_delete=models.CASCADE, related_name='stats')
+    polls = models.IntegerField(default=0)
+    public_polls = models.IntegerField(default=0)
+    open_ended_polls = models.IntegerField(default=0)  # no expires_at, so active forever
+
+    def __str__(self):
+        return f'{self.category_id}: {self.polls} polls'
+
+# Final results of an expired poll
+class PollResultSnapshot(models.Model):
+    """Frozen results payload; see polls/snapshots.py."""
+    poll = models.OneToOneField(Poll, primary_key=True, on_delete=models.CASCADE, related_name='results_snapshot')
+    payload = models.JSONField()
+    frozen_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'Results of {self.poll_id} frozen at {self.frozen_at}'
+
 # Comment
 class Comment(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -87,7 +166,8 @@ class Comment(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=['poll'], name='idx_comments_poll_id'),
+            # Keyset pagination of a poll's comments, newest first
+            models.Index(fields=['poll', '-created_at', '-id'], name='idx_comments_poll_created'),
             models.Index(fields=['user'], name='idx_comments_user_id'),
         ]
 
@@ -0,0 +1,44 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PollCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Pages are fetched with ``WHERE created_at < cursor`` on the
+    ``idx_polls_*_created`` indexes, so there is no COUNT(*) and no OFFSET
+    scan however deep the client pages.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PollSearchCursorPagination(CursorPagination):
+    """
+    Keyset pagination of search results by relevance.
+
+    The cursor holds the last ``rank``; ties are paged with the cursor's
+    offset, as DRF does for any non-unique first ordering field.
+    """
+    ordering = ('-rank', '-created_at', '-id')
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+class CommentCursorPagination(CursorPagination):
+    """Keyset pagination of one poll's comments on ``idx_comments_poll_created``, newest first."""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class VoteHistoryCursorPagination(CursorPagination):
+    """Keyset pagination of one user's votes on ``idx_votes_user_voted``, newest first."""
+    ordering = ('-voted_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,24 +1,26 @@
 from rest_framework import permissions
 
+from . import identity
+
 class IsPollOwner(permissions.BasePermission):
     """
     Only the user who created the poll can update or delete it.
     """
 
     def has_object_permission(self, request, view, obj):
-        return obj.created_by == request.user
+        # Compare ids so the creator is never loaded
+        return obj.created_by_id == request.user.pk
 class IsPollOwnerForOption(permissions.BasePermission):
     """
     Only the owner of the poll can add options.
     """
     def has_permission(self, request, view):
-        poll_id = view.kwargs.get("poll_id")
         from .models import Poll
-        poll = Poll.objects.filter(id=poll_id).first()
-        return poll and poll.created_by == request.user
+        poll = identity.get(request, Poll, view.kwargs.get("poll_id"))
+        return poll is not None and poll.created_by_id == request.user.pk
 class IsCommentOwner(permissions.BasePermission):
     """
     Only the owner of the comment can delete it.
     """
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
@@ -0,0 +1,37 @@
+"""
+Full-text poll search.
+
+On PostgreSQL polls carry a ``search_vector`` column (question weighted above
+description) maintained by a trigger and indexed with GIN; see migration
+0011. Queries are parsed with ``websearch_to_tsquery``, so quoted phrases,
+``or`` and ``-word`` work, and results are ranked with ``ts_rank``. Other
+databases fall back to case-insensitive substring matching of every word,
+ranking question matches above description-only matches.
+"""
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+
+MAX_QUERY_LENGTH = 200
+
+_MATCH_SQL = "polls_poll.search_vector @@ websearch_to_tsquery('pg_catalog.english', %s)"
+_RANK_SQL = "ts_rank(polls_poll.search_vector, websearch_to_tsquery('pg_catalog.english', %s))::float8"
+
+
+def search_polls(queryset, query):
+    """Filter ``queryset`` to polls matching ``query`` and annotate a ``rank``."""
+    if connection.vendor == "postgresql":
+        return queryset.filter(
+            RawSQL(_MATCH_SQL, [query], output_field=models.BooleanField())
+        ).annotate(rank=RawSQL(_RANK_SQL, [query], output_field=models.FloatField()))
+
+    words = query.split()
+    for word in words:
+        queryset = queryset.filter(models.Q(question__icontains=word) | models.Q(description__icontains=word))
+    in_question = models.Q()
+    for word in words:
+        in_question &= models.Q(question__icontains=word)
+    return queryset.annotate(rank=models.Case(
+        models.When(in_question, then=models.Value(1.0)),
+        default=models.Value(0.5),
+        output_field=models.FloatField(),
+    ))
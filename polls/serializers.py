@@ -1,5 +1,6 @@
 from rest_framework import serializers, generics, permissions
-from .models import Poll, Option
+from .models import Comment, Poll, Option
+from django.db import transaction
 from django.db.models import Count
 
 class OptionSerializer(serializers.ModelSerializer):
@@ -24,9 +25,17 @@ class PollSerializer(serializers.ModelSerializer):
         model = Poll
         fields = [
             'id', 'question', 'description', 'category', 'created_by',
-            'is_public', 'allow_multiple', 'expires_at', 'created_at', 'updated_at'
+            'is_public', 'allow_multiple', 'expires_at', 'created_at', 'updated_at',
+            'comments_count'
         ]
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at', 'comments_count']
+
+
+class TrendingPollSerializer(PollSerializer):
+    trending_score = serializers.FloatField(read_only=True)  # decayed vote count
+
+    class Meta(PollSerializer.Meta):
+        fields = PollSerializer.Meta.fields + ['trending_score']
 
 
 class PollCreateSerializer(serializers.ModelSerializer):
@@ -44,12 +53,12 @@ class PollCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         options_data = validated_data.pop('options')
-        poll = Poll.objects.create(**validated_data)
-        
-        # Create linked options
-        for opt in options_data:
-            Option.objects.create(poll=poll, **opt)
-        
+        with transaction.atomic():
+            poll = Poll.objects.create(**validated_data)
+
+            # Create linked options in one INSERT
+            Option.objects.bulk_create([Option(poll=poll, **opt) for opt in options_data])
+
         return poll
 
 class PollDetailSerializer(serializers.ModelSerializer):
@@ -60,8 +69,16 @@ class PollDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'question', 'description', 'category', 'created_by',
             'is_public', 'allow_multiple', 'expires_at',
-            'created_at', 'updated_at', 'options'
+            'created_at', 'updated_at', 'comments_count', 'options'
         ]
+        read_only_fields = ['comments_count']
+
+class CommentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Comment
+        fields = ['id', 'poll', 'user', 'content', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'poll', 'user', 'created_at', 'updated_at']
+
 
 class OptionResultSerializer(serializers.ModelSerializer):
     votes = serializers.IntegerField()
@@ -79,6 +96,45 @@ class OptionResultSerializer(serializers.ModelSerializer):
         return round((obj.votes / total) * 100, 2)
 
 
+class PollImportRowSerializer(serializers.Serializer):
+    """
+    One poll in a bulk import file.
+
+    ``category`` is a category name (created if missing) or id, and ``options``
+    a list of option texts; CSV files separate them with ``|``.
+    """
+    question = serializers.CharField()
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    category = serializers.CharField(max_length=80, required=False, allow_blank=True, allow_null=True)
+    is_public = serializers.BooleanField(required=False, default=True)
+    allow_multiple = serializers.BooleanField(required=False, default=False)
+    expires_at = serializers.DateTimeField(required=False, allow_null=True)
+    options = serializers.ListField(child=serializers.CharField(max_length=255), allow_empty=False)
+
+    def to_internal_value(self, data):
+        # Empty CSV cells mean "use the default"
+        data = {key: value for key, value in data.items() if value != '' or key == 'description'}
+        options = data.get('options')
+        if isinstance(options, str):
+            data['options'] = [text.strip() for text in options.split('|') if text.strip()]
+        elif isinstance(options, list):
+            data['options'] = [opt.get('option_text') if isinstance(opt, dict) else opt for opt in options]
+        return super().to_internal_value(data)
+
+
+BULK_VOTE_MAX_ITEMS = 5000
+
+
+class BulkVoteItemSerializer(serializers.Serializer):
+    user = serializers.UUIDField(required=False)
+    poll = serializers.UUIDField()
+    option = serializers.UUIDField()
+
+
+class BulkVoteSerializer(serializers.Serializer):
+    votes = BulkVoteItemSerializer(many=True, allow_empty=False, max_length=BULK_VOTE_MAX_ITEMS)
+
+
 class PollResultsSerializer(serializers.ModelSerializer):
     options = OptionResultSerializer(many=True)
     total_votes = serializers.IntegerField()
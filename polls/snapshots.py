@@ -0,0 +1,67 @@
+"""
+Final results snapshots of expired polls.
+
+Once a poll has expired its results cannot change, so ``freeze_expired``
+(run by ``manage.py freeze_expired_polls``) counts its votes one last time and
+stores the results payload in ``PollResultSnapshot``. ``get_poll_results``
+serves that payload, marked ``"final": true``, without aggregating, and the
+results endpoint sends it with long-lived cache headers.
+
+Editing a frozen poll or its options discards the snapshot; the next run
+freezes it again if it is still expired.
+"""
+import datetime
+from types import SimpleNamespace
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import caching
+from .models import Option, Poll, PollResultSnapshot
+from .serializers import OptionResultSerializer
+
+DEFAULT_GRACE = 300  # seconds after expiry, so in-flight votes and counter flushes land first
+
+
+def build_payload(poll):
+    """Results payload of ``poll`` counted from its ``Vote`` rows."""
+    # OptionResultSerializer reads ``.votes``, which is the reverse relation on Option
+    options = [
+        SimpleNamespace(id=o_id, option_text=text, votes=votes)
+        for o_id, text, votes in Option.objects.filter(poll=poll)
+        .annotate(vote_total=Count("votes"))
+        .order_by("id")
+        .values_list("id", "option_text", "vote_total")
+    ]
+    total = sum(option.votes for option in options)
+    serializer = OptionResultSerializer(options, many=True, context={"total_votes": total})
+    return {
+        "poll_id": str(poll.id),
+        "question": poll.question,
+        "options": [
+            {**data, "votes_count": option.votes, "total_votes": option.votes}
+            for option, data in zip(options, serializer.data)
+        ],
+        "total_votes": total,
+        "final": True,
+    }
+
+
+def freeze(poll):
+    payload = build_payload(poll)
+    with transaction.atomic():
+        PollResultSnapshot.objects.update_or_create(
+            poll=poll, defaults={"payload": payload, "frozen_at": timezone.now()}
+        )
+        transaction.on_commit(lambda: caching.bump_poll_version(poll.id))
+    return payload
+
+
+def expired_unfrozen(grace=DEFAULT_GRACE, now=None):
+    cutoff = (now or timezone.now()) - datetime.timedelta(seconds=grace)
+    return Poll.objects.filter(expires_at__lte=cutoff, results_snapshot__isnull=True).order_by("expires_at", "id")
+
+
+def discard(poll_id):
+    PollResultSnapshot.objects.filter(poll_id=poll_id).delete()
@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from accounts.models import User
 from polls.models import Poll, Category, AuditLog
 from rest_framework.test import APIClient
@@ -24,4 +24,64 @@ class AuditLogTest(TestCase):
         self.assertEqual(log.action, "Created poll")
         self.assertEqual(log.user, user)
         self.assertEqual(log.target_type, "Poll")
-        self.assertEqual(str(log.target_id), resp.data["id"])
\ No newline at end of file
+        self.assertEqual(str(log.target_id), resp.data["id"])
+
+class AuditLogWriterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="w@test.com", username="w", password="pass")
+
+    def make_entries(self, n):
+        import uuid
+        return [
+            AuditLog(user=self.user, action="Voted on poll", target_type="Poll", target_id=uuid.uuid4())
+            for _ in range(n)
+        ]
+
+    def test_batches_are_cut_at_batch_size(self):
+        from polls.audit import AuditLogWriter
+
+        writer = AuditLogWriter(batch_size=3, flush_interval=0.05)
+        writer.submit(self.make_entries(5))
+
+        first, stopped = writer._next_batch()
+        second, _ = writer._next_batch()
+        self.assertEqual((len(first), len(second), stopped), (3, 2, False))
+
+    def test_flush_writes_queued_entries_with_bulk_create(self):
+        from polls.audit import AuditLogWriter
+
+        writer = AuditLogWriter(batch_size=2)
+        writer.submit(self.make_entries(3))
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        with self.assertNumQueries(2):
+            writer.flush()
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_full_queue_falls_back_to_inline_write(self):
+        from polls.audit import AuditLogWriter
+
+        writer = AuditLogWriter(max_queue=1)
+        writer.submit(self.make_entries(3))
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+
+class AuditLogWriterFailureTest(TransactionTestCase):
+    def test_bad_entry_does_not_drop_the_rest_of_its_batch(self):
+        import uuid
+        from polls.audit import AuditLogWriter
+
+        user = User.objects.create_user(email="w@test.com", username="w", password="pass")
+        gone = User.objects.create_user(email="g@test.com", username="g", password="pass")
+        entries = [
+            AuditLog(user=author, action="Voted on poll", target_type="Poll", target_id=uuid.uuid4())
+            for author in (user, gone, user, user)
+        ]
+        gone.delete()  # before the flush, as with a user removed meanwhile
+
+        writer = AuditLogWriter(batch_size=10)
+        with self.assertLogs("polls.audit", level="ERROR") as logs:
+            writer.write(entries)
+        self.assertEqual(AuditLog.objects.filter(user=user).count(), 3)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn(str(entries[1].target_id), logs.output[0])
@@ -0,0 +1,44 @@
+import io
+import json
+import tempfile
+import pytest
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from accounts.models import User
+from polls.benchmark import percentile
+from polls.models import Poll
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+class BenchmarkCommandTest(TransactionTestCase):
+    def test_percentile_uses_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 99)), (50, 99))
+        self.assertIsNone(percentile([], 95))
+
+    def test_writes_json_report_and_cleans_up(self):
+        with tempfile.NamedTemporaryFile("r", suffix=".json") as f:
+            call_command(
+                "benchmark_votes", "--users", "4", "--polls", "2", "--votes", "10",
+                "--threads", "2", "--duration", "0.3", "--seed", "1", "--output", f.name,
+            )
+            report = json.load(f)
+
+        for name in ("vote", "results"):
+            self.assertEqual(report["operations"][name]["errors"], 0)
+            self.assertIn("p99", report["operations"][name]["latency_ms"])
+        self.assertGreater(report["operations"]["vote"]["operations"], 0)
+        self.assertEqual(report["counter_drift"]["total_abs_drift"], 0)
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Poll.objects.exists())
+
+    def test_read_benchmark_reports_both_paths(self):
+        out = io.StringIO()
+        call_command("benchmark_poll_reads", "--polls", "5", "--repeat", "2", stdout=out)
+        report = json.loads(out.getvalue())
+
+        for name in ("list", "detail"):
+            self.assertIn("mean_ms", report["results"][name]["serializer"])
+            self.assertIn("mean_ms", report["results"][name]["values"])
+        self.assertFalse(Poll.objects.exists())
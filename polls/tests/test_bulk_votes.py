@@ -0,0 +1,122 @@
+import threading
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls.models import AuditLog, Category, Poll, Option, Vote
+from polls import views
+from polls.views import cast_vote, cast_votes_bulk
+from django.test import TestCase, TransactionTestCase
+
+pytestmark = pytest.mark.django_db
+
+
+class TestBulkVotes(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="a@a.com", username="a", password="pass")
+        self.other = User.objects.create_user(email="b@b.com", username="b", password="pass")
+        cat = Category.objects.create(name="General")
+        self.poll = Poll.objects.create(question="Food?", category=cat, created_by=self.user)
+        self.opt1 = Option.objects.create(poll=self.poll, option_text="Pizza")
+        self.opt2 = Option.objects.create(poll=self.poll, option_text="Burger")
+        self.multi = Poll.objects.create(question="Toppings?", category=cat, created_by=self.user, allow_multiple=True)
+        self.cheese = Option.objects.create(poll=self.multi, option_text="Cheese")
+        self.olives = Option.objects.create(poll=self.multi, option_text="Olives")
+
+    def test_single_choice_rules_apply_in_order(self):
+        cast_vote(self.other, self.poll.id, self.opt1.id)
+
+        results = cast_votes_bulk([
+            (self.user, self.poll.id, self.opt1.id),
+            (self.user, self.poll.id, self.opt2.id),
+            (self.user, self.poll.id, self.opt2.id),
+            (self.other, self.poll.id, self.opt2.id),
+        ])
+
+        assert [r["status"] for r in results] == ["created", "changed", "unchanged", "changed"]
+        assert Vote.objects.filter(poll=self.poll).count() == 2
+        self.opt1.refresh_from_db()
+        self.opt2.refresh_from_db()
+        assert (self.opt1.votes_count, self.opt2.votes_count) == (0, 2)
+
+    def test_multi_choice_and_failures(self):
+        expired = Poll.objects.create(
+            question="Old?", created_by=self.user, expires_at=timezone.now() - timezone.timedelta(days=1)
+        )
+        expired_opt = Option.objects.create(poll=expired, option_text="x")
+
+        results = cast_votes_bulk([
+            (self.user, self.multi.id, self.cheese.id),
+            (self.user, self.multi.id, self.olives.id),
+            (self.user.id, self.multi.id, self.cheese.id),
+            (self.user, self.multi.id, self.opt1.id),
+            (self.user, expired.id, expired_opt.id),
+        ])
+
+        assert [r["status"] for r in results] == ["created", "created", "unchanged", "failed", "failed"]
+        assert results[3]["error"] == "Option not found"
+        assert results[4]["error"] == "Poll expired"
+        self.cheese.refresh_from_db()
+        assert self.cheese.votes_count == 1
+        assert AuditLog.objects.filter(target_id=self.multi.id).count() == 2
+
+    def test_bulk_endpoint_requires_staff(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('bulk-vote')
+        payload = {"votes": [{"poll": str(self.poll.id), "option": str(self.opt1.id)}]}
+
+        assert client.post(url, payload, format="json").status_code == 403
+
+        self.user.is_staff = True
+        self.user.save()
+        payload["votes"].append({"user": str(self.other.id), "poll": str(self.poll.id), "option": str(self.opt2.id)})
+        resp = client.post(url, payload, format="json")
+
+        assert resp.status_code == 200
+        assert resp.data["created"] == 2
+        assert Vote.objects.get(user=self.other).option_id == self.opt2.id
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="races the lock-free PostgreSQL vote path")
+class TestBulkVotesRacingSingleVotes(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="a@a.com", username="a", password="pass")
+        self.poll = Poll.objects.create(question="Food?", created_by=self.user)
+        self.opt1, self.opt2, self.opt3 = (
+            Option.objects.create(poll=self.poll, option_text=text) for text in ("Pizza", "Burger", "Salad")
+        )
+        cast_vote(self.user, self.poll.id, self.opt1.id)
+
+    def test_vote_change_waits_for_the_batch(self):
+        racer_done = threading.Event()
+        real_lock = views._lock_existing_votes
+
+        def change_vote():
+            try:
+                cast_vote(self.user, self.poll.id, self.opt3.id)
+            finally:
+                racer_done.set()
+                connection.close()
+
+        racer = threading.Thread(target=change_vote)
+
+        def lock_then_race(poll_ids, user_ids):
+            votes = real_lock(poll_ids, user_ids)
+            # Another worker moves the same vote after the batch has read it
+            racer.start()
+            assert not racer_done.wait(0.5)
+            return votes
+
+        with mock.patch("polls.views._lock_existing_votes", side_effect=lock_then_race):
+            results = cast_votes_bulk([(self.user, self.poll.id, self.opt2.id)])
+        racer.join(10)
+
+        assert [r["status"] for r in results] == ["changed"]
+        assert list(Vote.objects.filter(poll=self.poll).values_list("option_id", flat=True)) == [self.opt3.id]
+        counts = [Option.objects.get(id=o.id).votes_count for o in (self.opt1, self.opt2, self.opt3)]
+        assert counts == [0, 0, 1]
@@ -0,0 +1,110 @@
+import datetime
+import io
+import json
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls import importing
+from polls.models import Category, CategoryStats, Poll
+from polls.views import PollDetailView
+from django.test import TestCase
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCategoryStats(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(email="o@test.com", username="o", password="pass1234")
+        self.news = Category.objects.create(name="News")
+        self.sport = Category.objects.create(name="Sport")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_poll(self, **fields):
+        payload = {"question": "Q?", "options": [{"option_text": "A"}, {"option_text": "B"}], **fields}
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(reverse("poll-list-create"), payload, format="json")
+        assert resp.status_code == 201, resp.data
+        return resp.data["id"]
+
+    def directory(self):
+        resp = self.client.get(reverse("category-list"))
+        assert resp.status_code == 200
+        return {entry["name"]: (entry["polls"], entry["public_polls"], entry["active_polls"]) for entry in resp.json()}
+
+    def test_counts_follow_create_update_and_delete(self):
+        past = (timezone.now() - datetime.timedelta(days=1)).isoformat()
+        future = (timezone.now() + datetime.timedelta(days=1)).isoformat()
+        self.create_poll(category=str(self.news.id))
+        self.create_poll(category=str(self.news.id), is_public=False, expires_at=future)
+        expired = self.create_poll(category=str(self.news.id), expires_at=past)
+        assert self.directory() == {"News": (3, 2, 2), "Sport": (0, 0, 0)}
+
+        url = reverse("poll-detail", args=[expired])
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.patch(url, {"category": str(self.sport.id), "is_public": False}, format="json")
+        assert resp.status_code == 200
+        assert self.directory() == {"News": (2, 1, 2), "Sport": (1, 0, 0)}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assert self.client.delete(url).status_code == 204
+        assert self.directory() == {"News": (2, 1, 2), "Sport": (0, 0, 0)}
+
+    def test_update_counts_from_the_row_it_locked(self):
+        poll_id = self.create_poll(category=str(self.news.id))
+        url = reverse("poll-detail", args=[poll_id])
+        stale = Poll.objects.get(pk=poll_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            assert self.client.patch(url, {"category": str(self.sport.id)}, format="json").status_code == 200
+
+        # A second update that loaded the poll before the first one committed
+        with mock.patch.object(PollDetailView, "get_object", return_value=stale), \
+                self.captureOnCommitCallbacks(execute=True):
+            assert self.client.patch(url, {"is_public": False}, format="json").status_code == 200
+        counted = self.directory()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("rebuild_category_stats", stdout=io.StringIO())
+        assert self.directory() == counted
+
+    def test_cascades_and_admin_edits_are_counted(self):
+        self.create_poll(category=str(self.news.id))
+        other = User.objects.create_user(email="x@test.com", username="x", password="pass1234")
+        poll = Poll.objects.create(question="Q?", created_by=other, category=self.news)
+        with self.captureOnCommitCallbacks(execute=True):
+            poll.category = self.sport
+            poll.is_public = False
+            poll.save()  # as the admin does
+        assert self.directory() == {"News": (1, 1, 1), "Sport": (1, 0, 1)}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        assert self.directory() == {"News": (1, 1, 1), "Sport": (0, 0, 0)}
+
+    def test_directory_is_cached_until_a_count_changes(self):
+        self.create_poll(category=str(self.news.id))
+        self.directory()
+        with self.assertNumQueries(0):
+            assert self.directory()["News"] == (1, 1, 1)
+        self.create_poll(category=str(self.news.id))
+        assert self.directory()["News"] == (2, 2, 2)
+
+    def test_bulk_import_counts_polls(self):
+        rows = [{"question": f"Q{i}", "category": "News", "options": ["A", "B"]} for i in range(3)]
+        rows.append({"question": "New", "category": "Science", "is_public": False, "options": ["A", "B"]})
+        stream = io.StringIO("\n".join(json.dumps(row) for row in rows))
+        with self.captureOnCommitCallbacks(execute=True):
+            importing.import_polls(importing.iter_rows(stream, "jsonl"), self.owner)
+        assert self.directory() == {"News": (3, 3, 3), "Science": (1, 0, 1), "Sport": (0, 0, 0)}
+
+    def test_rebuild_repairs_counts(self):
+        Poll.objects.create(question="Q?", created_by=self.owner, category=self.sport)
+        CategoryStats.objects.create(category=self.news, polls=7)
+        call_command("rebuild_category_stats", stdout=io.StringIO())
+        assert self.directory() == {"News": (0, 0, 0), "Sport": (1, 1, 1)}
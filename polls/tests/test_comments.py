@@ -0,0 +1,95 @@
+import pytest
+from django.core.cache import cache
+from polls import caching
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls.models import Poll, Comment
+from django.test import TestCase
+
+pytestmark = pytest.mark.django_db
+
+
+class TestComments(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(email="o@test.com", username="o", password="pass1234")
+        self.other = User.objects.create_user(email="x@test.com", username="x", password="pass1234")
+        self.poll = Poll.objects.create(question="Q?", created_by=self.owner)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = reverse("comment-list-create", args=[self.poll.id])
+
+    def test_create_increments_comments_count(self):
+        resp = self.client.post(self.url, {"content": "First"}, format="json")
+        assert resp.status_code == 201
+        assert resp.data["user"] == self.owner.id
+        assert str(resp.data["poll"]) == str(self.poll.id)
+
+        self.poll.refresh_from_db()
+        assert self.poll.comments_count == 1
+        detail = self.client.get(reverse("poll-detail", args=[self.poll.id]))
+        assert detail.json()["comments_count"] == 1
+
+    def test_comments_change_the_detail_etag_but_not_the_results(self):
+        detail_url = reverse("poll-detail", args=[self.poll.id])
+        results_url = reverse("poll-results", args=[self.poll.id])
+        detail_etag = self.client.get(detail_url)["ETag"]
+        results_etag = self.client.get(results_url)["ETag"]
+        version = caching.poll_version(self.poll.id)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            comment_id = self.client.post(self.url, {"content": "c"}, format="json").data["id"]
+        assert len(callbacks) == 1  # no live results notification
+        assert self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code == 200
+        assert self.client.get(results_url, HTTP_IF_NONE_MATCH=results_etag).status_code == 304
+        assert caching.poll_version(self.poll.id) == version
+
+        detail_etag = self.client.get(detail_url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("comment-delete", args=[comment_id]))
+        assert self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code == 200
+        assert self.client.get(results_url, HTTP_IF_NONE_MATCH=results_etag).status_code == 304
+
+    def test_deleting_a_commenter_updates_the_count(self):
+        commenter = APIClient()
+        commenter.force_authenticate(self.other)
+        commenter.post(self.url, {"content": "theirs"}, format="json")
+        self.client.post(self.url, {"content": "mine"}, format="json")
+        detail_url = reverse("poll-detail", args=[self.poll.id])
+        etag = self.client.get(detail_url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.delete()
+        self.poll.refresh_from_db()
+        assert self.poll.comments_count == 1
+        assert self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_list_is_cursor_paginated_newest_first(self):
+        for i in range(5):
+            self.client.post(self.url, {"content": f"c{i}"}, format="json")
+
+        resp = self.client.get(self.url, {"page_size": 2})
+        assert resp.status_code == 200
+        assert [c["content"] for c in resp.data["results"]] == ["c4", "c3"]
+        resp = self.client.get(resp.data["next"])
+        assert [c["content"] for c in resp.data["results"]] == ["c2", "c1"]
+
+    def test_unknown_poll_is_404(self):
+        url = reverse("comment-list-create", args=["00000000-0000-0000-0000-000000000000"])
+        assert self.client.get(url).status_code == 404
+        assert self.client.post(url, {"content": "x"}, format="json").status_code == 404
+
+    def test_delete_decrements_and_only_owner_may_delete(self):
+        comment_id = self.client.post(self.url, {"content": "mine"}, format="json").data["id"]
+        url = reverse("comment-delete", args=[comment_id])
+
+        other = APIClient()
+        other.force_authenticate(self.other)
+        assert other.delete(url).status_code == 403
+
+        assert self.client.delete(url).status_code == 204
+        assert not Comment.objects.filter(id=comment_id).exists()
+        self.poll.refresh_from_db()
+        assert self.poll.comments_count == 0
+        assert self.client.delete(url).status_code == 404
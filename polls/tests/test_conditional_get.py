@@ -0,0 +1,84 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls.models import Poll, Option
+from polls.views import cast_vote
+from django.test import TestCase
+
+pytestmark = pytest.mark.django_db
+
+
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(email="o@test.com", username="o", password="pass1234")
+        self.poll = Poll.objects.create(question="Q?", created_by=self.owner)
+        self.option = Option.objects.create(poll=self.poll, option_text="A")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_results_not_modified_without_touching_the_database(self):
+        url = reverse("poll-results", args=[self.poll.id])
+        first = self.client.get(url)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 304
+        assert resp["ETag"] == etag
+        assert not resp.content
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.owner, self.poll.id, self.option.id)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        assert resp["ETag"] != etag
+        assert resp.json()["total_votes"] == 1
+
+    def test_detail_not_modified_skips_options_and_serializer(self):
+        url = reverse("poll-detail", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+
+        # One query for the poll row (ownership check); options are not loaded
+        with self.assertNumQueries(1):
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=f'W/{etag}, "other"')
+        assert resp.status_code == 304
+
+        self.client.patch(url, {"question": "New?"}, format="json")
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        assert resp.json()["question"] == "New?"
+
+    def test_option_changes_move_the_etag(self):
+        url = reverse("poll-detail", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("option-create", args=[self.poll.id]), {"option_text": "B"}, format="json")
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_not_modified_still_checks_ownership(self):
+        url = reverse("poll-detail", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+        stranger = User.objects.create_user(email="s@test.com", username="s", password="pass1234")
+        client = APIClient()
+        client.force_authenticate(stranger)
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 403
+
+    def test_deleted_poll_answers_an_old_etag_with_404(self):
+        url = reverse("poll-results", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            assert self.client.delete(reverse("poll-detail", args=[self.poll.id])).status_code == 204
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+    def test_poll_deleted_by_a_cascade_answers_an_old_etag_with_404(self):
+        url = reverse("poll-results", args=[self.poll.id])
+        etag = self.client.get(url)["ETag"]
+        admin = User.objects.create_user(email="a@test.com", username="a", password="pass1234")
+        client = APIClient()
+        client.force_authenticate(admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
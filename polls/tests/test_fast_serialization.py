@@ -0,0 +1,80 @@
+import datetime
+import json
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls import fastpath
+from polls.models import Category, Poll, Option
+from polls.serializers import PollDetailSerializer, PollSerializer
+from django.test import TestCase, override_settings
+
+pytestmark = pytest.mark.django_db
+
+
+def rendered(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+class TestFastSerializationParity(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="f@test.com", username="f", password="pass1234")
+        category = Category.objects.create(name="cat")
+        base = timezone.now().replace(microsecond=123456)
+        self.polls = [
+            Poll.objects.create(question="Plain?", created_by=self.user, created_at=base),
+            Poll.objects.create(
+                question="Full?", description="desc", category=category, created_by=self.user,
+                is_public=False, allow_multiple=True, expires_at=base + datetime.timedelta(days=3),
+                created_at=base - datetime.timedelta(minutes=1),
+            ),
+            Poll.objects.create(question="Empty description?", description="", created_by=self.user,
+                                created_at=base.replace(microsecond=0) - datetime.timedelta(hours=1)),
+        ]
+        for text, votes in (("A", 0), ("B", 7)):
+            Option.objects.create(poll=self.polls[1], option_text=text, votes_count=votes)
+
+    def test_list_rows_match_poll_serializer(self):
+        queryset = Poll.objects.order_by("-created_at", "-id")
+        expected = rendered(PollSerializer(queryset, many=True).data)
+        assert rendered(fastpath.poll_list(fastpath.poll_rows(queryset))) == expected
+
+    def test_detail_matches_poll_detail_serializer(self):
+        for poll in self.polls:
+            instance = Poll.objects.prefetch_related("options").get(pk=poll.pk)
+            expected = rendered(PollDetailSerializer(instance).data)
+            fast = fastpath.poll_detail(fastpath.detail_queryset().get(pk=poll.pk))
+            expected["options"].sort(key=lambda o: o["id"])
+            fast["options"].sort(key=lambda o: o["id"])
+            assert list(fast) == list(expected)  # same key order
+            assert rendered(fast) == expected
+
+    def test_datetimes_follow_the_active_timezone(self):
+        queryset = Poll.objects.order_by("-created_at", "-id")
+        with timezone.override(datetime.timezone(datetime.timedelta(hours=5, minutes=30))):
+            expected = rendered(PollSerializer(queryset, many=True).data)
+            assert rendered(fastpath.poll_list(fastpath.poll_rows(queryset))) == expected
+        assert expected[0]["created_at"].endswith("+05:30")
+
+    def test_endpoints_return_the_same_body_on_both_paths(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        detail = reverse("poll-detail", args=[self.polls[1].id])
+        bodies = {}
+        for enabled in (True, False):
+            with override_settings(POLL_READ_FAST_PATH=enabled):
+                listing = client.get(reverse("poll-list-create"), {"page_size": 2})
+                page_two = client.get(listing.json()["next"])
+                bodies[enabled] = (
+                    listing.json()["results"], page_two.json()["results"], client.get(detail).json(),
+                )
+        for fast, slow in zip(bodies[True], bodies[False]):
+            if isinstance(fast, dict):
+                fast["options"].sort(key=lambda o: o["id"])
+                slow["options"].sort(key=lambda o: o["id"])
+            assert fast == slow
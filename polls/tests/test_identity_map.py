@@ -0,0 +1,49 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls.models import Poll, Option
+
+pytestmark = pytest.mark.django_db
+
+
+def poll_selects(queries):
+    return [q["sql"] for q in queries if q["sql"].startswith("SELECT") and 'FROM "polls_poll"' in q["sql"]]
+
+
+class TestIdentityMap(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(email="o@test.com", username="o", password="pass1234")
+        self.other = User.objects.create_user(email="x@test.com", username="x", password="pass1234")
+        self.poll = Poll.objects.create(question="Q?", created_by=self.owner)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_option_create_loads_the_poll_once(self):
+        url = reverse("option-create", args=[self.poll.id])
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(url, {"option_text": "A"}, format="json")
+        assert resp.status_code == 201
+        assert len(poll_selects(ctx.captured_queries)) == 1
+        assert not [q for q in ctx.captured_queries if 'FROM "accounts_user"' in q["sql"]]
+        assert Option.objects.filter(poll=self.poll, option_text="A").exists()
+
+    def test_option_create_denied_for_other_users_and_missing_polls(self):
+        other = APIClient()
+        other.force_authenticate(self.other)
+        url = reverse("option-create", args=[self.poll.id])
+        assert other.post(url, {"option_text": "A"}, format="json").status_code == 403
+        missing = reverse("option-create", args=["00000000-0000-0000-0000-000000000000"])
+        assert self.client.post(missing, {"option_text": "A"}, format="json").status_code == 403
+
+    def test_owner_check_does_not_load_the_creator(self):
+        url = reverse("poll-detail", args=[self.poll.id])
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        assert resp.status_code == 200
+        assert not [q for q in ctx.captured_queries if 'FROM "accounts_user"' in q["sql"]]
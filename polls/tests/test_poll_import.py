@@ -0,0 +1,77 @@
+import pytest
+import tempfile
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from accounts.models import User
+from polls.models import Category, Poll, Option
+
+pytestmark = pytest.mark.django_db
+
+JSONL = (
+    '{"question": "Best fruit?", "category": "Food", "options": ["Apple", "Banana"]}\n'
+    '\n'
+    '{"question": "Best drink?", "category": "Food", "options": [{"option_text": "Tea"}]}\n'
+    '{"question": "No options?", "options": []}\n'
+    'not json\n'
+)
+
+CSV = (
+    "question,description,category,is_public,allow_multiple,expires_at,options\n"
+    "Best color?,,Misc,false,,,Red|Blue|Green\n"
+    ",,Misc,,,,A|B\n"
+)
+
+
+class PollImportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="imp@test.com", username="imp", password="pass1234")
+
+    def test_create_poll_inserts_options_in_one_query(self):
+        self.client.force_authenticate(self.user)
+        payload = {"question": "Q?", "options": [{"option_text": str(n)} for n in range(20)]}
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('poll-list-create'), payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "polls_option"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Option.objects.count(), 20)
+
+    def test_import_command_streams_jsonl_in_chunks(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as f:
+            f.write(JSONL)
+            f.flush()
+            out, err = StringIO(), StringIO()
+            call_command("import_polls", f.name, "--created-by", self.user.email, "--chunk-size", "1",
+                         stdout=out, stderr=err)
+
+        self.assertIn("Done: 2 polls imported, 2 rows failed.", out.getvalue())
+        self.assertIn("Imported 1 polls", out.getvalue())
+        self.assertIn("line 4:", err.getvalue())
+        self.assertIn("line 5: Invalid JSON", err.getvalue())
+        food = Category.objects.get(name="Food")
+        self.assertEqual(Poll.objects.filter(category=food).count(), 2)
+        self.assertEqual(Option.objects.filter(poll__question="Best fruit?").count(), 2)
+
+    def test_import_endpoint_accepts_csv(self):
+        self.client.force_authenticate(self.user)
+        upload = SimpleUploadedFile("polls.csv", CSV.encode(), content_type="text/csv")
+        self.assertEqual(self.client.post(reverse('poll-import'), {"file": upload}).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        upload.seek(0)
+        response = self.client.post(reverse('poll-import'), {"file": upload})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["imported"], response.data["failed"]), (1, 1))
+        self.assertEqual(response.data["errors"][0]["line"], 3)
+        poll = Poll.objects.get(question="Best color?")
+        self.assertFalse(poll.is_public)
+        self.assertEqual(poll.options.count(), 3)
@@ -0,0 +1,74 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls.models import Category, Poll
+from django.test import TestCase
+
+pytestmark = pytest.mark.django_db
+
+
+class TestPollSearch(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="s@test.com", username="s", password="pass1234")
+        self.food = Category.objects.create(name="food")
+        self.in_question = Poll.objects.create(
+            question="Best pizza topping?", description="Vote for one", created_by=self.user, category=self.food,
+        )
+        self.in_description = Poll.objects.create(
+            question="Friday lunch", description="Pizza or burgers for the team", created_by=self.user,
+        )
+        Poll.objects.create(question="Secret pizza poll", created_by=self.user, is_public=False)
+        Poll.objects.create(question="Favourite colour?", created_by=self.user)
+        self.url = reverse("poll-search")
+
+    def search(self, **params):
+        resp = APIClient().get(self.url, params)
+        assert resp.status_code == 200, resp.content
+        return resp.json()
+
+    def test_ranks_public_matches_question_first(self):
+        results = self.search(q="pizza")["results"]
+        assert [r["id"] for r in results] == [str(self.in_question.id), str(self.in_description.id)]
+        assert results[0]["rank"] > results[1]["rank"]
+        assert results[0]["question"] == "Best pizza topping?"
+
+    def test_search_vector_follows_edits(self):
+        Poll.objects.filter(id=self.in_description.id).update(description="Tacos for the team")
+        assert [r["id"] for r in self.search(q="pizza")["results"]] == [str(self.in_question.id)]
+        assert [r["id"] for r in self.search(q="tacos")["results"]] == [str(self.in_description.id)]
+
+    def test_filters_by_category_and_status(self):
+        results = self.search(q="pizza", category=str(self.food.id))["results"]
+        assert [r["id"] for r in results] == [str(self.in_question.id)]
+
+        Poll.objects.filter(id=self.in_question.id).update(expires_at=timezone.now() - datetime.timedelta(days=1))
+        assert [r["id"] for r in self.search(q="pizza", status="active")["results"]] == [str(self.in_description.id)]
+        assert [r["id"] for r in self.search(q="pizza", status="expired")["results"]] == [str(self.in_question.id)]
+
+    def test_cursor_pagination_walks_all_matches(self):
+        for n in range(5):
+            Poll.objects.create(question=f"Pizza night {n}", created_by=self.user)
+        seen = []
+        page = self.search(q="pizza", page_size=3)
+        while True:
+            seen.extend(r["id"] for r in page["results"])
+            if not page["next"]:
+                break
+            page = APIClient().get(page["next"]).json()
+        assert len(seen) == len(set(seen)) == 7
+
+    def test_requires_a_query(self):
+        assert APIClient().get(self.url).status_code == 400
+        assert APIClient().get(self.url, {"q": "x" * 201}).status_code == 400
+        assert APIClient().get(self.url, {"q": "pizza", "status": "soon"}).status_code == 400
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="GIN index is PostgreSQL only")
+    def test_uses_search_vector_column(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT search_vector::text FROM polls_poll WHERE id = %s", [self.in_question.id])
+            assert "'pizza':2A" in cursor.fetchone()[0]
@@ -86,4 +86,38 @@ class PollsApiTest(APITestCase):
         response = self.client.post(url, {"option_text": "Coffee"}, format='json')
 
         self.assertEqual(response.status_code, 201)
-        self.assertEqual(poll.options.count(), 1)
\ No newline at end of file
+        self.assertEqual(poll.options.count(), 1)
+    def test_list_polls_uses_cursor_pagination(self):
+        for n in range(3):
+            Poll.objects.create(question=f"Q{n}?", created_by=self.user, category=self.category)
+
+        url = reverse('poll-list-create')
+        page1 = self.client.get(url, {"page_size": 2})
+        self.assertEqual(page1.status_code, 200)
+        self.assertNotIn("count", page1.data)
+        self.assertEqual([p["question"] for p in page1.data["results"]], ["Q2?", "Q1?"])
+
+        page2 = self.client.get(page1.data["next"])
+        self.assertEqual([p["question"] for p in page2.data["results"]], ["Q0?"])
+        self.assertIsNone(page2.data["next"])
+
+    def test_list_polls_filters(self):
+        from django.utils import timezone
+
+        other = User.objects.create_user(email="o@test.com", username="o", password="pass1234")
+        Poll.objects.create(question="Mine", created_by=self.user, category=self.category)
+        Poll.objects.create(question="Private", created_by=other, is_public=False)
+        Poll.objects.create(
+            question="Old", created_by=other, expires_at=timezone.now() - timezone.timedelta(days=1)
+        )
+
+        url = reverse('poll-list-create')
+
+        def questions(**params):
+            return sorted(p["question"] for p in self.client.get(url, params).data["results"])
+
+        self.assertEqual(questions(is_public="false"), ["Private"])
+        self.assertEqual(questions(category=str(self.category.id)), ["Mine"])
+        self.assertEqual(questions(created_by=str(other.id), status="active"), ["Private"])
+        self.assertEqual(questions(status="expired"), ["Old"])
+        self.assertEqual(self.client.get(url, {"status": "soon"}).status_code, 400)
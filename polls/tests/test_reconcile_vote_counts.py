@@ -0,0 +1,48 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from accounts.models import User
+from polls.models import Category, Poll, Option
+from polls.views import cast_vote
+from django.test import TestCase
+
+pytestmark = pytest.mark.django_db
+
+
+class TestReconcileVoteCounts(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="r@r.com", username="r", password="pass")
+        cat = Category.objects.create(name="General")
+        self.poll = Poll.objects.create(question="Food?", category=cat, created_by=self.user)
+        self.opt1 = Option.objects.create(poll=self.poll, option_text="Pizza")
+        self.opt2 = Option.objects.create(poll=self.poll, option_text="Burger")
+        cast_vote(self.user, self.poll.id, self.opt1.id)
+        Option.objects.filter(id=self.opt2.id).update(votes_count=7)
+
+    def test_reports_drift_without_fixing(self):
+        out = StringIO()
+        call_command("reconcile_vote_counts", stdout=out)
+
+        assert f"option {self.opt2.id}: votes_count=7 votes=0 (drift +7)" in out.getvalue()
+        assert "1 drifted options, 0 fixed" in out.getvalue()
+        self.opt2.refresh_from_db()
+        assert self.opt2.votes_count == 7
+
+    def test_fix_rewrites_drifted_counters(self):
+        call_command("reconcile_vote_counts", "--fix", stdout=StringIO())
+
+        self.opt1.refresh_from_db()
+        self.opt2.refresh_from_db()
+        assert (self.opt1.votes_count, self.opt2.votes_count) == (1, 0)
+
+    def test_resumes_from_checkpoint(self):
+        import tempfile
+        from pathlib import Path
+
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Path(tmp) / "reconcile.state"
+            checkpoint.write_text(str(self.poll.id))
+            out = StringIO()
+            call_command("reconcile_vote_counts", "--checkpoint", str(checkpoint), stdout=out)
+
+        assert "0 polls checked" in out.getvalue()
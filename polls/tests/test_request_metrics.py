@@ -0,0 +1,77 @@
+import pytest
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from alx_project_nexus import metrics
+from polls.models import Poll, Option
+
+pytestmark = pytest.mark.django_db
+
+
+@override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0, METRICS_TOKEN="s3cret")
+class TestRequestMetrics(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="m@test.com", username="m", password="pass1234", is_staff=True)
+        self.poll = Poll.objects.create(question="Q?", created_by=self.user)
+        Option.objects.create(poll=self.poll, option_text="A")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("poll-results", args=[self.poll.id])
+
+    def test_server_timing_and_histograms(self):
+        before = metrics.REQUEST_DURATION.count("poll-results", "GET")
+        misses = metrics.CACHE_LOOKUPS.value("poll-results", "miss")
+        hits = metrics.CACHE_LOOKUPS.value("poll-results", "hit")
+
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        assert first.status_code == 200
+        assert "db;dur=" in first["Server-Timing"]
+        assert '0 hits, 1 misses' in first["Server-Timing"]
+        assert '1 hits, 0 misses' in second["Server-Timing"]
+        assert "view;dur=" in second["Server-Timing"]
+        assert metrics.REQUEST_DURATION.count("poll-results", "GET") == before + 2
+        assert metrics.CACHE_LOOKUPS.value("poll-results", "miss") == misses + 1
+        assert metrics.CACHE_LOOKUPS.value("poll-results", "hit") == hits + 1
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        self.client.get(self.url)
+        resp = APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        assert resp.status_code == 200
+        body = resp.content.decode()
+        assert "# TYPE nexus_request_duration_seconds histogram" in body
+        assert 'nexus_db_queries_bucket{view="poll-results",method="GET",le="+Inf"}' in body
+        assert 'nexus_cache_lookups_total{view="poll-results",result="miss"}' in body
+
+    def test_metrics_endpoint_requires_the_token(self):
+        assert APIClient().get("/metrics").status_code == 401
+        assert APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == 401
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_metrics_endpoint_is_hidden_without_a_token(self):
+        assert APIClient().get("/metrics").status_code == 404
+        with override_settings(DEBUG=True):
+            assert APIClient().get("/metrics").status_code == 200
+
+    def test_server_timing_is_only_sent_to_staff(self):
+        user = User.objects.create_user(email="n@test.com", username="n", password="pass1234")
+        client = APIClient()
+        client.force_authenticate(user)
+        resp = client.get(self.url)
+        assert resp.status_code == 200
+        assert "Server-Timing" not in resp
+        assert "Server-Timing" not in APIClient().get(self.url)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_measured(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        before = metrics.REQUEST_DURATION.count("poll-results", "GET")
+        resp = client.get(self.url)
+        assert resp.status_code == 200
+        assert "Server-Timing" not in resp
+        assert metrics.REQUEST_DURATION.count("poll-results", "GET") == before
@@ -0,0 +1,85 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls.models import Poll, Option, PollResultSnapshot
+from polls.views import cast_vote
+from django.test import TestCase
+
+pytestmark = pytest.mark.django_db
+
+
+class TestResultSnapshots(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(email="o@test.com", username="o", password="pass1234")
+        self.voters = [
+            User.objects.create_user(email=f"v{n}@test.com", username=f"v{n}", password="pass1234")
+            for n in range(3)
+        ]
+        self.poll = Poll.objects.create(question="Q?", created_by=self.owner)
+        self.yes = Option.objects.create(poll=self.poll, option_text="yes")
+        self.no = Option.objects.create(poll=self.poll, option_text="no")
+        for voter, option in zip(self.voters, (self.yes, self.yes, self.no)):
+            cast_vote(voter, self.poll.id, option.id)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def expire(self, poll, seconds_ago):
+        Poll.objects.filter(id=poll.id).update(expires_at=timezone.now() - datetime.timedelta(seconds=seconds_ago))
+
+    def freeze(self, **options):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("freeze_expired_polls", stdout=StringIO(), **options)
+
+    def test_freezes_only_polls_past_the_grace_period(self):
+        recent = Poll.objects.create(question="Recent?", created_by=self.owner)
+        self.expire(recent, 10)
+        self.expire(self.poll, 3600)
+
+        self.freeze(grace=300)
+
+        assert list(PollResultSnapshot.objects.values_list("poll_id", flat=True)) == [self.poll.id]
+        payload = PollResultSnapshot.objects.get(poll=self.poll).payload
+        assert payload["final"] is True
+        assert payload["total_votes"] == 3
+        by_text = {o["option_text"]: o for o in payload["options"]}
+        assert by_text["yes"]["votes"] == by_text["yes"]["votes_count"] == 2
+        assert by_text["yes"]["percentage"] == 66.67
+        assert by_text["no"]["percentage"] == 33.33
+
+    def test_results_endpoint_serves_snapshot_without_aggregating(self):
+        url = reverse("poll-results", args=[self.poll.id])
+        live = self.client.get(url)
+        assert "Cache-Control" not in live or "max-age" not in live["Cache-Control"]
+
+        self.expire(self.poll, 3600)
+        self.freeze()
+        # Counters can drift; the snapshot is what gets served from now on
+        Option.objects.filter(id=self.no.id).update(votes_count=50)
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            resp = self.client.get(url)
+        assert resp.status_code == 200
+        assert resp.json()["final"] is True
+        assert resp.json()["total_votes"] == 3
+        assert "max-age=86400" in resp["Cache-Control"]
+
+    def test_editing_a_frozen_poll_discards_the_snapshot(self):
+        self.expire(self.poll, 3600)
+        self.freeze()
+        resp = self.client.patch(
+            reverse("poll-detail", args=[self.poll.id]),
+            {"expires_at": (timezone.now() + datetime.timedelta(days=1)).isoformat()},
+            format="json",
+        )
+        assert resp.status_code == 200
+        assert not PollResultSnapshot.objects.filter(poll=self.poll).exists()
+        assert "final" not in self.client.get(reverse("poll-results", args=[self.poll.id])).json()
@@ -90,4 +90,17 @@ class TestResultsApi(TestCase):
         # After vote, results should reflect change (not stale)
         resp2 = client.get(url)
         data = resp2.json()
-        self.assertEqual(sum(o["total_votes"] for o in data["options"]), 1)
\ No newline at end of file
+        self.assertEqual(sum(o["total_votes"] for o in data["options"]), 1)
+    def test_results_cache_follows_option_changes(self):
+        user = self.create_user("opts@test.com")
+        poll, opts = self.create_poll_with_options(user, ("one", "two"))
+        client = self.make_client()
+        client.force_authenticate(user)
+        url = reverse('poll-results', args=[poll.id])
+        client.get(url)  # warm cache
+
+        client.patch(reverse('option-update-delete', args=[opts[0].id]), {"option_text": "uno"}, format="json")
+        client.delete(reverse('option-update-delete', args=[opts[1].id]))
+
+        data = client.get(url).json()
+        assert [o["option_text"] for o in data["options"]] == ["uno"]
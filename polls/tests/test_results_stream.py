@@ -0,0 +1,101 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import User
+from polls import live
+from polls.models import Category, Poll, Option
+from polls.views import cast_vote, get_poll_results
+
+pytestmark = pytest.mark.django_db
+
+
+class TestResultsStream(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="s@s.com", username="s", password="pass")
+        cat = Category.objects.create(name="General")
+        self.poll = Poll.objects.create(question="Food?", category=cat, created_by=self.user)
+        self.opt1 = Option.objects.create(poll=self.poll, option_text="Pizza")
+        self.opt2 = Option.objects.create(poll=self.poll, option_text="Burger")
+        self.auth = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.url = reverse('poll-results-stream', args=[self.poll.id])
+
+    async def test_requires_authentication(self):
+        response = await AsyncClient().get(self.url)
+        assert response.status_code == 401
+
+    async def test_snapshot_then_delta_shared_by_subscribers(self):
+        client = AsyncClient()
+        first = (await client.get(self.url, headers=self.auth)).streaming_content
+        second = (await client.get(self.url, headers=self.auth)).streaming_content
+        try:
+            assert (await anext(first)).startswith(b"event: snapshot")
+            assert (await anext(second)).startswith(b"event: snapshot")
+            assert len(live.get_broker()._channels) == 1
+
+            await sync_to_async(cast_vote)(self.user, self.poll.id, self.opt2.id)
+            live.notify(self.poll.id)
+
+            for stream in (first, second):
+                event = await asyncio.wait_for(anext(stream), 5)
+                assert event.startswith(b"event: delta")
+                assert f'{{"id": "{self.opt2.id}", "votes_count": 1}}'.encode() in event
+                assert str(self.opt1.id).encode() not in event
+        finally:
+            await first.aclose()
+            await second.aclose()
+
+    async def test_closing_last_stream_releases_the_channel(self):
+        broker = live.get_broker()
+        stream = live.event_stream(await broker.subscribe(self.poll.id))
+        await anext(stream)
+        assert str(self.poll.id) in broker._channels
+
+        await stream.aclose()
+        assert str(self.poll.id) not in broker._channels
+
+    @override_settings(LIVE_RESULTS_HEARTBEAT=0.01)
+    async def test_idle_stream_sends_heartbeats(self):
+        stream = (await AsyncClient().get(self.url, headers=self.auth)).streaming_content
+        try:
+            await anext(stream)
+            assert await asyncio.wait_for(anext(stream), 5) == b": heartbeat\n\n"
+        finally:
+            await stream.aclose()
+
+    @override_settings(LIVE_RESULTS_CHECK_INTERVAL=0.01)
+    async def test_channel_survives_a_failed_read(self):
+        broker = live.get_broker()
+        subscription = await broker.subscribe(self.poll.id)
+        calls = []
+
+        def flaky(poll_id):
+            calls.append(poll_id)
+            if len(calls) == 1:
+                raise RuntimeError("database went away")
+            return get_poll_results(poll_id)
+
+        try:
+            with mock.patch("polls.views.get_poll_results", side_effect=flaky):
+                await sync_to_async(cast_vote)(self.user, self.poll.id, self.opt1.id)
+                event = await asyncio.wait_for(subscription.queue.get(), 5)
+            assert event[0] == "delta"
+            assert event[1]["total_votes"] == 1
+            assert not subscription.channel.task.done()
+        finally:
+            broker.unsubscribe(subscription)
+
+    def test_slow_subscriber_is_resynced_with_a_snapshot(self):
+        async def scenario():
+            channel = live.PollChannel("p", {"poll_id": "p", "options": [], "total_votes": 0})
+            subscription = live.Subscription(channel, size=2)
+            for n in range(3):
+                subscription.push(("delta", {"n": n}))
+            return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+        events = asyncio.run(scenario())
+        assert events == [("snapshot", {"poll_id": "p", "options": [], "total_votes": 0})]
@@ -0,0 +1,115 @@
+import uuid
+from unittest import mock
+
+import pytest
+from django.core.cache import caches
+from django.test import TestCase
+from alx_project_nexus.tiered_cache import TwoTierCache
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTwoTierCache(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        channel = f"test-{uuid.uuid4()}"
+        # Two L1 stores on one channel and one L2 stand in for two workers
+        self.a, self.b = (self.make_worker(channel) for _ in range(2))
+        self.l2 = caches["shared"]
+
+    def make_worker(self, channel, **options):
+        return TwoTierCache(f"worker-{uuid.uuid4()}", {"OPTIONS": {
+            "L2": "shared",
+            "L1_TIMEOUT": 60,
+            "L1_KEY_PREFIXES": ["poll_"],
+            "BROADCAST_OPTIONS": {"CHANNEL": channel},
+            **options,
+        }})
+
+    def test_reads_are_served_from_l1(self):
+        self.a.set("poll_results:1", {"total": 1})
+        assert self.b.get("poll_results:1") == {"total": 1}
+        self.l2.set("poll_results:1", {"total": 2})  # behind the workers' backs
+        assert self.b.get("poll_results:1") == {"total": 1}
+
+    def test_writes_invalidate_other_workers(self):
+        self.a.set("poll_results:1", {"total": 1})
+        assert self.b.get("poll_results:1") == {"total": 1}
+        self.a.set("poll_results:1", {"total": 2})
+        assert self.b.get("poll_results:1") == {"total": 2}
+
+        self.a.add("poll_version:1", 5, timeout=None)
+        assert self.b.get("poll_version:1") == 5
+        assert self.a.incr("poll_version:1") == 6
+        assert self.b.get("poll_version:1") == 6
+
+        self.a.delete("poll_version:1")
+        assert self.b.get("poll_version:1") is None
+
+    def test_clear_reaches_every_worker(self):
+        self.a.set("poll_results:1", 1)
+        self.b.get("poll_results:1")
+        self.a.clear()
+        assert self.b.get("poll_results:1") is None
+
+    def test_keys_outside_the_prefixes_skip_l1(self):
+        self.a.set("other", 1)
+        assert self.b.get("other") == 1
+        self.l2.set("other", 2)
+        assert self.b.get("other") == 2
+
+    def test_values_are_copies(self):
+        self.a.set("poll_results:1", {"options": []})
+        self.a.get("poll_results:1")["options"].append("mutated")
+        assert self.a.get("poll_results:1") == {"options": []}
+
+    def test_entries_expire(self):
+        self.a.set("poll_results:1", 1)
+        self.b.get("poll_results:1")
+        self.l2.set("poll_results:1", 2)
+        with mock.patch("alx_project_nexus.tiered_cache.time.monotonic", return_value=10 ** 9):
+            assert self.b.get("poll_results:1") == 2
+
+    def test_read_racing_an_invalidation_is_not_kept(self):
+        self.l2.set("poll_results:1", 1)
+        token = self.b.store.token()
+        self.a.set("poll_results:1", 2)
+        self.b.store.put(self.b.make_key("poll_results:1"), 1, token)
+        assert self.b.get("poll_results:1") == 2
+
+    def test_invalidating_one_key_does_not_block_fills_of_others(self):
+        self.l2.set("poll_results:2", 1)
+        token = self.b.store.token()
+        self.a.set("poll_version:1", 2)
+        self.b.store.put(self.b.make_key("poll_results:2"), 1, token)
+        self.l2.set("poll_results:2", 3)  # behind the workers' backs
+        assert self.b.get("poll_results:2") == 1
+
+    def test_fills_of_immutable_keys_are_not_broadcast(self):
+        channel = f"test-{uuid.uuid4()}"
+        a, b = (self.make_worker(channel, L1_IMMUTABLE_PREFIXES=["poll_results:"]) for _ in range(2))
+        b.set("poll_results:1:v1", {"total": 1})
+        assert b.get("poll_results:1:v1") == {"total": 1}
+        with mock.patch.object(b.store, "discard") as discard:
+            a.set("poll_results:2:v1", {"total": 2})
+            a.set("poll_results:1:v1", {"total": 1})
+        discard.assert_not_called()
+        assert a.get("poll_results:1:v1") == {"total": 1}
+
+        # An L2 read racing the fill elsewhere still lands in this worker's L1
+        self.l2.set("poll_results:3:v1", {"total": 3})
+        token = b.store.token()
+        a.set("poll_results:4:v1", {"total": 4})
+        b.store.put(b.make_key("poll_results:3:v1"), {"total": 3}, token)
+        self.l2.delete("poll_results:3:v1")
+        assert b.get("poll_results:3:v1") == {"total": 3}
+
+    def test_forked_worker_gets_its_own_store(self):
+        self.a.set("poll_results:1", 1)
+        self.a.get("poll_results:1")
+        parent_store = self.a.store
+        with mock.patch("alx_project_nexus.tiered_cache.os.getpid", return_value=-1):
+            assert self.a.store is not parent_store
+            self.l2.set("poll_results:1", 2)
+            assert self.a.get("poll_results:1") == 2
+        assert self.a.store is parent_store
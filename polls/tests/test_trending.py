@@ -0,0 +1,82 @@
+import datetime
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls import trending
+from polls.models import Poll, Option, PollTrend
+from polls.views import cast_vote, cast_votes_bulk
+from django.test import TestCase, override_settings
+
+pytestmark = pytest.mark.django_db
+
+
+@override_settings(TRENDING_HALF_LIFE=3600)
+class TestTrending(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(email=f"u{n}@test.com", username=f"u{n}", password="pass") for n in range(3)
+        ]
+        self.polls = []
+        for n in range(3):
+            poll = Poll.objects.create(question=f"Q{n}?", created_by=self.users[0])
+            Option.objects.create(poll=poll, option_text="A")
+            Option.objects.create(poll=poll, option_text="B")
+            self.polls.append(poll)
+
+    def vote(self, user, poll, index=0):
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(user, poll.id, poll.options.order_by("option_text")[index].id)
+
+    def test_votes_accumulate_decayed_scores(self):
+        for user in self.users:
+            self.vote(user, self.polls[0])
+        self.vote(self.users[0], self.polls[1])
+        self.vote(self.users[0], self.polls[1], index=1)  # a changed vote counts as activity
+
+        scores = {p.id: p.trending_score for p in trending.top(10)}
+        assert scores[self.polls[0].id] == pytest.approx(3, rel=1e-3)
+        assert scores[self.polls[1].id] == pytest.approx(2, rel=1e-3)
+        assert self.polls[2].id not in scores
+
+    def test_older_votes_weigh_less(self):
+        now = timezone.now()
+        trending.apply({self.polls[0].id: trending.log_weight(now - datetime.timedelta(hours=2), votes=4)})
+        trending.apply({self.polls[1].id: trending.log_weight(now, votes=3)})
+        trending.apply({self.polls[0].id: trending.log_weight(now)})
+
+        ranked = trending.top(10, now=now)
+        assert [p.id for p in ranked] == [self.polls[1].id, self.polls[0].id]
+        assert ranked[1].trending_score == pytest.approx(2, rel=1e-3)  # 4 votes two half-lives ago, plus one
+
+    def test_bulk_votes_feed_scores(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_votes_bulk([(user, self.polls[2].id, self.polls[2].options.first().id) for user in self.users])
+        assert trending.current_score(PollTrend.objects.get(poll=self.polls[2]).score) == pytest.approx(3, rel=1e-3)
+
+    def test_endpoint_lists_public_active_polls_and_is_cached(self):
+        private, expired, active = self.polls
+        private.is_public = False
+        private.save()
+        expired.expires_at = timezone.now() + datetime.timedelta(seconds=1)
+        expired.save()
+        for poll in self.polls:
+            self.vote(self.users[0], poll)
+        Poll.objects.filter(id=expired.id).update(expires_at=timezone.now() - datetime.timedelta(days=1))
+
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        url = reverse("poll-trending")
+        resp = client.get(url, {"limit": 5})
+        assert resp.status_code == 200
+        assert [p["id"] for p in resp.json()] == [str(active.id)]
+        assert resp.json()[0]["trending_score"] == pytest.approx(1, rel=1e-3)
+
+        with self.assertNumQueries(0):
+            assert client.get(url, {"limit": 5}).json() == resp.json()
+        assert client.get(url, {"limit": 0}).status_code == 400
+        assert client.get(url, {"limit": "x"}).status_code == 400
@@ -0,0 +1,70 @@
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from alx_project_nexus import profiling
+from polls.models import Poll, Option
+
+pytestmark = pytest.mark.django_db
+
+
+class TestViewProfiler(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.user = User.objects.create_user(email="p@test.com", username="p", password="pass1234")
+        self.poll = Poll.objects.create(question="Q?", created_by=self.user)
+        Option.objects.create(poll=self.poll, option_text="A")
+        self.url = reverse("poll-results", args=[self.poll.id])
+
+    def get(self, **headers):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get(self.url, **headers)
+
+    def profiles(self):
+        return sorted(name for name in os.listdir(self.tmp.name) if name.endswith(".prof"))
+
+    def test_authorized_header_saves_profile_tagged_by_view(self):
+        with override_settings(PROFILING_DIR=self.tmp.name, PROFILING_TOKEN="tok"):
+            resp = self.get(HTTP_X_PROFILE="tok")
+            assert resp.status_code == 200
+            assert resp.json()["poll_id"] == str(self.poll.id)
+            assert self.profiles() == [resp["X-Profile-Id"]]
+            assert profiling.view_name_of(resp["X-Profile-Id"]) == "poll-results"
+
+            # Wrong token and no sampling: the request is not profiled
+            assert "X-Profile-Id" not in self.get(HTTP_X_PROFILE="nope")
+            assert len(self.profiles()) == 1
+
+    def test_sampled_requests_are_profiled(self):
+        with override_settings(PROFILING_DIR=self.tmp.name, PROFILING_SAMPLE_RATE=1.0):
+            assert "X-Profile-Id" in self.get()
+        assert len(self.profiles()) == 1
+
+    def test_prune_removes_oldest_profiles_over_the_cap(self):
+        for n in range(5):
+            path = os.path.join(self.tmp.name, f"view__{n}__x.prof")
+            with open(path, "wb") as fh:
+                fh.write(b"x" * 100)
+            os.utime(path, (n, n))
+        profiling.prune(Path(self.tmp.name), max_bytes=250)
+        assert self.profiles() == ["view__3__x.prof", "view__4__x.prof"]
+
+    def test_profile_report_summarizes_saved_profiles(self):
+        with override_settings(PROFILING_DIR=self.tmp.name, PROFILING_SAMPLE_RATE=1.0):
+            self.get()
+            self.get()
+        out = StringIO()
+        call_command("profile_report", dir=self.tmp.name, limit=5, stdout=out)
+        output = out.getvalue()
+        assert "2 profiles" in output
+        assert "poll-results: 2" in output
+        assert "get_poll_results" in output or "function calls" in output
@@ -0,0 +1,128 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls import admission
+from polls.models import Poll, Option, Vote
+
+pytestmark = pytest.mark.django_db
+
+
+class TestVoteAdmission(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="v@test.com", username="v", password="pass1234")
+        self.poll = Poll.objects.create(question="Q?", created_by=self.user, allow_multiple=True)
+        self.options = [Option.objects.create(poll=self.poll, option_text=f"O{n}") for n in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def vote(self, option):
+        return self.client.post(reverse("cast-vote", args=[self.poll.id, option.id]))
+
+    @override_settings(VOTE_USER_RATE=0.01, VOTE_USER_BURST=2)
+    def test_user_over_rate_gets_429_with_retry_after(self):
+        shed = admission.VOTES_SHED.value(admission.USER)
+        assert self.vote(self.options[0]).status_code == 200
+        assert self.vote(self.options[1]).status_code == 200
+
+        resp = self.vote(self.options[2])
+        assert resp.status_code == 429
+        assert resp.json()["reason"] == "user"
+        assert 1 <= int(resp["Retry-After"]) <= 100
+        assert Vote.objects.filter(user=self.user).count() == 2
+        assert admission.VOTES_SHED.value(admission.USER) == shed + 1
+
+    @override_settings(VOTE_POLL_MAX_IN_FLIGHT=1)
+    def test_in_flight_bound_per_poll(self):
+        held = admission.admit("someone-else", self.poll.id)
+        assert held.admitted
+        resp = self.vote(self.options[0])
+        assert resp.status_code == 429
+        assert resp.json()["reason"] == "in_flight"
+
+        held.release()
+        assert self.vote(self.options[0]).status_code == 200
+        # The slot is given back after errors as well
+        missing = self.client.post(reverse("cast-vote", args=[self.poll.id, self.user.id]))
+        assert missing.status_code >= 400
+        assert self.vote(self.options[1]).status_code == 200
+
+    @override_settings(VOTE_USER_RATE=0.01, VOTE_USER_BURST=1, VOTE_POLL_RATE=0.01, VOTE_POLL_BURST=1)
+    def test_poll_rejection_gives_the_user_token_back(self):
+        assert admission.admit("someone-else", self.poll.id).admitted
+        resp = self.vote(self.options[0])
+        assert resp.status_code == 429
+        assert resp.json()["reason"] == "poll"
+        # The user's only token is still there
+        assert admission.get_backend().take(f"user:{self.user.pk}", rate=0.01, burst=1) == 0
+
+    @override_settings(VOTE_POLL_MAX_IN_FLIGHT=1, VOTE_POLL_RATE=0.01, VOTE_POLL_BURST=2)
+    def test_in_flight_rejection_gives_the_poll_token_back(self):
+        held = admission.admit("someone-else", self.poll.id)
+        for _ in range(3):
+            assert self.vote(self.options[0]).json()["reason"] == "in_flight"
+        held.release()
+        assert self.vote(self.options[0]).status_code == 200
+
+    @override_settings(VOTE_ADMISSION_ENABLED=False, VOTE_USER_RATE=0.01, VOTE_USER_BURST=1)
+    def test_can_be_disabled(self):
+        for option in self.options:
+            assert self.vote(option).status_code == 200
+
+
+class TestAdmissionBackends(TestCase):
+    def test_local_token_bucket_refills_at_rate(self):
+        backend = admission.LocalBackend()
+        assert backend.take("k", rate=2, burst=2, now=0) == 0
+        assert backend.take("k", rate=2, burst=2, now=0) == 0
+        assert backend.take("k", rate=2, burst=2, now=0) == pytest.approx(0.5)
+        assert backend.take("k", rate=2, burst=2, now=0.5) == 0
+
+    def test_local_refund_is_capped_at_burst(self):
+        backend = admission.LocalBackend()
+        assert backend.take("k", rate=1, burst=1, now=0) == 0
+        backend.refund("k", rate=1, burst=1)
+        assert backend.take("k", rate=1, burst=1, now=0) == 0
+        backend.refund("k", rate=1, burst=1)
+        backend.refund("k", rate=1, burst=1)
+        assert backend.take("k", rate=1, burst=1, now=0) == 0
+        assert backend.take("k", rate=1, burst=1, now=0) == pytest.approx(1)
+
+    def test_local_backend_forgets_oldest_buckets(self):
+        backend = admission.LocalBackend(max_keys=2)
+        for key in ("a", "b", "c"):
+            backend.take(key, rate=1, burst=1, now=0)
+        assert backend.take("a", rate=1, burst=1, now=0) == 0  # forgotten, so full again
+        assert backend.take("c", rate=1, burst=1, now=0) == pytest.approx(1)
+
+    def test_shared_backend_windows_and_in_flight(self):
+        cache.clear()
+        backend = admission.CacheBackend("default")
+        assert backend.take("k", rate=1, burst=2, now=100.0) == 0
+        assert backend.take("k", rate=1, burst=2, now=100.5) == 0
+        assert backend.take("k", rate=1, burst=2, now=101.0) == pytest.approx(1.0)
+        assert backend.take("k", rate=1, burst=2, now=102.0) == 0
+        assert backend.take("k", rate=1, burst=2, now=102.5) == 0
+        backend.refund("k", rate=1, burst=2, now=102.5)
+        assert backend.take("k", rate=1, burst=2, now=103.0) == 0
+        assert backend.take("k", rate=1, burst=2, now=103.5) != 0
+
+        assert backend.enter("slot", 1)
+        assert not backend.enter("slot", 1)
+        backend.leave("slot")
+        assert backend.enter("slot", 1)
+
+    @override_settings(VOTE_ADMISSION_CACHE="default", VOTE_POLL_MAX_IN_FLIGHT=0,
+                       VOTE_USER_RATE=0.5, VOTE_USER_BURST=1, VOTE_POLL_RATE=0.5, VOTE_POLL_BURST=1)
+    def test_shared_refund_goes_to_the_window_the_token_came_from(self):
+        cache.clear()
+        # The clock crosses into the next 2s window right after the first reading
+        with mock.patch.object(admission.CacheBackend, "clock", side_effect=[1.9] + [2.1] * 10):
+            assert admission.admit("u", "p").reason == admission.IN_FLIGHT
+        assert cache.get("admission:user:u:0") == 0
+        assert cache.get("admission:poll:p:0") == 0
@@ -0,0 +1,93 @@
+import pytest
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls import counters
+from polls.models import Category, Poll, Option, Vote
+from polls.views import cast_vote
+
+pytestmark = pytest.mark.django_db
+
+
+@override_settings(VOTE_COUNTER_MODE="buffered", VOTE_COUNTER_AUTOFLUSH=False)
+class TestBufferedVoteCounters(TestCase):
+    def setUp(self):
+        counters.get_store().clear()
+        self.user = User.objects.create_user(email="a@a.com", username="a", password="pass")
+        self.other = User.objects.create_user(email="b@b.com", username="b", password="pass")
+        cat = Category.objects.create(name="General")
+        self.poll = Poll.objects.create(question="Food?", category=cat, created_by=self.user)
+        self.opt1 = Option.objects.create(poll=self.poll, option_text="Pizza")
+        self.opt2 = Option.objects.create(poll=self.poll, option_text="Burger")
+
+    def tearDown(self):
+        counters.get_store().clear()
+
+    def test_votes_are_buffered_until_flush(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            _, count = cast_vote(self.user, self.poll.id, self.opt1.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.other, self.poll.id, self.opt1.id)
+
+        assert count == 1
+        assert Vote.objects.count() == 2
+        self.opt1.refresh_from_db()
+        assert self.opt1.votes_count == 0
+        assert counters.pending(self.poll.id) == {str(self.opt1.id): 2}
+
+        assert counters.flush() == 1
+        self.opt1.refresh_from_db()
+        assert self.opt1.votes_count == 2
+        assert counters.pending(self.poll.id) == {}
+
+    def test_vote_change_is_buffered_as_two_deltas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.user, self.poll.id, self.opt1.id)
+        counters.flush()
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.user, self.poll.id, self.opt2.id)
+
+        assert counters.pending(self.poll.id) == {str(self.opt1.id): -1, str(self.opt2.id): 1}
+        counters.flush()
+        self.opt1.refresh_from_db()
+        self.opt2.refresh_from_db()
+        assert (self.opt1.votes_count, self.opt2.votes_count) == (0, 1)
+
+    def test_results_merge_unflushed_deltas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.user, self.poll.id, self.opt2.id)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        data = client.get(reverse('poll-results', args=[self.poll.id])).json()
+        mapping = {o["option_text"]: o["votes_count"] for o in data["options"]}
+        assert mapping == {"Pizza": 0, "Burger": 1}
+
+        for fast_path in (True, False):
+            with self.settings(POLL_READ_FAST_PATH=fast_path):
+                data = client.get(reverse('poll-detail', args=[self.poll.id])).json()
+            assert {o["option_text"]: o["votes_count"] for o in data["options"]} == mapping
+
+    def test_flush_invalidates_cached_detail_and_results(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.user, self.poll.id, self.opt1.id)
+        url = reverse('poll-detail', args=[self.poll.id])
+        before = client.get(url)
+        etag = before["ETag"]
+        # Unflushed deltas are merged in, as in the results
+        assert {o["option_text"]: o["votes_count"] for o in before.json()["options"]}["Pizza"] == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.flush()
+        resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        assert resp["ETag"] != etag
+        assert {o["option_text"]: o["votes_count"] for o in resp.json()["options"]}["Pizza"] == 1
+
+    def test_rolled_back_vote_is_not_counted(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            cast_vote(self.user, self.poll.id, self.opt1.id)
+        assert counters.pending(self.poll.id) == {}
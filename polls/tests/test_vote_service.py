@@ -1,4 +1,5 @@
 import pytest
+from django.db import connection
 from django.utils import timezone
 from accounts.models import User
 from polls.models import Category, Poll, Option, Vote
@@ -29,10 +30,12 @@ class TestVoteService(TestCase):
         opt2 = Option.objects.create(poll=poll, option_text="Burger")
 
         # Initial vote
-        cast_vote(user, poll.id, opt1.id)
+        first, _ = cast_vote(user, poll.id, opt1.id)
 
         # Change vote
         vote, count = cast_vote(user, poll.id, opt2.id)
+        # Every backend stamps a change with its own time
+        assert Vote.objects.get(id=vote.id).voted_at > first.voted_at
 
         opt1.refresh_from_db()
         opt2.refresh_from_db()
@@ -69,3 +72,87 @@ class TestVoteService(TestCase):
         import pytest
         with pytest.raises(ValueError):
             cast_vote(user, poll.id, opt.id)
+
+
+class TestSingleChoiceUpsert(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="d@d.com", username="d", password="pass")
+        cat = Category.objects.create(name="General")
+        self.poll = Poll.objects.create(question="Food?", category=cat, created_by=self.user)
+        self.opt1 = Option.objects.create(poll=self.poll, option_text="Pizza")
+        self.opt2 = Option.objects.create(poll=self.poll, option_text="Burger")
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="SQLite never emits FOR UPDATE")
+    def test_vote_and_change_take_no_poll_lock(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            _, first_count = cast_vote(self.user, self.poll.id, self.opt1.id)
+            vote, changed_count = cast_vote(self.user, self.poll.id, self.opt2.id)
+
+        assert not any('"polls_poll"' in q["sql"] and "FOR UPDATE" in q["sql"] for q in ctx.captured_queries)
+        assert (first_count, changed_count) == (1, 1)
+        assert vote.option == self.opt2
+        self.opt1.refresh_from_db()
+        assert self.opt1.votes_count == 0
+        assert Vote.objects.get(user=self.user, poll=self.poll).single_choice
+
+    def test_constraint_rejects_second_single_choice_vote(self):
+        from django.db import IntegrityError
+
+        cast_vote(self.user, self.poll.id, self.opt1.id)
+        with pytest.raises(IntegrityError):
+            Vote.objects.create(user=self.user, poll=self.poll, option=self.opt2, single_choice=True)
+
+
+class TestSwitchToSingleChoice(TestCase):
+    def setUp(self):
+        from rest_framework.test import APIClient
+
+        self.user = User.objects.create_user(email="e@e.com", username="e", password="pass")
+        self.poll = Poll.objects.create(question="Food?", created_by=self.user, allow_multiple=True)
+        self.opt1 = Option.objects.create(poll=self.poll, option_text="Pizza")
+        self.opt2 = Option.objects.create(poll=self.poll, option_text="Burger")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def switch(self):
+        from django.urls import reverse
+
+        url = reverse("poll-detail", args=[self.poll.id])
+        return self.client.patch(url, {"allow_multiple": False}, format="json")
+
+    def test_votes_are_flagged_so_changes_replace_them(self):
+        cast_vote(self.user, self.poll.id, self.opt1.id)
+        assert self.switch().status_code == 200
+
+        cast_vote(self.user, self.poll.id, self.opt2.id)
+        assert list(Vote.objects.filter(poll=self.poll).values_list("option_id", "single_choice")) == [
+            (self.opt2.id, True)
+        ]
+
+    def test_refused_while_a_user_holds_several_votes(self):
+        cast_vote(self.user, self.poll.id, self.opt1.id)
+        cast_vote(self.user, self.poll.id, self.opt2.id)
+        resp = self.switch()
+        assert resp.status_code == 400
+        assert "allow_multiple" in resp.json()
+        self.poll.refresh_from_db()
+        assert self.poll.allow_multiple
+
+    def test_migration_merges_duplicate_votes_into_the_latest(self):
+        import importlib
+        from django.apps import apps
+
+        migration = importlib.import_module("polls.migrations.0014_merge_duplicate_single_choice_votes")
+        cast_vote(self.user, self.poll.id, self.opt1.id)
+        cast_vote(self.user, self.poll.id, self.opt2.id)
+        Poll.objects.filter(id=self.poll.id).update(allow_multiple=False)  # as before the guard existed
+
+        migration.merge_duplicate_votes(apps, None)
+
+        vote = Vote.objects.get(poll=self.poll)
+        assert (vote.option_id, vote.single_choice) == (self.opt2.id, True)
+        counts = [Option.objects.get(id=o.id).votes_count for o in (self.opt1, self.opt2)]
+        assert counts == [0, 1]
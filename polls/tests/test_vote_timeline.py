@@ -0,0 +1,105 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from polls import timeline
+from polls.models import Poll, Option, Vote, VoteRollup
+from polls.views import cast_vote, cast_votes_bulk
+from django.test import TestCase
+
+pytestmark = pytest.mark.django_db
+
+
+class TestVoteTimeline(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="a@a.com", username="a", password="pass")
+        self.other = User.objects.create_user(email="b@b.com", username="b", password="pass")
+        self.poll = Poll.objects.create(question="Food?", created_by=self.user)
+        self.opt1 = Option.objects.create(poll=self.poll, option_text="Pizza")
+        self.opt2 = Option.objects.create(poll=self.poll, option_text="Burger")
+
+    def rollup_totals(self, granularity):
+        rows = (
+            VoteRollup.objects.filter(poll=self.poll, granularity=granularity)
+            .values("option_id").annotate(total=Sum("votes"))
+        )
+        return {row["option_id"]: row["total"] for row in rows}
+
+    def test_cast_and_changed_votes_update_every_granularity(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.user, self.poll.id, self.opt1.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.other, self.poll.id, self.opt1.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.user, self.poll.id, self.opt2.id)
+
+        for granularity in timeline.GRANULARITIES:
+            assert self.rollup_totals(granularity) == {self.opt1.id: 1, self.opt2.id: 1}
+        bucket = VoteRollup.objects.get(option=self.opt2, granularity=timeline.HOUR).bucket
+        assert bucket == timeline.bucket_start(timezone.now(), timeline.HOUR)
+
+    def test_bulk_votes_update_rollups(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_votes_bulk([
+                (self.user, self.poll.id, self.opt1.id),
+                (self.other, self.poll.id, self.opt1.id),
+                (self.user, self.poll.id, self.opt2.id),
+            ])
+        assert self.rollup_totals(timeline.DAY) == {self.opt1.id: 1, self.opt2.id: 1}
+
+    def test_backfill_rebuilds_from_votes(self):
+        earlier = timezone.now() - datetime.timedelta(days=2)
+        Vote.objects.create(user=self.user, poll=self.poll, option=self.opt1, voted_at=earlier, single_choice=True)
+        Vote.objects.create(user=self.other, poll=self.poll, option=self.opt2, single_choice=True)
+        VoteRollup.objects.create(
+            poll=self.poll, option=self.opt1, granularity=timeline.DAY,
+            bucket=timeline.bucket_start(earlier, timeline.DAY), votes=99,
+        )
+
+        call_command("backfill_vote_timeline", poll_ids=[str(self.poll.id)], stdout=StringIO())
+
+        assert self.rollup_totals(timeline.MINUTE) == {self.opt1.id: 1, self.opt2.id: 1}
+        days = list(
+            VoteRollup.objects.filter(poll=self.poll, granularity=timeline.DAY)
+            .order_by("bucket").values_list("bucket", "votes")
+        )
+        assert days[0] == (timeline.bucket_start(earlier, timeline.DAY), 1)
+
+    def test_timeline_endpoint(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.user, self.poll.id, self.opt1.id)
+            cast_vote(self.other, self.poll.id, self.opt2.id)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse("poll-timeline", args=[self.poll.id])
+
+        resp = client.get(url, {"granularity": "minute"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["granularity"] == "minute"
+        assert len(data["buckets"]) == 1
+        bucket = data["buckets"][0]
+        assert bucket["total"] == 2
+        assert bucket["votes"] == {str(self.opt1.id): 1, str(self.opt2.id): 1}
+
+        # The range excludes the votes
+        resp = client.get(url, {"granularity": "day", "end": "2020-01-02", "start": "2020-01-01"})
+        assert resp.status_code == 200
+        assert resp.json()["buckets"] == []
+
+    def test_timeline_endpoint_validates_params(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse("poll-timeline", args=[self.poll.id])
+        assert client.get(url, {"granularity": "week"}).status_code == 400
+        assert client.get(url, {"start": "yesterday"}).status_code == 400
+        resp = client.get(url, {"granularity": "minute", "start": "2020-01-01", "end": "2020-02-01"})
+        assert resp.status_code == 400
+        missing = reverse("poll-timeline", args=["00000000-0000-0000-0000-000000000000"])
+        assert client.get(missing).status_code == 404
@@ -0,0 +1,157 @@
+"""
+Vote timeline rollups.
+
+``VoteRollup`` keeps the net number of votes each option gained per minute,
+hour and day bucket (UTC). A first vote adds 1 to the new option's buckets; a
+changed vote also subtracts 1 from the old option's buckets at the time of
+the change, so summing an option's buckets gives its current vote count.
+
+``record`` is called from the vote paths. The rollup rows are upserted once
+the vote transaction commits, in one short statement, so hot buckets are not
+locked for the duration of the vote transaction. A rollup write that fails is
+logged and can be repaired with ``manage.py backfill_vote_timeline``.
+"""
+import logging
+import uuid
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MINUTE = "minute"
+HOUR = "hour"
+DAY = "day"
+GRANULARITIES = (MINUTE, HOUR, DAY)
+
+STEPS = {MINUTE: timedelta(minutes=1), HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+_TRUNC = {MINUTE: TruncMinute, HOUR: TruncHour, DAY: TruncDay}
+
+# Range served when the client does not pass ``start``, and the widest allowed
+DEFAULT_SPANS = {MINUTE: timedelta(hours=1), HOUR: timedelta(days=2), DAY: timedelta(days=90)}
+MAX_BUCKETS = 1500
+
+_UPSERT_SQL = """
+    INSERT INTO {table} (id, poll_id, option_id, granularity, bucket, votes)
+    VALUES {rows}
+    ON CONFLICT (option_id, granularity, bucket)
+    DO UPDATE SET votes = {table}.votes + EXCLUDED.votes
+"""
+
+
+def bucket_start(moment, granularity):
+    moment = moment.astimezone(dt_timezone.utc)
+    if granularity == MINUTE:
+        return moment.replace(second=0, microsecond=0)
+    if granularity == HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_rows(deltas, at):
+    """Expand ``{(poll_id, option_id): delta}`` into one row per granularity."""
+    rows = [
+        (str(poll_id), str(option_id), granularity, bucket_start(at, granularity), delta)
+        for (poll_id, option_id), delta in deltas.items()
+        if delta
+        for granularity in GRANULARITIES
+    ]
+    # A stable order keeps concurrent upserts from deadlocking on each other
+    return sorted(rows, key=lambda row: (row[1], row[2], row[3]))
+
+
+def apply(rows):
+    """Add ``(poll_id, option_id, granularity, bucket, votes)`` rows to the rollups."""
+    from .models import VoteRollup
+
+    if not rows:
+        return
+    if connection.vendor not in ("postgresql", "sqlite"):
+        with transaction.atomic():
+            for poll_id, option_id, granularity, bucket, votes in rows:
+                rollup, _ = VoteRollup.objects.select_for_update().get_or_create(
+                    option_id=option_id, granularity=granularity, bucket=bucket, defaults={"poll_id": poll_id}
+                )
+                rollup.votes += votes
+                rollup.save(update_fields=["votes"])
+        return
+
+    fields = [VoteRollup._meta.get_field(name) for name in ("id", "poll", "option", "granularity", "bucket", "votes")]
+    params = []
+    for row in rows:
+        for field, value in zip(fields, (uuid.uuid4(), *row)):
+            params.append(field.get_db_prep_save(value, connection))
+    placeholder = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    sql = _UPSERT_SQL.format(
+        table=connection.ops.quote_name(VoteRollup._meta.db_table),
+        rows=", ".join([placeholder] * len(rows)),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _apply_logged(rows):
+    try:
+        apply(rows)
+    except Exception:
+        logger.exception("Failed to update the vote timeline")
+
+
+def record(deltas, at=None):
+    """Queue ``{(poll_id, option_id): delta}`` for the rollups once the vote commits."""
+    rows = rollup_rows(deltas, at or timezone.now())
+    if rows:
+        transaction.on_commit(lambda: _apply_logged(rows))
+
+
+def rebuild(poll_id):
+    """
+    Recompute a poll's rollups from its ``Vote`` rows.
+
+    Votes are counted at their ``voted_at``; the history of changed votes is
+    not stored anywhere else, so only the current votes are rebuilt.
+    """
+    from .models import Vote, VoteRollup
+
+    with transaction.atomic():
+        VoteRollup.objects.filter(poll_id=poll_id).delete()
+        rows = []
+        for granularity in GRANULARITIES:
+            buckets = (
+                Vote.objects.filter(poll_id=poll_id)
+                .annotate(bucket=_TRUNC[granularity]("voted_at", tzinfo=dt_timezone.utc))
+                .values("option_id", "bucket")
+                .annotate(votes=Count("id"))
+            )
+            rows.extend(
+                (str(poll_id), str(b["option_id"]), granularity, b["bucket"], b["votes"]) for b in buckets
+            )
+        rows.sort(key=lambda row: (row[1], row[2], row[3]))
+        for start in range(0, len(rows), 500):
+            apply(rows[start:start + 500])
+    return len(rows)
+
+
+def timeline(poll_id, granularity, start, end):
+    """Return the non-empty buckets in ``[start, end)`` with per-option votes."""
+    from .models import VoteRollup
+
+    rollups = (
+        VoteRollup.objects.filter(
+            poll_id=poll_id, granularity=granularity, bucket__gte=bucket_start(start, granularity), bucket__lt=end
+        )
+        .order_by("bucket")
+        .values_list("bucket", "option_id", "votes")
+    )
+    buckets = []
+    for bucket, option_id, votes in rollups:
+        if not buckets or buckets[-1]["bucket"] != bucket:
+            buckets.append({"bucket": bucket, "votes": {}, "total": 0})
+        buckets[-1]["votes"][str(option_id)] = votes
+        buckets[-1]["total"] += votes
+    for entry in buckets:
+        entry["bucket"] = entry["bucket"].isoformat()
+    return buckets
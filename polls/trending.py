@@ -0,0 +1,113 @@
+"""
+Trending polls from exponentially decayed vote counts.
+
+A poll's trending score is the sum over its votes of ``2 ** -(age / half_life)``.
+Because every score decays at the same rate, the ranking never needs to be
+re-decayed: each vote adds ``2 ** ((t - EPOCH) / half_life)`` instead, and the
+stored sum is kept in natural-log space so it cannot overflow. ``PollTrend``
+rows are ordered by that log score through an index, so the top K polls are
+the first K index entries.
+
+``record`` is called from the vote paths and applies the increments after the
+vote transaction commits.
+"""
+import logging
+import math
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EPOCH = 1_700_000_000  # reference time of the log scores; never change it
+
+_UPSERT_SQL = """
+    INSERT INTO {table} (poll_id, score)
+    VALUES {rows}
+    ON CONFLICT (poll_id) DO UPDATE SET score =
+        GREATEST({table}.score, EXCLUDED.score) + LN(1 + EXP(-ABS({table}.score - EXCLUDED.score)))
+"""
+
+
+def half_life():
+    return getattr(settings, "TRENDING_HALF_LIFE", 6 * 60 * 60)
+
+
+def log_weight(at, votes=1):
+    """Log-space contribution of ``votes`` votes cast at ``at``."""
+    return (at.timestamp() - EPOCH) * math.log(2) / half_life() + math.log(votes)
+
+
+def log_add(a, b):
+    return max(a, b) + math.log1p(math.exp(-abs(a - b)))
+
+
+def current_score(log_score, now=None):
+    """Decayed vote count of a stored log score as of ``now``."""
+    return math.exp(log_score - log_weight(now or timezone.now()))
+
+
+def apply(weights):
+    """Add ``{poll_id: log_weight}`` to the stored scores."""
+    from .models import PollTrend
+
+    poll_ids = sorted(str(poll_id) for poll_id in weights)
+    weights = {str(poll_id): weight for poll_id, weight in weights.items()}
+    if not poll_ids:
+        return
+    if connection.vendor != "postgresql":
+        with transaction.atomic():
+            existing = {
+                str(trend.poll_id): trend
+                for trend in PollTrend.objects.select_for_update().filter(poll_id__in=poll_ids)
+            }
+            for poll_id in poll_ids:
+                trend = existing.get(poll_id)
+                if trend is None:
+                    PollTrend.objects.create(poll_id=poll_id, score=weights[poll_id])
+                else:
+                    trend.score = log_add(trend.score, weights[poll_id])
+                    trend.save(update_fields=["score"])
+        return
+
+    sql = _UPSERT_SQL.format(
+        table=connection.ops.quote_name(PollTrend._meta.db_table),
+        rows=", ".join(["(%s::uuid, %s)"] * len(poll_ids)),
+    )
+    params = [value for poll_id in poll_ids for value in (poll_id, weights[poll_id])]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _apply_logged(weights):
+    try:
+        apply(weights)
+    except Exception:
+        logger.exception("Failed to update trending scores")
+
+
+def record(votes, at=None):
+    """Queue ``{poll_id: number_of_votes}`` for the trending scores once the vote commits."""
+    at = at or timezone.now()
+    weights = {poll_id: log_weight(at, n) for poll_id, n in votes.items() if n > 0}
+    if weights:
+        transaction.on_commit(lambda: _apply_logged(weights))
+
+
+def top(limit, now=None):
+    """Return the ``limit`` highest-scoring public, non-expired polls with a ``trending_score``."""
+    from .models import PollTrend
+
+    now = now or timezone.now()
+    trends = (
+        PollTrend.objects.filter(poll__is_public=True)
+        .filter(models.Q(poll__expires_at__isnull=True) | models.Q(poll__expires_at__gt=now))
+        .select_related("poll")
+        .order_by("-score")[:limit]
+    )
+    polls = []
+    for trend in trends:
+        trend.poll.trending_score = round(current_score(trend.score, now), 3)
+        polls.append(trend.poll)
+    return polls
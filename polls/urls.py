@@ -1,23 +1,43 @@
 from django.urls import path
 from .views import (
     PollListCreateView,
+    PollImportView,
     PollDetailView,
     OptionCreateView,
     OptionUpdateDeleteView,
     PollResultsView,
+    PollTimelineView,
+    TrendingPollsView,
+    CategoryListView,
+    PollSearchView,
+    CommentListCreateView,
+    CommentDeleteView,
+    poll_results_stream,
     vote_view,
+    bulk_vote_view,
 )
 
 urlpatterns = [
     path('', PollListCreateView.as_view(), name='poll-list-create'),
+    path('trending/', TrendingPollsView.as_view(), name='poll-trending'),
+    path('search/', PollSearchView.as_view(), name='poll-search'),
+    path('categories/', CategoryListView.as_view(), name='category-list'),
     path('<uuid:pk>/', PollDetailView.as_view(), name='poll-detail'),
+    path('import/', PollImportView.as_view(), name='poll-import'),
 
     # Options
     path('<uuid:poll_id>/options/', OptionCreateView.as_view(), name='option-create'),
     path('options/<uuid:pk>/', OptionUpdateDeleteView.as_view(), name='option-update-delete'),
 
+    # Comments
+    path('<uuid:poll_id>/comments/', CommentListCreateView.as_view(), name='comment-list-create'),
+    path('comments/<uuid:pk>/', CommentDeleteView.as_view(), name='comment-delete'),
+
     # Results
     path('<uuid:poll_id>/results/', PollResultsView.as_view(), name='poll-results'),
+    path('<uuid:poll_id>/results/stream/', poll_results_stream, name='poll-results-stream'),
+    path('<uuid:poll_id>/timeline/', PollTimelineView.as_view(), name='poll-timeline'),
     path('<uuid:poll_id>/vote/<uuid:option_id>/', vote_view, name='cast-vote'),
+    path('votes/bulk/', bulk_vote_view, name='bulk-vote'),
 
 ]
@@ -1,31 +1,203 @@
-from django.db import transaction, models
+import datetime
+import io
+import uuid
+from django.db import IntegrityError, connection, transaction, models
 from rest_framework import generics, permissions, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.shortcuts import get_object_or_404
-from .models import Poll, Option, Vote
-from .permissions import IsPollOwner, IsPollOwnerForOption
+from .models import Comment, Poll, Option, Vote
+from . import admission, audit, caching, category_stats, counters, fastpath, identity, importing, live, search, snapshots, timeline, trending
+from .permissions import IsCommentOwner, IsPollOwner, IsPollOwnerForOption
+from .pagination import CommentCursorPagination, PollCursorPagination, PollSearchCursorPagination
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from django.db.models import Count, F
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from accounts.authentication import CachedJWTAuthentication
 from .serializers import (
     PollSerializer,
     PollCreateSerializer,
     PollDetailSerializer,
     OptionSerializer,
-    PollResultsSerializer
+    PollResultsSerializer,
+    BulkVoteSerializer,
+    TrendingPollSerializer,
+    CommentSerializer,
 )
 from django.core.cache import cache
-from django.db.models import Prefetch
+from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from alx_project_nexus import metrics
 from rest_framework.decorators import api_view, permission_classes
 from django.core.cache import cache
 
 def _invalidate_poll_cache(poll_id):
-    cache_key = f"poll_{poll_id}"
-    try:
-        cache.delete(cache_key)
-    except Exception:
-        pass  # In-memory cache is unlikely to fail, but safe to ignore
+    """
+    Bump the poll's cache version so cached results are rebuilt on next read.
+
+    The version is bumped right away and again once the transaction commits, so
+    a reader that rebuilt the payload from pre-commit data in between does not
+    pin it.
+    """
+    def bump():
+        try:
+            caching.bump_poll_version(poll_id)
+        except Exception:
+            pass  # In-memory cache is unlikely to fail, but safe to ignore
+
+    bump()
+    transaction.on_commit(bump)
+    transaction.on_commit(lambda: live.notify(poll_id))
+
+def _bump_votes_count(option, delta):
+    """
+    Add ``delta`` to ``option.votes_count``.
+
+    In buffered counter mode the delta is handed to the counter store once the
+    vote transaction commits instead of updating (and locking) the option row.
+    """
+    if counters.is_buffered():
+        poll_id, option_id = option.poll_id, option.id
+        transaction.on_commit(lambda: counters.record(poll_id, option_id, delta))
+    else:
+        Option.objects.filter(id=option.id).update(votes_count=models.F("votes_count") + delta)
+
+
+def _current_votes_count(option, bumped=0):
+    """
+    Return the up-to-date vote count of ``option``.
+
+    ``bumped`` is the delta this transaction already passed to
+    ``_bump_votes_count``; the counter store only sees it after commit.
+    """
+    if counters.is_buffered():
+        return option.votes_count + counters.pending(option.poll_id).get(str(option.id), 0) + bumped
+    if bumped:
+        option.refresh_from_db(fields=["votes_count"])
+    return option.votes_count
+
+
+# Single-choice votes are guarded by the partial unique constraint
+# ``unique_user_single_choice_vote`` on (user, poll), so PostgreSQL can record
+# a first vote or a vote change with an upsert instead of a poll row lock.
+# The ``bump`` CTEs move Option.votes_count in the same statement.
+_FIRST_VOTE_SQL = """
+    WITH ins AS (
+        INSERT INTO polls_vote (id, user_id, poll_id, option_id, voted_at, single_choice)
+        VALUES (%(id)s::uuid, %(user_id)s::uuid, %(poll_id)s::uuid, %(option_id)s::uuid, %(now)s, TRUE)
+        ON CONFLICT (user_id, poll_id) WHERE single_choice DO NOTHING
+        RETURNING option_id
+    ){bump}
+    SELECT {count} FROM ins
+"""
+_FIRST_VOTE_BUMP_SQL = """, bump AS (
+        UPDATE polls_option SET votes_count = votes_count + 1
+        WHERE id IN (SELECT option_id FROM ins)
+        RETURNING votes_count
+    )"""
+
+_CHANGE_VOTE_SQL = """
+    WITH previous AS (
+        SELECT id, option_id, voted_at FROM polls_vote
+        WHERE user_id = %(user_id)s::uuid AND poll_id = %(poll_id)s::uuid AND single_choice
+        FOR UPDATE
+    ), moved AS (
+        UPDATE polls_vote SET option_id = %(option_id)s::uuid, voted_at = %(now)s
+        FROM previous
+        WHERE polls_vote.id = previous.id AND previous.option_id <> %(option_id)s::uuid
+        RETURNING previous.option_id
+    ){bump}
+    SELECT previous.id, previous.option_id, previous.voted_at, {count} FROM previous
+"""
+# Both option rows are locked in id order first, so two users moving votes
+# in opposite directions cannot deadlock.
+_CHANGE_VOTE_BUMP_SQL = """, locked AS (
+        SELECT id FROM polls_option
+        WHERE id IN (SELECT option_id FROM moved UNION ALL SELECT %(option_id)s::uuid FROM moved)
+        ORDER BY id
+        FOR UPDATE
+    ), bump AS (
+        UPDATE polls_option
+        SET votes_count = votes_count + CASE WHEN polls_option.id = %(option_id)s::uuid THEN 1 ELSE -1 END
+        FROM locked
+        WHERE polls_option.id = locked.id
+        RETURNING polls_option.id, votes_count
+    )"""
+
+
+def _supports_vote_upsert():
+    return connection.vendor == "postgresql"
+
+
+def _upsert_single_choice_vote(user, poll, option):
+    """
+    Record a single-choice vote without locking the poll.
+
+    A first vote is one INSERT ... ON CONFLICT DO NOTHING round trip; a vote
+    change adds one UPDATE round trip that locks only the user's own vote row.
+    In buffered counter mode the counter deltas go to the counter store
+    instead of the ``bump`` CTEs.
+    """
+    buffered = counters.is_buffered()
+    now = timezone.now()
+    params = {
+        "id": str(uuid.uuid4()),
+        "user_id": str(user.pk),
+        "poll_id": str(poll.id),
+        "option_id": str(option.id),
+        "now": now,
+    }
+    first_sql = _FIRST_VOTE_SQL.format(
+        bump="" if buffered else _FIRST_VOTE_BUMP_SQL,
+        count="NULL" if buffered else "(SELECT votes_count FROM bump)",
+    )
+    change_sql = _CHANGE_VOTE_SQL.format(
+        bump="" if buffered else _CHANGE_VOTE_BUMP_SQL,
+        count="NULL" if buffered else "(SELECT votes_count FROM bump WHERE id = %(option_id)s::uuid)",
+    )
+
+    with connection.cursor() as cursor:
+        # The previous vote can vanish between the two statements (e.g. its
+        # option was deleted), in which case the insert is simply retried.
+        for _ in range(2):
+            cursor.execute(first_sql, params)
+            row = cursor.fetchone()
+            if row is not None:
+                vote = Vote(id=params["id"], user=user, poll=poll, option=option, voted_at=now, single_choice=True)
+                vote._state.adding = False
+                if buffered:
+                    _bump_votes_count(option, 1)
+                timeline.record({(poll.id, option.id): 1}, now)
+                trending.record({poll.id: 1}, now)
+                log_action(user=user, action="Voted on poll", target_type="Poll", target_id=poll.id)
+                _invalidate_poll_cache(poll.id)
+                return vote, _current_votes_count(option, bumped=1) if buffered else row[0]
+
+            cursor.execute(change_sql, params)
+            row = cursor.fetchone()
+            if row is not None:
+                break
+        else:
+            raise RuntimeError("Could not record vote")
+
+    vote_id, old_option_id, voted_at, votes_count = row
+    vote = Vote(id=vote_id, user=user, poll=poll, option=option, voted_at=voted_at, single_choice=True)
+    vote._state.adding = False
+    if old_option_id == option.id:
+        return vote, _current_votes_count(option)  # No change
+
+    vote.voted_at = now
+    if buffered:
+        _bump_votes_count(Option(id=old_option_id, poll_id=poll.id), -1)
+        _bump_votes_count(option, 1)
+    timeline.record({(poll.id, old_option_id): -1, (poll.id, option.id): 1}, now)
+    trending.record({poll.id: 1}, now)
+    log_action(user=user, action="Changed vote on poll", target_type="Poll", target_id=poll.id)
+    _invalidate_poll_cache(poll.id)
+    return vote, _current_votes_count(option, bumped=1) if buffered else votes_count
+
 
 def cast_vote(user, poll_id, option_id):
     """
@@ -33,8 +205,15 @@ def cast_vote(user, poll_id, option_id):
     Supports single-choice and multiple-choice polls.
     """
     with transaction.atomic():
-        poll = get_object_or_404(Poll.objects.select_for_update(), id=poll_id)
-        option = get_object_or_404(Option.objects.select_for_update(), id=option_id, poll_id=poll_id)
+        if _supports_vote_upsert():
+            # Neither path needs the poll row lock here: multiple-choice votes
+            # rely on unique_user_poll_vote, single-choice ones on the upsert.
+            option = get_object_or_404(Option.objects.select_related('poll'), id=option_id, poll_id=poll_id)
+            poll = option.poll
+        else:
+            poll = get_object_or_404(Poll.objects.select_for_update(), id=poll_id)
+            options = Option.objects.all() if counters.is_buffered() else Option.objects.select_for_update()
+            option = get_object_or_404(options, id=option_id, poll_id=poll_id)
 
         # Check poll expiration
         if poll.expires_at and poll.expires_at < timezone.now():
@@ -45,13 +224,17 @@ def cast_vote(user, poll_id, option_id):
             vote, created = Vote.objects.get_or_create(user=user, option=option, poll=poll)
             if created:
                 # Increment option's votes_count
-                Option.objects.filter(id=option.id).update(votes_count=models.F("votes_count") + 1)
-                option.refresh_from_db(fields=["votes_count"])
-                
+                _bump_votes_count(option, 1)
+                timeline.record({(poll.id, option.id): 1}, vote.voted_at)
+                trending.record({poll.id: 1}, vote.voted_at)
+
                 # Log the action
                 log_action(user=user, action="Voted on poll (multi-choice)", target_type="Poll", target_id=poll_id)
                 _invalidate_poll_cache(poll_id)
-            return vote, option.votes_count
+                return vote, _current_votes_count(option, bumped=1)
+            return vote, _current_votes_count(option)
+        elif _supports_vote_upsert():
+            return _upsert_single_choice_vote(user, poll, option)
         else:
             # Single-choice: only one vote per user
             existing_vote = Vote.objects.select_for_update().select_related('option').filter(user=user, poll_id=poll_id).first()
@@ -60,32 +243,170 @@ def cast_vote(user, poll_id, option_id):
                 old_option = existing_vote.option
 
                 if old_option.id == option.id:
-                    return existing_vote, old_option.votes_count  # No change
+                    return existing_vote, _current_votes_count(option)  # No change
 
                 # Decrement old option
-                Option.objects.filter(id=old_option.id).update(votes_count=models.F("votes_count") - 1)
+                _bump_votes_count(old_option, -1)
 
-                # Update vote record
+                # Update vote record; a change counts as a vote at the time it is made
                 existing_vote.option = option
+                existing_vote.voted_at = timezone.now()
                 existing_vote.save()
 
                 # Increment new option
-                Option.objects.filter(id=option.id).update(votes_count=models.F("votes_count") + 1)
-                option.refresh_from_db(fields=["votes_count"])
+                _bump_votes_count(option, 1)
+                timeline.record({(poll.id, old_option.id): -1, (poll.id, option.id): 1}, existing_vote.voted_at)
+                trending.record({poll.id: 1}, existing_vote.voted_at)
 
                 # Logging and cache
                 log_action(user=user, action="Changed vote on poll", target_type="Poll", target_id=poll_id)
                 _invalidate_poll_cache(poll_id)
-                return existing_vote, option.votes_count
+                return existing_vote, _current_votes_count(option, bumped=1)
 
             # First-time vote
-            vote = Vote.objects.create(user=user, poll=poll, option=option)
-            Option.objects.filter(id=option.id).update(votes_count=models.F("votes_count") + 1)
-            option.refresh_from_db(fields=["votes_count"])
+            vote = Vote.objects.create(user=user, poll=poll, option=option, single_choice=True)
+            _bump_votes_count(option, 1)
+            timeline.record({(poll.id, option.id): 1}, vote.voted_at)
+            trending.record({poll.id: 1}, vote.voted_at)
 
             log_action(user=user, action="Voted on poll", target_type="Poll", target_id=poll_id)
             _invalidate_poll_cache(poll_id)
-            return vote, option.votes_count
+            return vote, _current_votes_count(option, bumped=1)
+
+def _lock_existing_votes(poll_ids, user_ids):
+    """
+    The batch's existing votes, row-locked in id order.
+
+    ``cast_vote`` does not take the poll lock on PostgreSQL. A first vote
+    still waits for the batch, because inserting it key-share locks the poll
+    row the batch holds. A vote change, however, only locks the user's vote
+    row, so the batch locks those rows too before moving any of them.
+    """
+    return list(
+        Vote.objects.select_for_update().filter(poll_id__in=poll_ids, user_id__in=user_ids).order_by("id")
+    )
+
+
+def cast_votes_bulk(votes):
+    """
+    Cast many votes in one transaction.
+
+    ``votes`` is an iterable of ``(user, poll_id, option_id)`` tuples, where
+    ``user`` is a ``User`` or a user id. Items are applied in order with the
+    same single/multiple-choice rules as ``cast_vote``, but polls are locked
+    once per batch, new votes go through ``bulk_create`` and every option gets
+    a single aggregated ``votes_count`` update.
+
+    Returns one outcome dict per item with a ``status`` of ``"created"``,
+    ``"changed"``, ``"unchanged"`` or ``"failed"``.
+    """
+    from django.contrib.auth import get_user_model
+
+    items = [(getattr(user, "pk", user), poll_id, option_id) for user, poll_id, option_id in votes]
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    now = timezone.now()
+    user_ids = {str(user_id) for user_id, _, _ in items}
+    poll_ids = {str(poll_id) for _, poll_id, _ in items}
+    option_ids = {str(option_id) for _, _, option_id in items}
+
+    with transaction.atomic():
+        known_users = {
+            str(pk) for pk in get_user_model().objects.filter(id__in=user_ids).values_list("id", flat=True)
+        }
+        # Lock every poll once, in a stable order, for the whole batch
+        polls = {
+            str(poll.id): poll
+            for poll in Poll.objects.select_for_update().filter(id__in=poll_ids).order_by("id")
+        }
+        options = {
+            str(option_id): str(poll_id)
+            for option_id, poll_id in Option.objects.filter(id__in=option_ids).values_list("id", "poll_id")
+        }
+
+        single_votes = {}
+        multi_votes = set()
+        for vote in _lock_existing_votes(polls.keys(), known_users):
+            key = (str(vote.user_id), str(vote.poll_id))
+            if polls[key[1]].allow_multiple:
+                multi_votes.add((key[0], str(vote.option_id)))
+            else:
+                single_votes[key] = vote
+
+        to_create, to_update, deltas, audit_entries, touched = [], {}, {}, [], set()
+        activity = {}  # votes cast or changed per poll
+        for index, (user_id, poll_id, option_id) in enumerate(items):
+            user_id, poll_id, option_id = str(user_id), str(poll_id), str(option_id)
+            poll = polls.get(poll_id)
+            error = None
+            if user_id not in known_users:
+                error = "User not found"
+            elif poll is None:
+                error = "Poll not found"
+            elif options.get(option_id) != poll_id:
+                error = "Option not found"
+            elif poll.expires_at and poll.expires_at < now:
+                error = "Poll expired"
+            if error:
+                results[index] = {"status": "failed", "error": error}
+                continue
+
+            if poll.allow_multiple:
+                if (user_id, option_id) in multi_votes:
+                    results[index] = {"status": "unchanged"}
+                    continue
+                multi_votes.add((user_id, option_id))
+                vote = Vote(user_id=user_id, poll_id=poll_id, option_id=option_id, voted_at=now)
+                to_create.append(vote)
+                action, outcome = "Voted on poll (multi-choice)", "created"
+            else:
+                vote = single_votes.get((user_id, poll_id))
+                if vote is None:
+                    vote = Vote(
+                        user_id=user_id, poll_id=poll_id, option_id=option_id, voted_at=now, single_choice=True
+                    )
+                    single_votes[(user_id, poll_id)] = vote
+                    to_create.append(vote)
+                    action, outcome = "Voted on poll", "created"
+                elif str(vote.option_id) == option_id:
+                    results[index] = {"status": "unchanged", "vote_id": str(vote.id)}
+                    continue
+                else:
+                    old_key = (poll_id, str(vote.option_id))
+                    deltas[old_key] = deltas.get(old_key, 0) - 1
+                    vote.option_id = option_id
+                    vote.voted_at = now
+                    if not vote._state.adding:
+                        to_update[vote.id] = vote
+                    action, outcome = "Changed vote on poll", "changed"
+
+            deltas[(poll_id, option_id)] = deltas.get((poll_id, option_id), 0) + 1
+            touched.add(poll_id)
+            activity[poll_id] = activity.get(poll_id, 0) + 1
+            audit_entries.append(AuditLog(user_id=user_id, action=action, target_type="Poll", target_id=poll_id))
+            results[index] = {"status": outcome, "vote_id": str(vote.id)}
+
+        Vote.objects.bulk_create(to_create)
+        if to_update:
+            Vote.objects.bulk_update(list(to_update.values()), ["option", "voted_at"])
+
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if counters.is_buffered():
+            transaction.on_commit(
+                lambda: [counters.record(p_id, o_id, delta) for (p_id, o_id), delta in deltas.items()]
+            )
+        else:
+            counters.apply_deltas({o_id: delta for (_, o_id), delta in deltas.items()})
+
+        timeline.record(deltas, now)
+        trending.record(activity, now)
+        audit.record(audit_entries)
+        for poll_id in touched:
+            _invalidate_poll_cache(poll_id)
+
+    return results
 
 from .models import AuditLog
 
@@ -99,16 +420,24 @@ def log_action(user, action, target_type, target_id):
         target_type: The type of object affected, e.g., "Poll", "Option", "Vote"
         target_id: UUID of the object affected
     """
-    AuditLog.objects.create(
+    audit.record([AuditLog(
         user=user,
         action=action,
         target_type=target_type,
         target_id=target_id
-    )
+    )])
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def vote_view(request, poll_id, option_id):
+    # Shed excess votes before they pile up on vote and option row locks and tie up workers
+    decision = admission.admit(request.user.pk, poll_id)
+    if not decision.admitted:
+        return Response(
+            {"error": "Too many votes, try again later.", "reason": decision.reason},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(decision.retry_after)},
+        )
     try:
         vote, votes_count = cast_vote(
             user=request.user,
@@ -132,14 +461,114 @@ def vote_view(request, poll_id, option_id):
         logging.exception("Unexpected error in vote_view")
         return Response({"error": "Unexpected error"}, status=500)
 
+    finally:
+        decision.release()
+
+def filter_polls(queryset, params):
+    """
+    Apply the poll list filters from query params.
+
+    ``is_public``, ``category`` and ``created_by`` each lead one of the
+    ``idx_polls_*_created`` indexes; ``status`` is ``active`` or ``expired``.
+    """
+    errors = {}
+    if "is_public" in params:
+        value = params["is_public"].lower()
+        if value not in ("true", "false", "1", "0"):
+            errors["is_public"] = "Must be true or false."
+        else:
+            queryset = queryset.filter(is_public=value in ("true", "1"))
+    for field in ("category", "created_by"):
+        if field in params:
+            try:
+                queryset = queryset.filter(**{f"{field}_id": uuid.UUID(params[field])})
+            except ValueError:
+                errors[field] = "Must be a valid UUID."
+    if "status" in params:
+        now = timezone.now()
+        if params["status"] == "active":
+            queryset = queryset.filter(models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now))
+        elif params["status"] == "expired":
+            queryset = queryset.filter(expires_at__lte=now)
+        else:
+            errors["status"] = "Must be active or expired."
+    if errors:
+        raise ValidationError(errors)
+    return queryset
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_vote_view(request):
+    """
+    Ingest a batch of votes, e.g. collected offline or by kiosks.
+
+    Items without a ``user`` are cast for the requesting user.
+    """
+    serializer = BulkVoteSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    items = [
+        (item.get("user") or request.user.pk, item["poll"], item["option"])
+        for item in serializer.validated_data["votes"]
+    ]
+    try:
+        results = cast_votes_bulk(items)
+    except IntegrityError:
+        # A vote written outside cast_vote's locking collided with the batch
+        return Response({"error": "Votes changed concurrently; retry the batch."}, status=status.HTTP_409_CONFLICT)
+
+    summary = {"created": 0, "changed": 0, "unchanged": 0, "failed": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return Response({**summary, "results": results}, status=200)
+
+class PollImportView(APIView):
+    """
+    Bulk-create polls from an uploaded ``file`` (JSON lines or CSV).
+
+    The upload is streamed row by row and written in chunked transactions.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get("format") or importing.detect_format(upload.name)
+        if fmt not in importing.FORMATS:
+            return Response({"format": [f"Must be one of {', '.join(importing.FORMATS)}."]}, status=400)
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        summary = importing.import_polls(importing.iter_rows(stream, fmt), request.user)
+        return Response(summary, status=status.HTTP_201_CREATED if summary["imported"] else 200)
+
 class PollListCreateView(generics.ListCreateAPIView):
-    queryset = Poll.objects.all().select_related('category', 'created_by').prefetch_related('options')
+    # Only the columns PollSerializer emits; FKs are rendered from their *_id
+    queryset = Poll.objects.only(
+        'id', 'question', 'description', 'category_id', 'created_by_id',
+        'is_public', 'allow_multiple', 'expires_at', 'created_at', 'updated_at',
+        'comments_count'
+    )
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PollCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != "GET":
+            return queryset
+        return filter_polls(queryset, self.request.query_params)
 
     def get_serializer_class(self):
         if self.request.method == "POST":
             return PollCreateSerializer
         return PollSerializer
+
+    def list(self, request, *args, **kwargs):
+        if not fastpath.enabled():
+            return super().list(request, *args, **kwargs)
+        # Page through plain rows; the cursor reads created_at/id from the dicts
+        page = self.paginate_queryset(fastpath.poll_rows(self.filter_queryset(self.get_queryset())))
+        return self.get_paginated_response(fastpath.poll_list(page))
     def perform_create(self, serializer):
         poll = serializer.save(created_by=self.request.user)
         log_action(
@@ -150,15 +579,82 @@ class PollListCreateView(generics.ListCreateAPIView):
             )
 
 
+def _not_modified(etag):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response["ETag"] = etag
+    return response
+
+
+class PollSearchView(generics.GenericAPIView):
+    """
+    Public full-text search over poll questions and descriptions.
+
+    ``q`` is required; ``category`` and ``status`` filter as on the poll list.
+    Only public polls are searched and results come most relevant first.
+    """
+    permission_classes = [permissions.AllowAny]
+    pagination_class = PollSearchCursorPagination
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "This query parameter is required."})
+        if len(query) > search.MAX_QUERY_LENGTH:
+            raise ValidationError({"q": f"Must be at most {search.MAX_QUERY_LENGTH} characters."})
+
+        filters = {key: request.query_params[key] for key in ("category", "status") if key in request.query_params}
+        queryset = search.search_polls(filter_polls(Poll.objects.filter(is_public=True), filters), query)
+        page = self.paginate_queryset(queryset.values(*fastpath.poll_mapper.columns, "rank"))
+        return self.get_paginated_response([{**fastpath.poll_mapper(row), "rank": row["rank"]} for row in page])
+
+
+def _make_single_choice(poll):
+    """
+    Flag the votes of a poll that becomes single-choice, or refuse the change.
+
+    The single-choice vote paths only see votes with ``single_choice`` set, so
+    the flag has to be in place before the switch. Locking the poll row holds
+    off new votes, whose insert key-share locks it.
+    """
+    Poll.objects.select_for_update().filter(id=poll.id).first()
+    votes = Vote.objects.filter(poll_id=poll.id)
+    if votes.values("user_id").annotate(n=models.Count("id")).filter(n__gt=1).exists():
+        raise ValidationError({"allow_multiple": "Some users already voted for several options."})
+    votes.filter(single_choice=False).update(single_choice=True)
+
+
 class PollDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Poll.objects.all().select_related('category', 'created_by').prefetch_related(
-        Prefetch('options', queryset=Option.objects.annotate(total_votes=Count('votes')))
-    )
+    queryset = Poll.objects.all().select_related('category', 'created_by').prefetch_related('options')
     serializer_class = PollDetailSerializer
     permission_classes = [permissions.IsAuthenticated, IsPollOwner]
 
+    def retrieve(self, request, *args, **kwargs):
+        # Taken before reading, so a concurrent change can only make it stale
+        etag = caching.poll_detail_etag(kwargs["pk"])
+        if caching.etag_matches(request, etag):
+            # Permissions still apply, but options are never loaded
+            poll = get_object_or_404(Poll.objects.only('id', 'created_by_id'), pk=kwargs["pk"])
+            self.check_object_permissions(request, poll)
+            return _not_modified(etag)
+        if fastpath.enabled():
+            poll = get_object_or_404(fastpath.detail_queryset(), pk=kwargs["pk"])
+            self.check_object_permissions(request, poll)
+            response = Response(fastpath.poll_detail(poll))
+        else:
+            response = super().retrieve(request, *args, **kwargs)
+        # Same counts as the results endpoint, which merges them as well
+        counters.merge_pending(kwargs["pk"], response.data["options"])
+        response["ETag"] = etag
+        return response
+
     def perform_update(self, serializer):
-        poll = serializer.save()
+        with transaction.atomic():
+            # The locked row, not the loaded instance: a concurrent update may have changed it
+            locked = Poll.objects.select_for_update().get(pk=serializer.instance.pk)
+            if locked.allow_multiple and serializer.validated_data.get("allow_multiple") is False:
+                _make_single_choice(serializer.instance)
+            poll = serializer.save()  # category_stats counts the change from its save signals
+        snapshots.discard(poll.id)
         _invalidate_poll_cache(poll.id)
         log_action(
             user=self.request.user,
@@ -167,14 +663,16 @@ class PollDetailView(generics.RetrieveUpdateDestroyAPIView):
             target_id=poll.id
         )
     def perform_destroy(self, instance):
-        _invalidate_poll_cache(instance.id)  # ADD THIS
+        _invalidate_poll_cache(instance.id)  # wakes live listeners; the versions go with the row
         log_action(
             user=self.request.user,
             action="Deleted poll",
             target_type="Poll",
             target_id=instance.id
         )
-        return super().perform_destroy(instance)
+        with transaction.atomic():
+            # Deleted as locked, so category_stats uncounts what is actually stored
+            return super().perform_destroy(Poll.objects.select_for_update().get(pk=instance.pk))
 
 
 
@@ -185,9 +683,11 @@ class OptionCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsPollOwnerForOption]
 
     def perform_create(self, serializer):
-        poll_id = self.kwargs['poll_id']
-        poll = get_object_or_404(Poll, id=poll_id)
+        # Already loaded by IsPollOwnerForOption
+        poll = identity.get_or_404(self.request, Poll, self.kwargs['poll_id'])
         option = serializer.save(poll=poll)
+        snapshots.discard(poll.id)
+        _invalidate_poll_cache(poll.id)
         log_action(
             user=self.request.user,
             action="Created option",
@@ -201,54 +701,265 @@ class OptionUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = OptionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-CACHE_TTL = 15
-class PollResultsView(APIView):
+    def perform_update(self, serializer):
+        option = serializer.save()
+        snapshots.discard(option.poll_id)
+        _invalidate_poll_cache(option.poll_id)
+
+    def perform_destroy(self, instance):
+        snapshots.discard(instance.poll_id)
+        _invalidate_poll_cache(instance.poll_id)
+        return super().perform_destroy(instance)
+
+# ---- COMMENTS ----
+
+class CommentListCreateView(generics.ListCreateAPIView):
+    """
+    A poll's comments, newest first, and posting a new one.
+
+    ``Poll.comments_count`` moves in the same transaction as the comment row,
+    so poll lists show counts without a per-row ``COUNT``.
+    """
+    serializer_class = CommentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentCursorPagination
+
+    def get_queryset(self):
+        identity.get_or_404(self.request, Poll, self.kwargs['poll_id'])
+        return Comment.objects.filter(poll_id=self.kwargs['poll_id'])
+
+    def perform_create(self, serializer):
+        poll = identity.get_or_404(self.request, Poll, self.kwargs['poll_id'])
+        with transaction.atomic():
+            # polls/comments.py moves comments_count from the save signal
+            comment = serializer.save(poll=poll, user=self.request.user)
+            log_action(
+                user=self.request.user,
+                action="Commented on poll",
+                target_type="Comment",
+                target_id=comment.id
+            )
+
+
+class CommentDeleteView(generics.DestroyAPIView):
+    queryset = Comment.objects.all()
+    serializer_class = CommentSerializer
+    permission_classes = [permissions.IsAuthenticated, IsCommentOwner]
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # Locked first, so of two racing requests only one deletes (and decrements)
+            comment = Comment.objects.select_for_update().filter(id=instance.id).first()
+            if comment is not None:
+                comment.delete()
+                log_action(
+                    user=self.request.user,
+                    action="Deleted comment",
+                    target_type="Comment",
+                    target_id=instance.id
+                )
+
+CACHE_TTL = 60 * 60  # results keys are versioned, see polls/caching.py
+FINAL_RESULTS_MAX_AGE = 24 * 60 * 60  # client cache lifetime of frozen results
+
+
+def _get_results_queryset(poll_id):
+    # Counts come from the denormalized Option.votes_count; run
+    # `manage.py reconcile_vote_counts` to check them against Vote rows.
+    # A frozen poll's snapshot is joined in, and its options are never read.
+    poll = (
+        Poll.objects.filter(id=poll_id)
+        .select_related('results_snapshot')
+        .only('id', 'question', 'results_snapshot__payload')
+        .first()
+    )
+    if not poll or hasattr(poll, 'results_snapshot'):
+        return poll, []
+    options = Option.objects.filter(poll_id=poll_id).only('id', 'option_text', 'votes_count')
+    return poll, list(options)
+
+
+def get_poll_results(poll_id):
+    """
+    Return the results payload of a poll, or ``None`` if it does not exist.
+
+    Payloads are cached under the poll's current cache version.
+    """
+    # Try cache first; the key changes whenever the poll's version is bumped
+    cache_key = caching.results_key(poll_id)
+    cached = cache.get(cache_key)
+    metrics.record_cache_lookup(cached is not None)
+    if cached is not None:
+        return cached
+
+    poll, options_qs = _get_results_queryset(poll_id)
+    if not poll:
+        return None
+    if hasattr(poll, 'results_snapshot'):
+        payload = poll.results_snapshot.payload
+        cache.set(cache_key, payload, timeout=CACHE_TTL)
+        return payload
+
+    # Build payload, merging vote deltas that are not flushed yet
+    pending = counters.pending(poll.id)
+    options_list = []
+    for o in options_qs:
+        votes = o.votes_count + pending.get(str(o.id), 0)
+        options_list.append({
+            "id": str(o.id),
+            "option_text": o.option_text,
+            "votes_count": votes,
+            "total_votes": votes
+        })
+    payload = {
+        "poll_id": str(poll.id),
+        "question": poll.question,
+        "options": options_list,
+        "total_votes": sum(o["total_votes"] for o in options_list)
+    }
+
+    # Set cache
+    cache.set(cache_key, payload, timeout=CACHE_TTL)
+    return payload
+
+
+CATEGORIES_CACHE_TTL = 60  # seconds; active counts drop as polls expire
+
+
+class CategoryListView(APIView):
+    """Every category with its total, public and currently active poll counts."""
     permission_classes = [permissions.IsAuthenticated]
 
-    def _get_results_queryset(self, poll_id):
-        options_qs = Option.objects.filter(poll_id=poll_id).annotate(
-            total_votes=Count('votes')
-        ).only('id', 'option_text', 'votes_count')
+    def get(self, request):
+        cache_key = f"categories:v{caching.categories_version()}"
+        data = cache.get(cache_key)
+        metrics.record_cache_lookup(data is not None)
+        if data is None:
+            data = category_stats.directory()
+            cache.set(cache_key, data, timeout=CATEGORIES_CACHE_TTL)
+        return Response(data)
 
-        poll = Poll.objects.filter(id=poll_id).select_related('category', 'created_by').prefetch_related(
-            Prefetch('options', queryset=options_qs)
-        ).first()
 
-        if poll:
-            return poll, list(poll.options.all())
-        else:
-            return None, options_qs
+TRENDING_CACHE_TTL = 30  # seconds; scores move continuously, so keep it short
+TRENDING_MAX_LIMIT = 50
+
+
+class TrendingPollsView(APIView):
+    """Public, non-expired polls with the highest decayed vote counts (``?limit=``, default 10)."""
+    permission_classes = [permissions.IsAuthenticated]
 
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= TRENDING_MAX_LIMIT:
+            raise ValidationError({"limit": f"Must be an integer between 1 and {TRENDING_MAX_LIMIT}."})
 
+        cache_key = f"polls_trending:{limit}"
+        data = cache.get(cache_key)
+        metrics.record_cache_lookup(data is not None)
+        if data is None:
+            data = TrendingPollSerializer(trending.top(limit), many=True).data
+            cache.set(cache_key, data, timeout=TRENDING_CACHE_TTL)
+        return Response(data)
+
+
+class PollResultsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, poll_id):
-        # Try cache first (see caching section below)
-        cache_key = f"poll_results:{poll_id}"
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached)
-
-        poll, options_qs = self._get_results_queryset(poll_id)
-        if not poll:
+        etag = caching.poll_etag("results", poll_id)
+        if caching.etag_matches(request, etag):
+            return _not_modified(etag)
+        payload = get_poll_results(poll_id)
+        if payload is None:
             return Response({"detail": "Poll not found"}, status=status.HTTP_404_NOT_FOUND)
+        response = Response(payload)
+        response["ETag"] = etag
+        if payload.get("final"):
+            # Frozen results only change if the owner edits the expired poll
+            response["Cache-Control"] = f"private, max-age={FINAL_RESULTS_MAX_AGE}"
+        return response
+
+
+def _parse_moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.datetime.combine(day, datetime.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, datetime.timezone.utc)
+    return moment
+
+
+class PollTimelineView(APIView):
+    """
+    Votes over time, read from the vote rollups only.
+
+    Query params: ``granularity`` (``minute``, ``hour`` or ``day``; default
+    ``hour``) and an optional ISO 8601 ``start``/``end`` range. Only buckets
+    that received votes are returned.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, poll_id):
+        params = request.query_params
+        errors = {}
+        granularity = params.get("granularity", timeline.HOUR)
+        if granularity not in timeline.GRANULARITIES:
+            errors["granularity"] = f"Must be one of {', '.join(timeline.GRANULARITIES)}."
+            granularity = timeline.HOUR
+        bounds = {}
+        for name in ("start", "end"):
+            if name in params:
+                try:
+                    bounds[name] = _parse_moment(params[name])
+                except ValueError:
+                    errors[name] = "Must be an ISO 8601 date or datetime."
+        if errors:
+            raise ValidationError(errors)
+
+        end = bounds.get("end") or timezone.now()
+        start = bounds.get("start") or end - timeline.DEFAULT_SPANS[granularity]
+        if start >= end:
+            raise ValidationError({"start": "Must be before end."})
+        if (end - start) / timeline.STEPS[granularity] > timeline.MAX_BUCKETS:
+            raise ValidationError({"start": f"Range spans more than {timeline.MAX_BUCKETS} {granularity} buckets."})
+
+        if not Poll.objects.filter(id=poll_id).exists():
+            return Response({"detail": "Poll not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "poll_id": str(poll_id),
+            "granularity": granularity,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "buckets": timeline.timeline(poll_id, granularity, start, end),
+        })
 
-        # Build payload
-        options_list = [
-            {
-                "id": str(o.id),
-                "option_text": o.option_text,
-                "votes_count": o.votes_count,
-                "total_votes": o.total_votes
-            }
-            for o in options_qs
-        ]
-        payload = {
-            "poll_id": str(poll.id),
-            "question": poll.question,
-            "options": options_list,
-            "total_votes": sum(o["total_votes"] for o in options_list)
-        }
 
-        # Set cache
-        cache.set(cache_key, payload, timeout=15)  # short TTL for near-real-time
-        return Response(payload)
+async def poll_results_stream(request, poll_id):
+    """
+    Stream live results of a poll as Server-Sent Events.
+
+    Sends a ``snapshot`` event first, then ``delta`` events carrying only the
+    options whose counts changed. Needs an ASGI server; see polls/live.py.
+    """
+    try:
+        authenticated = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({"detail": str(e.detail)}, status=401)
+    user = authenticated[0] if authenticated else await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    subscription = await live.get_broker().subscribe(poll_id)
+    if subscription is None:
+        return JsonResponse({"detail": "Poll not found"}, status=404)
+
+    response = StreamingHttpResponse(live.event_stream(subscription), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # keep reverse proxies from buffering events
+    return response